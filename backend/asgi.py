@@ -1,7 +1,11 @@
 """
-ASGI config for backend project.
+ASGI config for backend project: solo el websocket de comandos de voz.
 
-It exposes the ASGI callable as a module-level variable named ``application``.
+HTTP se sirve con WSGI (backend.wsgi): el manejador ASGI de Django acumula en
+memoria los StreamingHttpResponse con iteradores síncronos, como los de los
+reportes. Este proceso se levanta aparte, p. ej.
+    uvicorn backend.asgi:application --port 8001
+y el proxy le envía las rutas /ws/.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -9,8 +13,35 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
-application = get_asgi_application()
+django.setup(set_prefix=False)
+
+# Se importa después de cargar Django (usa modelos)
+from backend.dynamic_reports.voice_stream import VOICE_STREAM_PATH, voice_stream_application  # noqa: E402
+
+
+async def application(scope, receive, send):
+    """VOICE_STREAM_PATH recibe comandos de voz por streaming; HTTP responde 404"""
+    if scope['type'] == 'websocket':
+        if scope['path'] == VOICE_STREAM_PATH:
+            return await voice_stream_application(scope, receive, send)
+        await receive()
+        await send({'type': 'websocket.close', 'code': 4404})
+    elif scope['type'] == 'http':
+        await send({
+            'type': 'http.response.start',
+            'status': 404,
+            'headers': [(b'content-type', b'text/plain; charset=utf-8')],
+        })
+        await send({'type': 'http.response.body', 'body': 'Este proceso solo atiende websockets (/ws/)'.encode()})
+    elif scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
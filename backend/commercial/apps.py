@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CommercialConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'backend.commercial'
+
+    def ready(self):
+        from . import signals  # noqa: F401
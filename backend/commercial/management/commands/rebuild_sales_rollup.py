@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from datetime import datetime
+import time
+from backend.commercial.rollup import rebuild_rollup
+
+class Command(BaseCommand):
+    help = 'Reconstruye el resumen diario de ventas (ventas_diarias) desde la tabla ventas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', type=str, default=None,
+                            help='Reconstruir solo desde esta fecha (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = datetime.strptime(options['since'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('--since debe tener el formato YYYY-MM-DD')
+
+        start = time.perf_counter()
+        created = rebuild_rollup(since=since)
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Resumen diario reconstruido: {created} filas en {elapsed:.2f}s'
+        ))
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, DecimalField, F, Sum
+from django.db.models.functions import Coalesce, TruncDate
+
+
+def build_rollup(apps, schema_editor):
+    """Llena el resumen con las ventas existentes (con los modelos históricos)"""
+    Venta = apps.get_model('commercial', 'Venta')
+    VentaDiaria = apps.get_model('commercial', 'VentaDiaria')
+
+    aggregated = Venta.objects.annotate(dia=TruncDate('fecha_venta')).values(
+        'dia', 'producto_id', 'cliente_id'
+    ).annotate(
+        n=Count('id'),
+        units=Sum('cantidad'),
+        revenue=Sum(Coalesce(
+            'total', F('cantidad') * F('precio_unitario'),
+            output_field=DecimalField(max_digits=14, decimal_places=2)
+        )),
+    ).order_by()
+
+    VentaDiaria.objects.bulk_create(
+        [
+            VentaDiaria(
+                fecha=row['dia'],
+                producto_id=row['producto_id'],
+                cliente_id=row['cliente_id'],
+                cantidad_ventas=row['n'],
+                unidades=row['units'] or 0,
+                ingresos=row['revenue'] or 0,
+            )
+            for row in aggregated.iterator(chunk_size=5000)
+        ],
+        batch_size=5000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('commercial', '0003_pago_ordencompra'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VentaDiaria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('cantidad_ventas', models.IntegerField(default=0)),
+                ('unidades', models.IntegerField(default=0)),
+                ('ingresos', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('cliente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ventas_diarias', to='commercial.cliente')),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ventas_diarias', to='commercial.producto')),
+            ],
+            options={
+                'verbose_name': 'Venta Diaria',
+                'verbose_name_plural': 'Ventas Diarias',
+                'db_table': 'ventas_diarias',
+                'indexes': [models.Index(fields=['fecha'], name='ventas_diarias_fecha_idx')],
+                'unique_together': {('fecha', 'producto', 'cliente')},
+            },
+        ),
+        migrations.RunPython(build_rollup, migrations.RunPython.noop),
+    ]
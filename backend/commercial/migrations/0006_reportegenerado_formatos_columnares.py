@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('commercial', '0005_reportegenerado_estado'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reportegenerado',
+            name='formato_solicitado',
+            field=models.CharField(choices=[('PDF', 'PDF'), ('EXCEL', 'Excel'), ('CSV', 'CSV'), ('PARQUET', 'Parquet'), ('JSON', 'JSON')], max_length=10),
+        ),
+    ]
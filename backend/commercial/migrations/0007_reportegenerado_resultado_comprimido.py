@@ -0,0 +1,47 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:46
+
+import json
+import zlib
+from django.conf import settings
+from django.db import migrations, models
+
+
+def compress_results(apps, schema_editor):
+    # Mismo formato que result_store.compress_rows (JSON en zlib), copiado
+    # aquí para que la migración no dependa del código actual de la app
+    ReporteGenerado = apps.get_model('commercial', 'ReporteGenerado')
+    for reporte in ReporteGenerado.objects.exclude(resultado__isnull=True).only('id', 'resultado').iterator():
+        ReporteGenerado.objects.filter(pk=reporte.pk).update(
+            cantidad_resultados=len(reporte.resultado),
+            resultado_comprimido=zlib.compress(json.dumps(reporte.resultado).encode('utf-8')),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('commercial', '0006_reportegenerado_formatos_columnares'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportegenerado',
+            name='cantidad_resultados',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='reportegenerado',
+            name='resultado_comprimido',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.RunPython(compress_results, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='reportegenerado',
+            name='resultado',
+        ),
+        migrations.AddIndex(
+            model_name='reportegenerado',
+            index=models.Index(fields=['usuario', '-id'], name='reporte_usuario_id_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('commercial', '0007_reportegenerado_resultado_comprimido'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportegenerado',
+            name='comando_interpretado',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
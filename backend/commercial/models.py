@@ -78,6 +78,29 @@ class Venta(models.Model):
         self.total = self.cantidad * self.precio_unitario
         super().save(*args, **kwargs)
 
+class VentaDiaria(models.Model):
+    """
+    Resumen diario de ventas por producto y cliente. Se mantiene al guardar o
+    eliminar ventas (ver rollup.py) y se reconstruye con rebuild_sales_rollup.
+    La categoría no se copia: se obtiene del producto al consultar.
+    """
+    fecha = models.DateField()
+    producto = models.ForeignKey(Producto, on_delete=models.CASCADE, related_name='ventas_diarias')
+    cliente = models.ForeignKey(Cliente, on_delete=models.CASCADE, related_name='ventas_diarias')
+    cantidad_ventas = models.IntegerField(default=0)
+    unidades = models.IntegerField(default=0)
+    ingresos = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        db_table = 'ventas_diarias'
+        verbose_name = 'Venta Diaria'
+        verbose_name_plural = 'Ventas Diarias'
+        unique_together = ['fecha', 'producto', 'cliente']
+        indexes = [models.Index(fields=['fecha'], name='ventas_diarias_fecha_idx')]
+
+    def __str__(self):
+        return f"{self.fecha} - Producto {self.producto_id} - Cliente {self.cliente_id}"
+
 class CarritoCompra(models.Model):
     cliente = models.ForeignKey(Cliente, on_delete=models.CASCADE, related_name='carritos')
     producto = models.ForeignKey(Producto, on_delete=models.CASCADE, related_name='carritos')
@@ -124,22 +147,48 @@ class ReporteGenerado(models.Model):
     FORMATO_CHOICES = [
         ('PDF', 'PDF'),
         ('EXCEL', 'Excel'),
+        ('CSV', 'CSV'),
+        ('PARQUET', 'Parquet'),
         ('JSON', 'JSON'),
     ]
+
+    ESTADO_CHOICES = [
+        ('PENDIENTE', 'Pendiente'),
+        ('PROCESANDO', 'Procesando'),
+        ('COMPLETADO', 'Completado'),
+        ('FALLIDO', 'Fallido'),
+    ]
     
     usuario = models.ForeignKey(Usuario, on_delete=models.CASCADE)
     prompt = models.TextField()
     formato_solicitado = models.CharField(max_length=10, choices=FORMATO_CHOICES)
+    # Comando interpretado al encolar: se genera con esas fechas aunque el
+    # reporte se procese otro día ("este mes", "hoy")
+    comando_interpretado = models.JSONField(null=True, blank=True)
     consulta_sql = models.TextField(blank=True, null=True)
-    resultado = models.JSONField(blank=True, null=True)
+    # Filas del reporte; la copia de las filas es opcional (REPORT_STORE_RESULTS)
+    # y se guarda como JSON comprimido con zlib
+    cantidad_resultados = models.PositiveIntegerField(null=True, blank=True)
+    resultado_comprimido = models.BinaryField(null=True, blank=True)
     archivo_generado = models.FileField(upload_to='reportes/', blank=True, null=True)
     fecha_creacion = models.DateTimeField(auto_now_add=True)
     tiempo_ejecucion = models.FloatField(blank=True, null=True)
+
+    # Generación en segundo plano (los reportes síncronos nacen COMPLETADO)
+    estado = models.CharField(max_length=12, choices=ESTADO_CHOICES, default='COMPLETADO')
+    error = models.TextField(blank=True)
+    fecha_inicio = models.DateTimeField(null=True, blank=True)
+    fecha_fin = models.DateTimeField(null=True, blank=True)
     
     class Meta:
         db_table = 'reportes_generados'
         verbose_name = 'Reporte Generado'
         verbose_name_plural = 'Reportes Generados'
+        indexes = [
+            models.Index(fields=['estado', 'fecha_creacion'], name='reporte_estado_idx'),
+            # Historial paginado por id descendente de cada usuario
+            models.Index(fields=['usuario', '-id'], name='reporte_usuario_id_idx'),
+        ]
     
     def __str__(self):
         return f"Reporte {self.id} - {self.usuario.username}"
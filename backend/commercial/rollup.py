@@ -0,0 +1,119 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DecimalField, F, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+BULK_BATCH_SIZE = 5000
+
+
+def rollup_enabled():
+    """
+    Los reportes agrupados y las estadísticas leen de ventas_diarias. El
+    resumen se mantiene con las señales de Venta: las cargas masivas que no
+    las disparan (bulk_create, queryset.update, SQL directo) deben ejecutar
+    rebuild_rollup / rebuild_sales_rollup al terminar.
+    """
+    return getattr(settings, 'SALES_ROLLUP_ENABLED', True)
+
+
+def venta_key(venta):
+    """Fila del resumen a la que pertenece una venta"""
+    return {
+        'fecha': timezone.localtime(venta.fecha_venta).date(),
+        'producto_id': venta.producto_id,
+        'cliente_id': venta.cliente_id,
+    }
+
+
+def venta_revenue(venta):
+    return venta.total if venta.total is not None else venta.cantidad * venta.precio_unitario
+
+
+def apply_delta(key, count, units, revenue):
+    """
+    Suma (o resta, con valores negativos) una venta a su fila diaria con un
+    UPDATE atómico; si la fila no existe la crea.
+    """
+    from .models import VentaDiaria
+
+    updated = VentaDiaria.objects.filter(**key).update(
+        cantidad_ventas=F('cantidad_ventas') + count,
+        unidades=F('unidades') + units,
+        ingresos=F('ingresos') + revenue,
+    )
+
+    if updated:
+        if count < 0:
+            VentaDiaria.objects.filter(**key, cantidad_ventas__lte=0).delete()
+        return
+
+    if count <= 0:
+        # La fila ya no existe (p. ej. borrada en cascada con el producto)
+        return
+
+    try:
+        with transaction.atomic():
+            VentaDiaria.objects.create(
+                **key,
+                cantidad_ventas=count, unidades=units, ingresos=revenue
+            )
+    except IntegrityError:
+        # Otra transacción creó la fila entre el UPDATE y el INSERT
+        VentaDiaria.objects.filter(**key).update(
+            cantidad_ventas=F('cantidad_ventas') + count,
+            unidades=F('unidades') + units,
+            ingresos=F('ingresos') + revenue,
+        )
+
+
+def add_venta(venta, sign=1):
+    apply_delta(venta_key(venta), sign, sign * venta.cantidad, sign * venta_revenue(venta))
+
+
+def rebuild_rollup(since=None):
+    """
+    Recalcula el resumen desde ventas (completo o desde la fecha since).
+    Retorna la cantidad de filas creadas.
+    """
+    from .models import Venta, VentaDiaria
+
+    ventas = Venta.objects.annotate(dia=TruncDate('fecha_venta'))
+    existing = VentaDiaria.objects.all()
+    if since:
+        ventas = ventas.filter(dia__gte=since)
+        existing = existing.filter(fecha__gte=since)
+
+    aggregated = ventas.values(
+        'dia', 'producto_id', 'cliente_id'
+    ).annotate(
+        n=Count('id'),
+        units=Sum('cantidad'),
+        revenue=Sum(Coalesce(
+            'total', F('cantidad') * F('precio_unitario'),
+            output_field=DecimalField(max_digits=14, decimal_places=2)
+        )),
+    ).order_by()
+
+    created = 0
+    with transaction.atomic():
+        existing.delete()
+        batch = []
+        for row in aggregated.iterator(chunk_size=BULK_BATCH_SIZE):
+            batch.append(VentaDiaria(
+                fecha=row['dia'],
+                producto_id=row['producto_id'],
+                cliente_id=row['cliente_id'],
+                cantidad_ventas=row['n'],
+                unidades=row['units'] or 0,
+                ingresos=row['revenue'] or 0,
+            ))
+            if len(batch) >= BULK_BATCH_SIZE:
+                VentaDiaria.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+        if batch:
+            VentaDiaria.objects.bulk_create(batch)
+            created += len(batch)
+
+    return created
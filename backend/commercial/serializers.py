@@ -1,13 +1,32 @@
 from rest_framework import serializers
 from .models import Categoria, Producto, Cliente, Venta, CarritoCompra, Pago, OrdenCompra
 
+class EagerLoadingMixin:
+    """
+    Cada serializer declara las relaciones que lee (select_related para
+    FK/uno a uno, prefetch_related para relaciones múltiples) y las vistas
+    las aplican con setup_eager_loading: una consulta por listado en lugar
+    de una por fila.
+    """
+    select_related_fields = []
+    prefetch_related_fields = []
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        if cls.select_related_fields:
+            queryset = queryset.select_related(*cls.select_related_fields)
+        if cls.prefetch_related_fields:
+            queryset = queryset.prefetch_related(*cls.prefetch_related_fields)
+        return queryset
+
 class CategoriaSerializer(serializers.ModelSerializer):
     class Meta:
         model = Categoria
         fields = ['id', 'nombre', 'descripcion', 'activo']
 
-class ProductoSerializer(serializers.ModelSerializer):
+class ProductoSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     categoria_nombre = serializers.CharField(source='categoria.nombre', read_only=True)
+    select_related_fields = ['categoria']
     
     class Meta:
         model = Producto
@@ -16,8 +35,10 @@ class ProductoSerializer(serializers.ModelSerializer):
             'precio', 'stock', 'activo', 'fecha_creacion'
         ]
 
-class ClienteSerializer(serializers.ModelSerializer):
+class ClienteSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     usuario_info = serializers.SerializerMethodField(read_only=True)
+    # usuario es el lado inverso del uno a uno Usuario.cliente
+    select_related_fields = ['usuario']
     
     class Meta:
         model = Cliente
@@ -34,10 +55,11 @@ class ClienteSerializer(serializers.ModelSerializer):
             }
         return None
 
-class VentaSerializer(serializers.ModelSerializer):
+class VentaSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     cliente_nombre = serializers.CharField(source='cliente.nombre', read_only=True)
     producto_nombre = serializers.CharField(source='producto.nombre', read_only=True)
     total_calculado = serializers.SerializerMethodField(read_only=True)
+    select_related_fields = ['cliente', 'producto']
     
     class Meta:
         model = Venta
@@ -64,12 +86,13 @@ class VentaSerializer(serializers.ModelSerializer):
         
         return data
 
-class CarritoCompraSerializer(serializers.ModelSerializer):
+class CarritoCompraSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     producto_nombre = serializers.CharField(source='producto.nombre', read_only=True)
     producto_precio = serializers.DecimalField(source='producto.precio', read_only=True, max_digits=10, decimal_places=2)
     producto_stock = serializers.IntegerField(source='producto.stock', read_only=True)
     producto_imagen = serializers.CharField(source='producto.imagen', read_only=True, allow_null=True)
     subtotal = serializers.SerializerMethodField(read_only=True)
+    select_related_fields = ['producto']
     
     class Meta:
         model = CarritoCompra
@@ -103,9 +126,10 @@ class AgregarAlCarritoSerializer(serializers.Serializer):
 class ActualizarCantidadSerializer(serializers.Serializer):
     cantidad = serializers.IntegerField(min_value=1)
 
-class PagoSerializer(serializers.ModelSerializer):
+class PagoSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     cliente_nombre = serializers.CharField(source='cliente.nombre', read_only=True)
     venta_id = serializers.IntegerField(source='venta.id', read_only=True, allow_null=True)
+    select_related_fields = ['cliente', 'venta']
 
     class Meta:
         model = Pago
@@ -117,9 +141,10 @@ class PagoSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['fecha_creacion', 'fecha_pago']
 
-class OrdenCompraSerializer(serializers.ModelSerializer):
+class OrdenCompraSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     cliente_nombre = serializers.CharField(source='cliente.nombre', read_only=True)
     items_detallados = serializers.SerializerMethodField(read_only=True)
+    select_related_fields = ['cliente']
 
     class Meta:
         model = OrdenCompra
@@ -0,0 +1,28 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from .models import Venta
+from . import rollup
+
+
+@receiver(pre_save, sender=Venta)
+def remember_previous_venta(sender, instance, raw=False, **kwargs):
+    """Guarda la versión anterior para descontarla del resumen diario"""
+    instance._rollup_previous = None
+    if raw or not instance.pk:
+        return
+    instance._rollup_previous = Venta.objects.filter(pk=instance.pk).first()
+
+
+@receiver(post_save, sender=Venta)
+def update_rollup_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_rollup_previous', None)
+    if previous is not None:
+        rollup.add_venta(previous, sign=-1)
+    rollup.add_venta(instance)
+
+
+@receiver(post_delete, sender=Venta)
+def update_rollup_on_delete(sender, instance, **kwargs):
+    rollup.add_venta(instance, sign=-1)
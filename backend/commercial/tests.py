@@ -1,3 +1,93 @@
+from decimal import Decimal
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from backend.access_control.models import Rol, Usuario
+from .models import Categoria, Producto, Cliente, Venta, CarritoCompra, Pago, OrdenCompra
 
-# Create your tests here.
+
+class QueryCountTests(TestCase):
+    """
+    Las consultas por endpoint no deben crecer con la cantidad de filas:
+    cada relación que lee un serializer tiene que venir en la consulta del
+    listado (select_related_fields / prefetch_related_fields).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Usuario.objects.create_user(
+            username='admin', password='x', rol=Rol.objects.create(nombre='Administrador')
+        )
+        cls.rol_cliente = Rol.objects.create(nombre='Cliente')
+        cls.cliente = Cliente.objects.create(nombre='Cliente propio', email='propio@example.com')
+        cls.usuario_cliente = Usuario.objects.create_user(
+            username='cliente', password='x', rol=cls.rol_cliente, cliente=cls.cliente
+        )
+
+    def setUp(self):
+        self.rows = 0
+
+    def create_rows(self, n, cliente=None):
+        """n filas de cada modelo, cada una con relaciones propias"""
+        for _ in range(n):
+            self.rows += 1
+            i = self.rows
+            categoria = Categoria.objects.create(nombre=f'Categoría {i}')
+            producto = Producto.objects.create(
+                nombre=f'Producto {i}', categoria=categoria, precio=Decimal('10.50'), stock=100
+            )
+            owner = cliente or Cliente.objects.create(nombre=f'Cliente {i}', email=f'c{i}@example.com')
+            if cliente is None:
+                Usuario.objects.create_user(username=f'usuario{i}', password='x', rol=self.rol_cliente, cliente=owner)
+            venta = Venta.objects.create(cliente=owner, producto=producto, cantidad=2, precio_unitario=producto.precio)
+            CarritoCompra.objects.create(cliente=owner, producto=producto, cantidad=1)
+            pago = Pago.objects.create(cliente=owner, venta=venta, monto=venta.total)
+            OrdenCompra.objects.create(cliente=owner, items=[], total=venta.total, pago=pago)
+
+    def count_queries(self, user, url):
+        client = APIClient()
+        client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return queries
+
+    def assertConstantQueries(self, url, user=None, cliente=None):
+        user = user or self.admin
+        self.create_rows(2, cliente)
+        few = self.count_queries(user, url)
+        self.create_rows(10, cliente)
+        many = self.count_queries(user, url)
+        self.assertEqual(
+            len(few), len(many),
+            f'{url}: {len(few)} consultas con pocas filas y {len(many)} con más:\n'
+            + '\n'.join(query['sql'] for query in many.captured_queries)
+        )
+
+    def test_productos(self):
+        self.assertConstantQueries('/api/commercial/productos/')
+
+    def test_clientes(self):
+        self.assertConstantQueries('/api/commercial/clientes/')
+
+    def test_ventas(self):
+        self.assertConstantQueries('/api/commercial/ventas/')
+
+    def test_carrito(self):
+        self.assertConstantQueries('/api/commercial/carrito/')
+
+    def test_pagos(self):
+        self.assertConstantQueries('/api/commercial/pagos/')
+
+    def test_ordenes(self):
+        self.assertConstantQueries('/api/commercial/ordenes/')
+
+    def test_mis_ventas(self):
+        self.assertConstantQueries('/api/commercial/ventas/mis_ventas/', self.usuario_cliente, self.cliente)
+
+    def test_mi_carrito(self):
+        self.assertConstantQueries('/api/commercial/carrito/mi_carrito/', self.usuario_cliente, self.cliente)
+
+    def test_resumen_carrito(self):
+        self.assertConstantQueries('/api/commercial/carrito/resumen/', self.usuario_cliente, self.cliente)
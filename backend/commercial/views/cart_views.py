@@ -21,14 +21,17 @@ class CarritoCompraViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
+        # Relaciones que lee el serializer, cargadas en la misma consulta
+        queryset = self.get_serializer_class().setup_eager_loading(CarritoCompra.objects.all())
+
         # Los clientes solo ven su propio carrito
         if self.request.user.rol and self.request.user.rol.nombre == 'Cliente':
             if hasattr(self.request.user, 'cliente') and self.request.user.cliente:
-                return CarritoCompra.objects.filter(cliente=self.request.user.cliente)
-            return CarritoCompra.objects.none()
+                return queryset.filter(cliente=self.request.user.cliente)
+            return queryset.none()
         
         # Administradores ven todos los carritos
-        return CarritoCompra.objects.all()
+        return queryset
 
     def perform_create(self, serializer):
         # Asignar automáticamente el cliente del usuario autenticado
@@ -58,7 +61,9 @@ class CarritoCompraViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        carrito = CarritoCompra.objects.filter(cliente=request.user.cliente)
+        carrito = CarritoCompraSerializer.setup_eager_loading(
+            CarritoCompra.objects.filter(cliente=request.user.cliente)
+        )
         serializer = self.get_serializer(carrito, many=True)
         
         # Calcular totales
@@ -246,7 +251,7 @@ class CarritoCompraViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        carrito = CarritoCompra.objects.filter(cliente=request.user.cliente)
+        carrito = CarritoCompra.objects.filter(cliente=request.user.cliente).select_related('producto')
         
         total_items = carrito.count()
         total_cantidad = carrito.aggregate(total=Sum('cantidad'))['total'] or 0
@@ -277,7 +282,7 @@ class CarritoCompraViewSet(viewsets.ModelViewSet):
             )
         
         cliente = request.user.cliente
-        carrito_items = CarritoCompra.objects.filter(cliente=cliente)
+        carrito_items = CarritoCompra.objects.filter(cliente=cliente).select_related('producto')
         
         if not carrito_items.exists():
             return Response(
@@ -14,14 +14,17 @@ class ClienteViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
+        # Relaciones que lee el serializer, cargadas en la misma consulta
+        queryset = self.get_serializer_class().setup_eager_loading(Cliente.objects.all())
+
         # Los clientes solo pueden ver su propia información
         if self.request.user.rol and self.request.user.rol.nombre == 'Cliente':
             if hasattr(self.request.user, 'cliente') and self.request.user.cliente:
-                return Cliente.objects.filter(id=self.request.user.cliente.id)
-            return Cliente.objects.none()
+                return queryset.filter(id=self.request.user.cliente.id)
+            return queryset.none()
         
         # Administradores ven todos los clientes
-        return Cliente.objects.all()
+        return queryset
 
     @action(detail=False, methods=['get'])
     def mi_perfil(self, request):
@@ -9,7 +9,7 @@ from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 import json
 
-from ..models import Pago, OrdenCompra, Cliente, Venta, CarritoCompra
+from ..models import Pago, OrdenCompra, Cliente, Venta, CarritoCompra, Producto
 from ..serializers import PagoSerializer, OrdenCompraSerializer, CrearSesionPagoSerializer
 from ..services.stripe_service import StripeService
 from backend.access_control.models import Bitacora
@@ -23,14 +23,17 @@ class PagoViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
+        # Relaciones que lee el serializer, cargadas en la misma consulta
+        queryset = self.get_serializer_class().setup_eager_loading(Pago.objects.all())
+
         # Los clientes solo ven sus propios pagos
         if self.request.user.rol and self.request.user.rol.nombre == 'Cliente':
             if hasattr(self.request.user, 'cliente') and self.request.user.cliente:
-                return Pago.objects.filter(cliente=self.request.user.cliente)
-            return Pago.objects.none()
+                return queryset.filter(cliente=self.request.user.cliente)
+            return queryset.none()
         
         # Administradores ven todos los pagos
-        return Pago.objects.all()
+        return queryset
 
     @action(detail=False, methods=['post'])
     def crear_sesion_pago(self, request):
@@ -154,7 +157,7 @@ class PagoViewSet(viewsets.ModelViewSet):
         try:
             with transaction.atomic():
                 # Obtener items del carrito
-                carrito_items = CarritoCompra.objects.filter(cliente=cliente)
+                carrito_items = CarritoCompra.objects.filter(cliente=cliente).select_related('producto')
                 
                 if not carrito_items.exists():
                     return Response(
@@ -284,14 +287,17 @@ class OrdenCompraViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
+        # Relaciones que lee el serializer, cargadas en la misma consulta
+        queryset = self.get_serializer_class().setup_eager_loading(OrdenCompra.objects.all())
+
         # Los clientes solo ven sus propias órdenes
         if self.request.user.rol and self.request.user.rol.nombre == 'Cliente':
             if hasattr(self.request.user, 'cliente') and self.request.user.cliente:
-                return OrdenCompra.objects.filter(cliente=self.request.user.cliente)
-            return OrdenCompra.objects.none()
+                return queryset.filter(cliente=self.request.user.cliente)
+            return queryset.none()
         
         # Administradores ven todas las órdenes
-        return OrdenCompra.objects.all()
+        return queryset
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
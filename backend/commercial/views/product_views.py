@@ -13,4 +13,6 @@ class ProductoViewSet(viewsets.ReadOnlyModelViewSet):
 
     def get_queryset(self):
         # Filtrar productos activos y con stock
-        return Producto.objects.filter(activo=True, stock__gt=0)
\ No newline at end of file
+        return self.get_serializer_class().setup_eager_loading(
+            Producto.objects.filter(activo=True, stock__gt=0)
+        )
\ No newline at end of file
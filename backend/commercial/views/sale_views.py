@@ -3,7 +3,8 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.db import transaction
-from ..models import Venta, Producto, Cliente
+from ..models import Venta, VentaDiaria, Producto, Cliente
+from ..rollup import rollup_enabled
 from ..serializers import VentaSerializer
 from backend.access_control.models import Bitacora
 
@@ -16,14 +17,17 @@ class VentaViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
+        # Relaciones que lee el serializer, cargadas en la misma consulta
+        queryset = self.get_serializer_class().setup_eager_loading(Venta.objects.all())
+
         # Los clientes solo ven sus propias ventas
         if self.request.user.rol and self.request.user.rol.nombre == 'Cliente':
             if hasattr(self.request.user, 'cliente') and self.request.user.cliente:
-                return Venta.objects.filter(cliente=self.request.user.cliente)
-            return Venta.objects.none()
+                return queryset.filter(cliente=self.request.user.cliente)
+            return queryset.none()
         
         # Administradores ven todas las ventas
-        return Venta.objects.all()
+        return queryset
 
     @transaction.atomic
     def perform_create(self, serializer):
@@ -98,7 +102,9 @@ class VentaViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        ventas = Venta.objects.filter(cliente=request.user.cliente).order_by('-fecha_venta')
+        ventas = VentaSerializer.setup_eager_loading(
+            Venta.objects.filter(cliente=request.user.cliente)
+        ).order_by('-fecha_venta')
         serializer = self.get_serializer(ventas, many=True)
         return Response(serializer.data)
 
@@ -118,6 +124,10 @@ class VentaViewSet(viewsets.ModelViewSet):
         
         # Ventas del último mes
         ultimo_mes = datetime.now() - timedelta(days=30)
+
+        if rollup_enabled():
+            return Response(self._estadisticas_desde_resumen(ultimo_mes))
+
         ventas_ultimo_mes = Venta.objects.filter(fecha_venta__gte=ultimo_mes)
         
         estadisticas = {
@@ -132,4 +142,38 @@ class VentaViewSet(viewsets.ModelViewSet):
             'promedio_venta': Venta.objects.aggregate(Avg('total'))['total__avg'] or 0,
         }
         
-        return Response(estadisticas)
\ No newline at end of file
+        return Response(estadisticas)
+
+    def _estadisticas_desde_resumen(self, ultimo_mes):
+        """
+        Mismas estadísticas leyendo ventas_diarias. El último mes combina los
+        días completos del resumen con las ventas del primer día parcial.
+        """
+        from django.db.models import Sum
+        from django.utils import timezone
+        from datetime import datetime, timedelta
+
+        desde = timezone.make_aware(ultimo_mes) if timezone.is_naive(ultimo_mes) else ultimo_mes
+        primer_dia_completo = timezone.localtime(desde).date() + timedelta(days=1)
+        inicio_dia_completo = timezone.make_aware(datetime.combine(primer_dia_completo, datetime.min.time()))
+
+        totales = VentaDiaria.objects.aggregate(ventas=Sum('cantidad_ventas'), ingresos=Sum('ingresos'))
+        mes = VentaDiaria.objects.filter(fecha__gte=primer_dia_completo).aggregate(
+            ventas=Sum('cantidad_ventas'), ingresos=Sum('ingresos')
+        )
+        parcial = Venta.objects.filter(fecha_venta__gte=desde, fecha_venta__lt=inicio_dia_completo)
+
+        total_ventas = totales['ventas'] or 0
+        ingresos_totales = totales['ingresos'] or 0
+
+        return {
+            'total_ventas': total_ventas,
+            'ventas_ultimo_mes': (mes['ventas'] or 0) + parcial.count(),
+            'ingresos_totales': ingresos_totales,
+            'ingresos_ultimo_mes': (mes['ingresos'] or 0) + (parcial.aggregate(Sum('total'))['total__sum'] or 0),
+            'producto_mas_vendido': VentaDiaria.objects.values('producto__nombre')
+                .annotate(total=Sum('unidades'))
+                .order_by('-total')
+                .first(),
+            'promedio_venta': ingresos_totales / total_ventas if total_ventas else 0,
+        }
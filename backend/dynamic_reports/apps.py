@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class DynamicReportsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'backend.dynamic_reports'
+
+    def ready(self):
+        from . import signals  # noqa: F401
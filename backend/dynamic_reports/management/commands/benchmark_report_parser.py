@@ -0,0 +1,91 @@
+from django.core.management.base import BaseCommand
+import json
+import platform
+import time
+from backend.commercial.models import ReporteGenerado
+from backend.dynamic_reports.utils.report_parser import ReportParser
+
+# Comandos tomados de la interfaz (ejemplos de texto y voz) y del uso habitual
+PROMPT_CORPUS = [
+    "Quiero un reporte de ventas del mes de septiembre, agrupado por producto, en PDF",
+    "Muestra las ventas del periodo del 01/10/2024 al 01/01/2025 en Excel",
+    "Reporte de productos más vendidos este año",
+    "Clientes con más compras en el último mes agrupado por cliente",
+    "ventas de hoy",
+    "ventas de ayer en pantalla",
+    "reporte de ventas de esta semana agrupado por cliente",
+    "ventas del 15 de agosto al 30 de septiembre en excel",
+    "ventas desde el lunes agrupado por producto",
+    "monto total de ventas del mes de diciembre de 2024 agrupado por mes",
+    "ventas del 2024-01-01 al 2024-06-30 en csv",
+    "transacciones de este mes con nombre del cliente y cantidad en parquet",
+    "listado de clientes",
+    "reporte de ventas agrupado por categoría en pdf",
+]
+
+
+class Command(BaseCommand):
+    help = ('Micro-benchmark de ReportParser sobre un corpus de comandos reales: '
+            'tiempo por comando sin memo y con memo, en JSON')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=2000,
+                            help='Pasadas sobre el corpus')
+        parser.add_argument('--from-history', type=int, default=0,
+                            help='Agrega los últimos N prompts guardados en ReporteGenerado')
+        parser.add_argument('--output', type=str, default=None,
+                            help='Archivo donde escribir el JSON (por defecto stdout)')
+
+    def handle(self, *args, **options):
+        corpus = list(PROMPT_CORPUS)
+        if options['from_history']:
+            corpus += list(ReporteGenerado.objects.order_by('-id').values_list(
+                'prompt', flat=True
+            )[:options['from_history']])
+
+        iterations = options['iterations']
+        calls = iterations * len(corpus)
+        parser = ReportParser()
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for prompt in corpus:
+                parser.parse_uncached(prompt)
+        uncached = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for prompt in corpus:
+                parser.parse_command(prompt)
+        cached = time.perf_counter() - start
+
+        info = parser.cache_info()
+        report = {
+            'environment': {
+                'python': platform.python_version(),
+                'prompts': len(corpus),
+                'iterations': iterations,
+            },
+            'uncached_us_per_call': round(uncached / calls * 1e6, 2),
+            'cached_us_per_call': round(cached / calls * 1e6, 2),
+            'speedup': round(uncached / cached, 1),
+            'cache': {'hits': info.hits, 'misses': info.misses, 'size': info.currsize},
+            'parsed': {prompt: self._summary(parser.parse_command(prompt)) for prompt in corpus},
+        }
+
+        output = json.dumps(report, indent=2, ensure_ascii=False, default=str)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(output)
+            self.stderr.write(self.style.SUCCESS(f"Resultados escritos en {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+    def _summary(self, parsed):
+        """Lo interpretado por comando, para revisar el corpus junto a los tiempos"""
+        return {
+            'report_type': parsed['report_type'],
+            'date_range': [d.date().isoformat() for d in parsed['date_range']],
+            'group_by': parsed['group_by'],
+            'output_format': parsed['output_format'],
+        }
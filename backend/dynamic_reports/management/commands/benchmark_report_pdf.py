@@ -0,0 +1,127 @@
+from django.core.management.base import BaseCommand
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from decimal import Decimal
+from io import BytesIO
+import json
+import platform
+import re
+import time
+import tracemalloc
+import reportlab
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
+from backend.dynamic_reports.utils.pdf_generator import PDFGenerator, ROWS_PER_TABLE, max_pdf_rows
+
+PAGE_PATTERN = re.compile(rb'/Type /Page\b(?!s)')
+
+
+def synthetic_rows(size):
+    """Filas con la forma de la plantilla ventas_detalle, generadas al vuelo"""
+    start = datetime(2024, 1, 1)
+    for i in range(size):
+        yield {
+            'id': i + 1,
+            'fecha_venta': start + timedelta(minutes=i),
+            'cantidad': i % 7 + 1,
+            'precio_total': Decimal(i % 500) + Decimal('0.99'),
+            'producto_nombre': f'Producto {i % 120}',
+            'cliente_nombre': f'Cliente {i % 900}',
+        }
+
+
+def legacy_pdf(rows, output):
+    """Render anterior: una sola tabla con todas las filas y su estilo en línea"""
+    rows = list(rows)
+    headers = list(rows[0].keys())
+    table = Table([headers] + [[str(row[header]) for header in headers] for row in rows])
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    SimpleDocTemplate(output, pagesize=A4, topMargin=1*inch).build([table])
+
+
+class Command(BaseCommand):
+    help = ('Mide la generación de reportes PDF (tablas por página frente a la tabla '
+            'única anterior) con filas sintéticas y emite JSON')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                            help='Cantidades de filas a medir')
+        parser.add_argument('--max-rows', type=int, default=None,
+                            help='Filas dibujadas en el PDF (por defecto REPORT_PDF_MAX_ROWS)')
+        parser.add_argument('--legacy-max-size', type=int, default=10000,
+                            help='Mide también el render anterior hasta este tamaño (0 lo desactiva)')
+        parser.add_argument('--no-memory', action='store_true',
+                            help='Desactiva tracemalloc (tiempos sin su sobrecarga, sin pico de memoria)')
+        parser.add_argument('--output', type=str, default=None,
+                            help='Archivo donde escribir el JSON (por defecto stdout)')
+
+    def handle(self, *args, **options):
+        self.trace_memory = not options['no_memory']
+        max_rows = options['max_rows'] if options['max_rows'] is not None else max_pdf_rows()
+        report = {
+            'environment': {
+                'python': platform.python_version(),
+                'reportlab': reportlab.Version,
+                'rows_per_table': ROWS_PER_TABLE,
+                'max_rows': max_rows,
+                'tracemalloc': self.trace_memory,
+            },
+            'results': [],
+        }
+        parsed_command = {'report_type': 'ventas', 'original_command': 'benchmark de reporte PDF'}
+
+        for size in options['sizes']:
+            self.stderr.write(f"Midiendo PDF de {size} filas...")
+            result = {'rows': size}
+
+            def chunked(output):
+                PDFGenerator().write_pdf(synthetic_rows(size), parsed_command, output, max_rows=max_rows)
+            result['chunked'] = self._measure(chunked)
+
+            if size <= options['legacy_max_size']:
+                result['legacy'] = self._measure(lambda output: legacy_pdf(synthetic_rows(size), output))
+                result['speedup'] = round(result['legacy']['seconds'] / result['chunked']['seconds'], 2)
+
+            report['results'].append(result)
+
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(output)
+            self.stderr.write(self.style.SUCCESS(f"Resultados escritos en {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+    def _measure(self, render):
+        buffer = BytesIO()
+        with self._tracking() as stats:
+            render(buffer)
+        pdf = buffer.getvalue()
+        stats['bytes'] = len(pdf)
+        stats['pages'] = len(PAGE_PATTERN.findall(pdf))
+        return stats
+
+    @contextmanager
+    def _tracking(self):
+        stats = {}
+        if self.trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            stats['seconds'] = round(time.perf_counter() - start, 3)
+            if self.trace_memory:
+                stats['peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 1)
+                tracemalloc.stop()
@@ -0,0 +1,141 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import speech_recognition as sr
+from backend.dynamic_reports.speech import TranscriptionError, transcription_service, validate_backend
+from backend.dynamic_reports.utils.audio_converter import (
+    SAMPLE_RATE, SAMPLE_WIDTH, convertir_audio_a_pcm, resolve_ffmpeg
+)
+
+
+def synthetic_clip(ffmpeg_path, seconds):
+    """Clip WebM/Opus como el que envía MediaRecorder del navegador, en memoria"""
+    result = subprocess.run(
+        [
+            ffmpeg_path, '-hide_banner', '-loglevel', 'error',
+            '-f', 'lavfi', '-i', f'anoisesrc=d={seconds}:c=pink:a=0.1',
+            '-ac', '1', '-ar', '48000', '-c:a', 'libopus', '-b:a', '32k',
+            '-f', 'webm', 'pipe:1',
+        ],
+        capture_output=True, check=True,
+    )
+    return result.stdout
+
+
+def temp_file_decode(ffmpeg_path, clip):
+    """
+    Flujo anterior: subida a archivo temporal, conversión a un segundo WAV
+    temporal y lectura con sr.AudioFile. (El flujo original además lanzaba
+    ffprobe desde pydub, así que esto subestima su costo.)
+    """
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.webm') as tmp_in:
+        tmp_in.write(clip)
+    tmp_out = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
+    tmp_out.close()
+    try:
+        subprocess.run(
+            [
+                ffmpeg_path, '-hide_banner', '-loglevel', 'error', '-y',
+                '-i', tmp_in.name, '-ac', '1', '-ar', str(SAMPLE_RATE),
+                '-acodec', 'pcm_s16le', tmp_out.name,
+            ],
+            capture_output=True, check=True,
+        )
+        with sr.AudioFile(tmp_out.name) as source:
+            return sr.Recognizer().record(source)
+    finally:
+        os.unlink(tmp_in.name)
+        os.unlink(tmp_out.name)
+
+
+def in_memory_decode(ffmpeg_path, clip):
+    return sr.AudioData(convertir_audio_a_pcm(clip, ffmpeg_path), SAMPLE_RATE, SAMPLE_WIDTH)
+
+
+class Command(BaseCommand):
+    help = ('Mide la latencia por comando de voz (decodificación con archivos temporales '
+            'frente a tuberías en memoria) sobre clips de 5-15 s y emite JSON')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--durations', type=int, nargs='+', default=[5, 10, 15],
+                            help='Duraciones de los clips en segundos')
+        parser.add_argument('--repeat', type=int, default=10,
+                            help='Mediciones por clip y flujo')
+        parser.add_argument('--ffmpeg', type=str, default=None,
+                            help='Ruta de ffmpeg (por defecto la configurada para las vistas)')
+        parser.add_argument('--backend', type=str, default=None,
+                            help='Incluye la transcripción con este motor (google requiere red)')
+        parser.add_argument('--output', type=str, default=None,
+                            help='Archivo donde escribir el JSON (por defecto stdout)')
+
+    def handle(self, *args, **options):
+        ffmpeg_path = options['ffmpeg']
+        if ffmpeg_path is None:
+            ffmpeg_path = resolve_ffmpeg()['ffmpeg']
+            if ffmpeg_path is None:
+                raise CommandError('No se encontró ffmpeg. Use --ffmpeg para indicar la ruta.')
+
+        report = {
+            'environment': {
+                'python': platform.python_version(),
+                'ffmpeg': ffmpeg_path,
+                'repeat': options['repeat'],
+                'backend': options['backend'],
+            },
+            'results': [],
+        }
+
+        for seconds in options['durations']:
+            self.stderr.write(f"Midiendo clip de {seconds} s...")
+            clip = synthetic_clip(ffmpeg_path, seconds)
+            result = {
+                'seconds': seconds,
+                'upload_bytes': len(clip),
+                'temp_files_ms': self._latency(lambda: temp_file_decode(ffmpeg_path, clip), options['repeat']),
+                'in_memory_ms': self._latency(lambda: in_memory_decode(ffmpeg_path, clip), options['repeat']),
+            }
+            result['speedup'] = round(result['temp_files_ms']['median'] / result['in_memory_ms']['median'], 2)
+
+            if options['backend']:
+                pcm = convertir_audio_a_pcm(clip, ffmpeg_path)
+                with override_settings(VOICE_STT_BACKEND=validate_backend(options['backend'])):
+                    # La primera llamada carga el motor; se mide aparte
+                    start = time.perf_counter()
+                    self._transcribe(pcm)
+                    result['transcribe_first_ms'] = round((time.perf_counter() - start) * 1000, 1)
+                    result['transcribe_ms'] = self._latency(lambda: self._transcribe(pcm), options['repeat'])
+
+            report['results'].append(result)
+
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(output)
+            self.stderr.write(self.style.SUCCESS(f"Resultados escritos en {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+    def _transcribe(self, pcm):
+        try:
+            transcription_service.transcribe(pcm, SAMPLE_RATE, SAMPLE_WIDTH)
+        except TranscriptionError:
+            # Ruido sintético: interesa la latencia, no el texto
+            pass
+
+    def _latency(self, run, repeat):
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            samples.append((time.perf_counter() - start) * 1000)
+        return {
+            'median': round(statistics.median(samples), 1),
+            'min': round(min(samples), 1),
+            'max': round(max(samples), 1),
+        }
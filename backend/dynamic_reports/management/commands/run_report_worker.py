@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections, connection
+import time
+from backend.dynamic_reports.report_jobs import claim_next_report, render_report
+
+class Command(BaseCommand):
+    help = (
+        'Genera en segundo plano los reportes PDF/Excel encolados, uno a la vez. '
+        'Generar archivos usa CPU (reportlab/openpyxl) y los hilos no lo '
+        'paralelizan por el GIL: para más reportes a la vez ejecute más '
+        'procesos de este comando.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='Procesa los reportes pendientes y termina')
+        parser.add_argument('--poll-interval', type=float, default=2.0,
+                            help='Segundos entre consultas cuando no hay reportes')
+
+    def handle(self, *args, **options):
+        self.stdout.write('Worker de reportes iniciado')
+        try:
+            self._work(options['once'], options['poll_interval'])
+        finally:
+            connection.close()
+        self.stdout.write('Worker de reportes detenido')
+
+    def _work(self, once, poll_interval):
+        """Reclama y genera reportes hasta que no queden (--once) o indefinidamente"""
+        while True:
+            close_old_connections()
+            try:
+                reporte = claim_next_report()
+            except DatabaseError as e:
+                # Un error de base de datos no debe detener el worker
+                self.stderr.write(f'Error reclamando reporte: {e}')
+                time.sleep(poll_interval)
+                continue
+
+            if reporte:
+                self.stdout.write(f'Generando reporte {reporte.id} ({reporte.formato_solicitado})...')
+                reporte = render_report(reporte)
+                style = self.style.SUCCESS if reporte.estado == 'COMPLETADO' else self.style.ERROR
+                self.stdout.write(style(f'Reporte {reporte.id}: {reporte.estado} {reporte.error}'.strip()))
+                continue
+
+            if once:
+                break
+
+            time.sleep(poll_interval)
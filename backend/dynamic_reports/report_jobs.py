@@ -0,0 +1,212 @@
+import tempfile
+import time
+import traceback
+from datetime import timedelta
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+from backend.access_control.models import Usuario
+from backend.commercial.models import ReporteGenerado
+from .utils.report_parser import report_parser
+from .utils.query_builder import QueryBuilder
+from .utils.report_cache import report_cache
+from .utils.pdf_generator import PDFGenerator
+from .utils.excel_generator import ExcelGenerator
+from .utils.csv_generator import CSVGenerator, dict_batches
+from .utils.parquet_generator import ParquetGenerator
+from .utils.result_store import ResultRecorder
+
+
+def write_csv(rows, parsed_command, output):
+    CSVGenerator().write_csv(dict_batches(rows), parsed_command, output)
+
+
+def write_parquet(rows, parsed_command, output):
+    ParquetGenerator().write_parquet(dict_batches(rows), parsed_command, output)
+
+
+# Formatos que se pueden generar en segundo plano: extensión y escritor
+# (filas, comando, archivo de salida)
+FILE_FORMATS = {
+    'PDF': ('pdf', PDFGenerator().write_pdf),
+    'EXCEL': ('xlsx', ExcelGenerator().write_excel),
+    'CSV': ('csv', write_csv),
+    'PARQUET': ('parquet', write_parquet),
+}
+
+ACTIVE_STATES = ['PENDIENTE', 'PROCESANDO']
+
+# Candidatos revisados por ronda al buscar un reporte de un usuario sin cupo lleno
+CLAIM_CANDIDATES = 20
+
+
+def max_running_per_user():
+    return getattr(settings, 'REPORT_JOBS_MAX_RUNNING_PER_USER', 1)
+
+
+def max_pending_per_user():
+    return getattr(settings, 'REPORT_JOBS_MAX_PENDING_PER_USER', 5)
+
+
+def stale_after():
+    return timedelta(seconds=getattr(settings, 'REPORT_JOBS_STALE_SECONDS', 1800))
+
+
+def serialize_report(reporte):
+    """Representación del reporte en segundo plano para las respuestas de la API"""
+    data = {
+        'reporte_id': reporte.id,
+        'estado': reporte.estado,
+        'formato': reporte.formato_solicitado,
+        'error': reporte.error or None,
+        'fecha_creacion': reporte.fecha_creacion.isoformat(),
+        'fecha_inicio': reporte.fecha_inicio.isoformat() if reporte.fecha_inicio else None,
+        'fecha_fin': reporte.fecha_fin.isoformat() if reporte.fecha_fin else None,
+        'tiempo_ejecucion': reporte.tiempo_ejecucion,
+        'status_url': f'/api/reports/report-jobs/{reporte.id}/',
+        'download_url': None,
+    }
+    if reporte.estado == 'COMPLETADO' and reporte.archivo_generado:
+        data['download_url'] = f'/api/reports/report-jobs/{reporte.id}/download/'
+    return data
+
+
+def report_rows(parsed_command):
+    """
+    Filas del comando sin materializarlas: desde la caché o desde un cursor
+    del lado del servidor. Retorna (sql, iterable de filas).
+    """
+    query_builder = QueryBuilder()
+    template_name, query, params = query_builder.build_query(parsed_command)
+
+    cache_key = report_cache.make_key(template_name, params, parsed_command['fields'])
+    results = report_cache.get(cache_key)
+    if results is not None:
+        return query, results
+    return query, report_cache.iter_and_store(query_builder.stream_query(query, params), cache_key)
+
+
+def fail_stale_reports():
+    """
+    Marca FALLIDO los reportes PROCESANDO cuyo worker murió sin terminarlos
+    (iniciados hace más de REPORT_JOBS_STALE_SECONDS), para que dejen de
+    ocupar el cupo del usuario. No se reencolan: el mismo reporte podría
+    volver a tumbar al worker. Retorna la cantidad de reportes marcados.
+    """
+    now = timezone.now()
+    return ReporteGenerado.objects.filter(
+        estado='PROCESANDO', fecha_inicio__lt=now - stale_after()
+    ).update(
+        estado='FALLIDO',
+        error='El worker dejó de responder mientras generaba el reporte',
+        fecha_fin=now
+    )
+
+
+def freeze_command(parsed_command):
+    """Comando interpretado listo para guardar en JSON (fechas como YYYY-MM-DD)"""
+    return {
+        **parsed_command,
+        'date_range': [
+            value.strftime('%Y-%m-%d') if hasattr(value, 'strftime') else value
+            for value in parsed_command['date_range'] or []
+        ],
+    }
+
+
+def enqueue_report(usuario, prompt, formato, parsed_command):
+    """
+    Registra un ReporteGenerado PENDIENTE con el comando ya interpretado.
+    Retorna None si el usuario ya tiene REPORT_JOBS_MAX_PENDING_PER_USER
+    reportes sin terminar.
+    """
+    fail_stale_reports()
+
+    with transaction.atomic():
+        # Bloquear al usuario serializa sus encolados concurrentes
+        Usuario.objects.select_for_update().filter(id=usuario.id).first()
+        active = ReporteGenerado.objects.filter(usuario=usuario, estado__in=ACTIVE_STATES).count()
+        if active >= max_pending_per_user():
+            return None
+
+        return ReporteGenerado.objects.create(
+            usuario=usuario,
+            prompt=prompt,
+            formato_solicitado=formato,
+            comando_interpretado=freeze_command(parsed_command),
+            estado='PENDIENTE'
+        )
+
+
+def claim_next_report():
+    """
+    Toma el reporte pendiente más antiguo cuyo usuario no haya llegado a
+    REPORT_JOBS_MAX_RUNNING_PER_USER reportes en proceso y lo marca PROCESANDO
+    """
+    limit = max_running_per_user()
+    fail_stale_reports()
+
+    with transaction.atomic():
+        busy_users = ReporteGenerado.objects.filter(estado='PROCESANDO').values('usuario').annotate(
+            n=Count('id')
+        ).filter(n__gte=limit).values('usuario')
+
+        candidates = ReporteGenerado.objects.select_for_update(skip_locked=True).filter(
+            estado='PENDIENTE'
+        ).exclude(usuario__in=busy_users).order_by('fecha_creacion')[:CLAIM_CANDIDATES]
+
+        for reporte in candidates:
+            # Recontar con el usuario bloqueado: otro worker pudo tomar uno suyo
+            Usuario.objects.select_for_update().filter(id=reporte.usuario_id).first()
+            running = ReporteGenerado.objects.filter(usuario_id=reporte.usuario_id, estado='PROCESANDO').count()
+            if running >= limit:
+                continue
+
+            reporte.estado = 'PROCESANDO'
+            reporte.fecha_inicio = timezone.now()
+            reporte.save(update_fields=['estado', 'fecha_inicio'])
+            return reporte
+
+    return None
+
+
+def render_report(reporte):
+    """
+    Genera el archivo de un reporte ya reclamado y lo guarda en
+    archivo_generado, con la cantidad de filas (y su copia comprimida si
+    REPORT_STORE_RESULTS está activo). Usa el comando interpretado al
+    encolar; los reportes anteriores a ese campo se vuelven a interpretar.
+    """
+    start_time = time.time()
+
+    try:
+        parsed_command = reporte.comando_interpretado or report_parser.parse_command(reporte.prompt)
+        query, rows = report_rows(parsed_command)
+        recorder = ResultRecorder()
+
+        # Se escribe a un temporal en disco y se copia al almacenamiento
+        extension, write = FILE_FORMATS[reporte.formato_solicitado]
+        with tempfile.TemporaryFile() as tmp:
+            write(recorder.track(rows), parsed_command, tmp)
+            tmp.seek(0)
+            reporte.archivo_generado.save(f'reporte_{reporte.id}.{extension}', File(tmp), save=False)
+
+        reporte.consulta_sql = query
+        for field, value in recorder.fields().items():
+            setattr(reporte, field, value)
+        reporte.estado = 'COMPLETADO'
+
+    except Exception as e:
+        traceback.print_exc()
+        reporte.estado = 'FALLIDO'
+        reporte.error = str(e)
+
+    reporte.tiempo_ejecucion = time.time() - start_time
+    reporte.fecha_fin = timezone.now()
+    reporte.save(update_fields=[
+        'archivo_generado', 'consulta_sql', 'estado', 'error',
+        'tiempo_ejecucion', 'fecha_fin', 'cantidad_resultados', 'resultado_comprimido'
+    ])
+    return reporte
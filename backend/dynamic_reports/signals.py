@@ -0,0 +1,17 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from backend.commercial.models import Cliente, Producto, Venta
+from .utils.report_cache import report_cache
+
+
+@receiver(post_save, sender=Venta)
+@receiver(post_delete, sender=Venta)
+@receiver(post_save, sender=Producto)
+@receiver(post_delete, sender=Producto)
+@receiver(post_save, sender=Cliente)
+@receiver(post_delete, sender=Cliente)
+def invalidate_reports_on_write(sender, **kwargs):
+    """Los reportes en caché dejan de ser válidos al cambiar ventas, productos o clientes"""
+    # Tras el commit, para que otra petición no vuelva a guardar datos previos
+    transaction.on_commit(report_cache.invalidate)
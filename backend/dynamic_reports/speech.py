@@ -0,0 +1,239 @@
+import importlib.util
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import speech_recognition as sr
+from django.conf import settings
+
+
+class TranscriptionError(Exception):
+    """No se entendió lo dicho en el audio"""
+
+
+class TranscriptionServiceError(Exception):
+    """El motor de transcripción falló o no está disponible"""
+
+
+class TranscriptionBusyError(TranscriptionServiceError):
+    """Demasiados audios esperando transcripción"""
+
+
+class GoogleBackend:
+    """Servicio web de Google (requiere red); no usa CPU local"""
+    cpu_bound = False
+
+    def __init__(self, options):
+        self.recognizer = sr.Recognizer()
+
+    def transcribe(self, pcm, sample_rate, sample_width, language):
+        try:
+            return self.recognizer.recognize_google(
+                sr.AudioData(pcm, sample_rate, sample_width), language=language
+            )
+        except sr.UnknownValueError:
+            raise TranscriptionError('No se pudo entender el audio.')
+        except sr.RequestError as e:
+            raise TranscriptionServiceError(f'Error en el servicio de reconocimiento: {e}')
+
+
+class VoskBackend:
+    """
+    Modelo local de Vosk (CPU). El modelo se carga una vez por proceso y
+    queda en memoria para los siguientes audios.
+    """
+    cpu_bound = True
+
+    @classmethod
+    def check(cls, options):
+        """Valida la configuración sin cargar el modelo (antes de levantar el pool)"""
+        if importlib.util.find_spec('vosk') is None:
+            raise TranscriptionServiceError('El motor vosk requiere el paquete vosk instalado')
+        if not os.path.isdir(options.get('model_path') or ''):
+            raise TranscriptionServiceError('Configure VOICE_VOSK_MODEL_PATH con la carpeta del modelo vosk')
+
+    def __init__(self, options):
+        self.check(options)
+        import vosk
+
+        vosk.SetLogLevel(-1)
+        self.vosk = vosk
+        self.model = vosk.Model(options['model_path'])
+
+    def transcribe(self, pcm, sample_rate, sample_width, language):
+        recognizer = self.vosk.KaldiRecognizer(self.model, sample_rate)
+        recognizer.AcceptWaveform(bytes(pcm))
+        text = json.loads(recognizer.FinalResult()).get('text', '').strip()
+        if not text:
+            raise TranscriptionError('No se pudo entender el audio.')
+        return text
+
+
+class StubBackend:
+    """Transcripción fija, sin red ni modelo (pruebas y mediciones)"""
+    cpu_bound = False
+
+    def __init__(self, options):
+        self.text = options.get('stub_transcript') or 'reporte de ventas'
+
+    def transcribe(self, pcm, sample_rate, sample_width, language):
+        if not pcm:
+            raise TranscriptionError('No se pudo entender el audio.')
+        return self.text
+
+
+# Motores de transcripción disponibles
+BACKEND_CLASSES = {
+    'google': GoogleBackend,
+    'vosk': VoskBackend,
+    'stub': StubBackend,
+}
+
+DEFAULT_BACKEND = 'google'
+
+
+def validate_backend(name):
+    name = name or DEFAULT_BACKEND
+    if name not in BACKEND_CLASSES:
+        raise ValueError(f"Motor de voz desconocido '{name}'. Opciones: {', '.join(BACKEND_CLASSES)}")
+    return name
+
+
+# Motor cargado en cada proceso del pool (se inicializa una vez por proceso)
+_worker_backend = None
+
+
+def _init_worker(name, options):
+    global _worker_backend
+    _worker_backend = BACKEND_CLASSES[name](options)
+
+
+def _transcribe_in_worker(pcm, sample_rate, sample_width, language):
+    return _worker_backend.transcribe(pcm, sample_rate, sample_width, language)
+
+
+def _warm_up():
+    return _worker_backend is not None
+
+
+class TranscriptionService:
+    """
+    Transcribe audio PCM con el motor configurado (VOICE_STT_BACKEND). Los
+    motores locales de CPU corren en un pool de VOICE_STT_WORKERS procesos
+    con el modelo ya cargado; a lo sumo VOICE_STT_MAX_PENDING audios esperan
+    a la vez y los siguientes se rechazan. Hay un servicio por proceso web.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._backend = None
+        self._pool = None
+        self._slots = None
+        self._name = None
+
+    def _options(self):
+        return {
+            'model_path': getattr(settings, 'VOICE_VOSK_MODEL_PATH', ''),
+            'stub_transcript': getattr(settings, 'VOICE_STUB_TRANSCRIPT', ''),
+        }
+
+    @property
+    def backend_name(self):
+        return validate_backend(getattr(settings, 'VOICE_STT_BACKEND', DEFAULT_BACKEND))
+
+    @property
+    def workers(self):
+        return getattr(settings, 'VOICE_STT_WORKERS', 2)
+
+    @property
+    def max_pending(self):
+        return getattr(settings, 'VOICE_STT_MAX_PENDING', 8)
+
+    def _ensure_started(self):
+        """
+        Levanta el motor si hace falta y retorna (pool, backend, slots) leídos
+        bajo el lock: un shutdown() concurrente no afecta a quien ya los tiene
+        """
+        name = self.backend_name
+        with self._lock:
+            if self._name == name:
+                return self._pool, self._backend, self._slots
+            self._shutdown_locked()
+
+            backend_class = BACKEND_CLASSES[name]
+            if backend_class.cpu_bound and self.workers > 0:
+                backend_class.check(self._options())
+                # spawn: los procesos no heredan conexiones ni hilos del servidor
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                    initargs=(name, self._options()),
+                )
+                # Levantar todos los procesos (y sus modelos) antes del primer audio
+                try:
+                    for future in [self._pool.submit(_warm_up) for _ in range(self.workers)]:
+                        future.result()
+                except BrokenProcessPool:
+                    self._shutdown_locked()
+                    raise TranscriptionServiceError('No se pudo cargar el motor de transcripción')
+            else:
+                self._backend = backend_class(self._options())
+
+            self._slots = threading.BoundedSemaphore(self.max_pending)
+            self._name = name
+            return self._pool, self._backend, self._slots
+
+    def transcribe(self, pcm, sample_rate, sample_width, language=None):
+        language = language or getattr(settings, 'VOICE_STT_LANGUAGE', 'es-ES')
+        pool, backend, slots = self._ensure_started()
+
+        if not slots.acquire(blocking=False):
+            raise TranscriptionBusyError('Demasiados comandos de voz en proceso. Intente de nuevo.')
+        try:
+            if pool is not None:
+                try:
+                    return pool.submit(
+                        _transcribe_in_worker, bytes(pcm), sample_rate, sample_width, language
+                    ).result()
+                except BrokenProcessPool:
+                    # Un proceso murió (p. ej. sin memoria): el próximo audio crea otro pool
+                    self._discard(pool)
+                    raise TranscriptionServiceError('El motor de transcripción se detuvo inesperadamente')
+                except (CancelledError, RuntimeError):
+                    # El pool se cerró (shutdown o cambio de motor) con el audio en espera
+                    raise TranscriptionServiceError('El motor de transcripción se reinició. Intente de nuevo.')
+            return backend.transcribe(pcm, sample_rate, sample_width, language)
+        finally:
+            slots.release()
+
+    def status(self):
+        return {
+            'backend': self._name or self.backend_name,
+            'started': self._name is not None,
+            'pool_workers': self.workers if self._pool is not None else 0,
+            'max_pending': self.max_pending,
+        }
+
+    def shutdown(self):
+        with self._lock:
+            self._shutdown_locked()
+
+    def _discard(self, pool):
+        """Cierra el pool roto, salvo que otro hilo ya lo haya reemplazado"""
+        with self._lock:
+            if self._pool is pool:
+                self._shutdown_locked()
+
+    def _shutdown_locked(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+        self._backend = None
+        self._name = None
+
+
+# Instancia global
+transcription_service = TranscriptionService()
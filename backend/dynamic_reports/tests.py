@@ -1,3 +1,54 @@
-from django.test import TestCase
+import threading
+from django.test import SimpleTestCase, override_settings
+from .speech import (
+    TranscriptionBusyError, TranscriptionError, TranscriptionService, TranscriptionServiceError
+)
 
-# Create your tests here.
+
+@override_settings(VOICE_STT_BACKEND='stub', VOICE_STUB_TRANSCRIPT='ventas de hoy', VOICE_STT_MAX_PENDING=8)
+class TranscriptionServiceTests(SimpleTestCase):
+    """Servicio de transcripción con el motor stub (sin red ni modelo)"""
+
+    def setUp(self):
+        self.service = TranscriptionService()
+        self.addCleanup(self.service.shutdown)
+
+    def test_transcribe(self):
+        self.assertEqual(self.service.transcribe(b'\x00\x01' * 100, 16000, 2), 'ventas de hoy')
+        self.assertEqual(self.service.status()['backend'], 'stub')
+        self.assertTrue(self.service.status()['started'])
+
+    def test_empty_audio(self):
+        with self.assertRaises(TranscriptionError):
+            self.service.transcribe(b'', 16000, 2)
+
+    @override_settings(VOICE_STT_MAX_PENDING=0)
+    def test_busy(self):
+        with self.assertRaises(TranscriptionBusyError):
+            self.service.transcribe(b'\x00\x01', 16000, 2)
+
+    def test_shutdown_during_transcriptions(self):
+        """Un shutdown() concurrente no deja a otro hilo con el motor en None"""
+        errors = []
+        stop = threading.Event()
+
+        def transcribe():
+            while not stop.is_set():
+                try:
+                    self.service.transcribe(b'\x00\x01', 16000, 2)
+                except TranscriptionServiceError:
+                    pass
+                except Exception as e:
+                    errors.append(e)
+                    return
+
+        threads = [threading.Thread(target=transcribe) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for _ in range(2000):
+            self.service.shutdown()
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
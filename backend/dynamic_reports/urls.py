@@ -2,15 +2,20 @@ from django.urls import path
 from .views import (
     text_report_views,
     voice_report_views,
+    report_job_views,
 )
 
 urlpatterns = [
     # CU6 - Reportes por texto
     path('text-report/', text_report_views.generate_text_report, name='text-report'),
     path('report-history/', text_report_views.get_report_history, name='report-history'),
+    path('report-history/<int:reporte_id>/resultado/', text_report_views.get_report_result, name='report-result'),
+    path('report-jobs/<int:reporte_id>/', report_job_views.get_report_job, name='report-job'),
+    path('report-jobs/<int:reporte_id>/download/', report_job_views.download_report_job, name='report-job-download'),
     
     # CU7 - Reportes por voz
     path('voice-report/', voice_report_views.process_voice_command, name='voice-report'),
+    path('voice-report/status/', voice_report_views.voice_status, name='voice-report-status'),
     
     # CU8 y CU9 están integrados en las vistas anteriores
 ]
\ No newline at end of file
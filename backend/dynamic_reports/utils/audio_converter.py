@@ -1,11 +1,22 @@
 import os
-import tempfile
-from pydub import AudioSegment
+import shutil
+import subprocess
+import threading
+from functools import lru_cache
+from django.conf import settings
+
+# Formato que recibe el reconocedor: PCM de 16 bits, mono, 16 kHz
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+
+
+class AudioConversionError(Exception):
+    """El audio recibido no se pudo decodificar"""
 
 
 def _candidate_ffmpeg_paths():
     """
-    Devuelve posibles ubicaciones de ffmpeg y ffprobe.
+    Devuelve las carpetas del proyecto donde puede estar ffmpeg.
     Adaptado a tu estructura:
     backend/
         ├── ffmpeg/
@@ -34,63 +45,184 @@ def _candidate_ffmpeg_paths():
     return paths
 
 
-def find_ffmpeg_bin():
-    """Busca ffmpeg.exe y ffprobe.exe en las rutas candidatas."""
+def _binary_name(tool):
+    """Nombre del ejecutable en esta plataforma (ffmpeg.exe en Windows)"""
+    return f'{tool}.exe' if os.name == 'nt' else tool
+
+
+def _find_tool(tool, configured=None):
+    """
+    Ruta de una herramienta y de dónde salió: la configurada (FFMPEG_BINARY /
+    FFPROBE_BINARY), la carpeta ffmpeg/bin del proyecto o el PATH del sistema.
+    """
+    if configured:
+        return (configured, 'configurado') if os.path.isfile(configured) else (None, None)
+
     for base in _candidate_ffmpeg_paths():
-        ffmpeg = os.path.join(base, 'ffmpeg.exe')
-        ffprobe = os.path.join(base, 'ffprobe.exe')
-        if os.path.exists(ffmpeg) and os.path.exists(ffprobe):
-            return ffmpeg, ffprobe
-    return None, None
+        candidate = os.path.join(base, _binary_name(tool))
+        if os.path.isfile(candidate):
+            return candidate, 'proyecto'
+
+    found = shutil.which(tool)
+    return (found, 'PATH') if found else (None, None)
+
+
+def _tool_version(path):
+    try:
+        result = subprocess.run([path, '-version'], capture_output=True, timeout=10)
+        lines = result.stdout.decode('utf-8', errors='replace').splitlines()
+        return lines[0] if lines else None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+@lru_cache(maxsize=1)
+def resolve_ffmpeg():
+    """
+    Busca ffmpeg (y ffprobe, opcional) una sola vez por proceso. No modifica
+    PATH ni variables de entorno: quien lo usa recibe la ruta absoluta.
+    resolve_ffmpeg.cache_clear() fuerza una nueva búsqueda.
+    """
+    ffmpeg, source = _find_tool('ffmpeg', getattr(settings, 'FFMPEG_BINARY', ''))
+    ffprobe, _ = _find_tool('ffprobe', getattr(settings, 'FFPROBE_BINARY', ''))
+    return {
+        'ffmpeg': ffmpeg,
+        'ffprobe': ffprobe,
+        'origen': source,
+        'version': _tool_version(ffmpeg) if ffmpeg else None,
+        'rutas_buscadas': _candidate_ffmpeg_paths(),
+    }
 
 
 def ensure_ffmpeg_configured():
     """
-    Configura ffmpeg y ffprobe para pydub.
-    Retorna (ffmpeg_path, ffprobe_path) o lanza excepción si no se encuentran.
+    Retorna (ffmpeg_path, ffprobe_path) o lanza excepción si no hay ffmpeg.
+    ffprobe_path puede ser None: la decodificación solo usa ffmpeg.
     """
-    ffmpeg_path, ffprobe_path = find_ffmpeg_bin()
-    if not ffmpeg_path or not ffprobe_path:
-        raise Exception("No se encontró ffmpeg/ffprobe en las rutas: " + ", ".join(_candidate_ffmpeg_paths()))
+    toolchain = resolve_ffmpeg()
+    if not toolchain['ffmpeg']:
+        raise Exception(
+            "No se encontró ffmpeg en las rutas: " + ", ".join(toolchain['rutas_buscadas']) + " ni en el PATH"
+        )
+    return toolchain['ffmpeg'], toolchain['ffprobe']
 
-    # Configurar pydub y variables de entorno
-    os.environ["FFMPEG_BINARY"] = ffmpeg_path
-    os.environ["FFPROBE_BINARY"] = ffprobe_path
-    os.environ["PATH"] = os.path.dirname(ffmpeg_path) + os.pathsep + os.environ.get("PATH", "")
 
-    AudioSegment.converter = ffmpeg_path
-    AudioSegment.ffprobe = ffprobe_path
-    return ffmpeg_path, ffprobe_path
+def leer_audio(uploaded_file):
+    """Bytes del audio subido (archivo de Django o bytes)"""
+    if isinstance(uploaded_file, (bytes, bytearray, memoryview)):
+        return bytes(uploaded_file)
+    return b''.join(uploaded_file.chunks())
 
 
-def convertir_audio_a_wav(uploaded_file):
+def convertir_audio_a_pcm(uploaded_file, ffmpeg_path=None):
     """
-    Convierte un archivo subido (WebM/OGG/MP3...) a WAV (PCM16, mono, 16kHz).
-    Devuelve la ruta del archivo WAV temporal.
+    Decodifica un archivo subido (WebM/OGG/MP3...) a PCM16 mono 16 kHz sin
+    archivos temporales: los bytes entran a ffmpeg por stdin y el PCM sale
+    por stdout. Retorna los bytes PCM listos para sr.AudioData.
     """
-    ensure_ffmpeg_configured()
+    if ffmpeg_path is None:
+        ffmpeg_path, _ = ensure_ffmpeg_configured()
 
-    # Guardar temporalmente el archivo recibido
-    original_name = getattr(uploaded_file, 'name', 'audio')
-    suffix = os.path.splitext(original_name)[1] or '.tmp'
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_in:
-        for chunk in uploaded_file.chunks():
-            tmp_in.write(chunk)
-        tmp_in_path = tmp_in.name
+    result = subprocess.run(
+        [
+            ffmpeg_path, '-hide_banner', '-loglevel', 'error', '-nostdin',
+            '-i', 'pipe:0',
+            '-f', 's16le', '-acodec', 'pcm_s16le',
+            '-ac', '1', '-ar', str(SAMPLE_RATE),
+            'pipe:1',
+        ],
+        input=leer_audio(uploaded_file),
+        capture_output=True,
+    )
+    if result.returncode != 0 or not result.stdout:
+        detail = result.stderr.decode('utf-8', errors='replace').strip().splitlines()
+        raise AudioConversionError(
+            "No se pudo decodificar el audio" + (f": {detail[-1]}" if detail else "")
+        )
+    return result.stdout
 
-    # Archivo temporal WAV de salida
-    tmp_out = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
-    tmp_out_path = tmp_out.name
-    tmp_out.close()
 
-    try:
-        sound = AudioSegment.from_file(tmp_in_path)
-        sound = sound.set_frame_rate(16000).set_channels(1).set_sample_width(2)
-        sound.export(tmp_out_path, format="wav")
-        return tmp_out_path
-    finally:
+class StreamingDecoder:
+    """
+    Decodifica el audio a medida que llegan sus fragmentos (p. ej. los de
+    MediaRecorder): ffmpeg arranca con el primer fragmento y un hilo va
+    acumulando el PCM, así al terminar la subida solo falta lo que quede en
+    el búfer de ffmpeg. Uso: feed(fragmento)... finish() -> bytes PCM.
+    """
+
+    def __init__(self, ffmpeg_path=None, max_bytes=None):
+        if ffmpeg_path is None:
+            ffmpeg_path, _ = ensure_ffmpeg_configured()
+        self.max_bytes = max_bytes
+        self.received = 0
+        self._pcm = bytearray()
+        self._stderr = bytearray()
+        self._process = subprocess.Popen(
+            [
+                ffmpeg_path, '-hide_banner', '-loglevel', 'error', '-nostdin',
+                '-i', 'pipe:0',
+                '-f', 's16le', '-acodec', 'pcm_s16le',
+                '-ac', '1', '-ar', str(SAMPLE_RATE),
+                'pipe:1',
+            ],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        )
+        # stdout y stderr se vacían en hilos para que ffmpeg nunca se bloquee
+        self._readers = [
+            threading.Thread(target=self._drain, args=(self._process.stdout, self._pcm), daemon=True),
+            threading.Thread(target=self._drain, args=(self._process.stderr, self._stderr), daemon=True),
+        ]
+        for reader in self._readers:
+            reader.start()
+
+    def _drain(self, pipe, buffer):
+        for chunk in iter(lambda: pipe.read1(65536), b''):
+            buffer.extend(chunk)
+
+    @property
+    def seconds(self):
+        """Segundos de audio decodificados hasta ahora"""
+        return len(self._pcm) / (SAMPLE_RATE * SAMPLE_WIDTH)
+
+    def feed(self, chunk):
+        self.received += len(chunk)
+        if self.max_bytes and self.received > self.max_bytes:
+            self.abort()
+            raise AudioConversionError(f"El audio supera el máximo de {self.max_bytes} bytes")
+        try:
+            self._process.stdin.write(chunk)
+            self._process.stdin.flush()
+        except (BrokenPipeError, ValueError):
+            # ffmpeg terminó antes (audio inválido): el detalle está en stderr
+            self.abort()
+            raise AudioConversionError(self._error_message())
+
+    def finish(self):
+        """Cierra la entrada, espera a ffmpeg y retorna el PCM completo"""
         try:
-            if os.path.exists(tmp_in_path):
-                os.unlink(tmp_in_path)
-        except Exception:
+            self._process.stdin.close()
+        except BrokenPipeError:
             pass
+        returncode = self._process.wait()
+        for reader in self._readers:
+            reader.join()
+        if returncode != 0 or not self._pcm:
+            raise AudioConversionError(self._error_message())
+        return bytes(self._pcm)
+
+    def abort(self):
+        """Detiene ffmpeg (cliente desconectado o audio rechazado)"""
+        if self._process.poll() is None:
+            self._process.kill()
+        self._process.wait()
+        for reader in self._readers:
+            reader.join()
+        for pipe in (self._process.stdin, self._process.stdout, self._process.stderr):
+            try:
+                pipe.close()
+            except (BrokenPipeError, ValueError):
+                pass
+
+    def _error_message(self):
+        detail = self._stderr.decode('utf-8', errors='replace').strip().splitlines()
+        return "No se pudo decodificar el audio" + (f": {detail[-1]}" if detail else "")
@@ -0,0 +1,54 @@
+import csv
+import io
+from itertools import islice
+from django.http import StreamingHttpResponse
+from datetime import datetime
+
+CONTENT_TYPE = 'text/csv; charset=utf-8'
+
+
+def dict_batches(rows, batch_size=2000):
+    """Convierte filas en diccionarios (caché, trabajos) a lotes (columnas, filas)"""
+    rows = iter(rows)
+    batch = list(islice(rows, batch_size))
+    if not batch:
+        return
+    columns = list(batch[0].keys())
+    while batch:
+        yield columns, [[row[column] for column in columns] for row in batch]
+        batch = list(islice(rows, batch_size))
+
+
+class CSVGenerator:
+    """
+    Genera reportes en CSV a partir de lotes (columnas, filas) del cursor.
+    Cada lote se escribe y se descarta: la memoria no depende del tamaño.
+    """
+
+    def iter_csv(self, batches):
+        """Genera el CSV en fragmentos de texto, uno por lote"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        header_written = False
+
+        for columns, rows in batches:
+            if not header_written:
+                writer.writerow(columns)
+                header_written = True
+            writer.writerows(rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    def write_csv(self, batches, parsed_command, output):
+        """Escribe el CSV en un archivo binario (reportes en segundo plano)"""
+        for chunk in self.iter_csv(batches):
+            output.write(chunk.encode('utf-8'))
+
+    def create_streaming_csv_response(self, batches, parsed_command, filename=None):
+        if not filename:
+            filename = f"reporte_{parsed_command['report_type']}_{datetime.now().strftime('%Y%m%d_%H%M')}.csv"
+
+        response = StreamingHttpResponse(self.iter_csv(batches), content_type=CONTENT_TYPE)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
@@ -1,97 +1,135 @@
 from io import BytesIO
+from itertools import chain, islice
+import tempfile
 import openpyxl
-from openpyxl.styles import Font, Alignment, PatternFill
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, PatternFill, NamedStyle
 from openpyxl.utils import get_column_letter
-from django.http import HttpResponse
+from django.http import FileResponse, HttpResponse
+from django.utils import timezone
 from datetime import datetime
 
+# Filas iniciales usadas para calcular el ancho de las columnas
+WIDTH_SAMPLE_ROWS = 1000
+MAX_COLUMN_WIDTH = 60
+
+CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+def build_styles():
+    """Estilos con nombre: se registran una vez y las celdas solo los referencian"""
+    title = NamedStyle(name='reporte_titulo', font=Font(size=16, bold=True))
+    header = NamedStyle(
+        name='reporte_encabezado',
+        font=Font(bold=True, color="FFFFFF"),
+        fill=PatternFill(start_color="366092", end_color="366092", fill_type="solid"),
+        alignment=Alignment(horizontal='center', vertical='center'),
+    )
+    data = NamedStyle(name='reporte_dato', alignment=Alignment(horizontal='center', vertical='center'))
+    return title, header, data
+
+
 class ExcelGenerator:
     """
-    Genera reportes en formato Excel
+    Genera reportes en formato Excel. Usa un libro write_only: las filas se
+    escriben a disco a medida que llegan y no quedan celdas en memoria.
     """
-    
+
     def generate_excel(self, data, parsed_command, query_results):
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = f"Reporte {parsed_command['report_type']}"
-        
-        # Estilos
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        center_align = Alignment(horizontal='center', vertical='center')
-        
-        # Título
-        ws.merge_cells('A1:G1')
-        ws['A1'] = f"Reporte de {parsed_command['report_type'].title()}"
-        ws['A1'].font = Font(size=16, bold=True)
-        ws['A1'].alignment = center_align
-        
-        # Información del reporte
-        ws['A3'] = "Comando:"
-        ws['B3'] = parsed_command['original_command']
-        ws['A4'] = "Generado:"
-        ws['B4'] = datetime.now().strftime('%Y-%m-%d %H:%M')
-        
-        # Tabla de datos
-        if query_results:
-            self._add_data_table(ws, query_results, header_font, header_fill, center_align)
-        else:
-            ws['A6'] = "No se encontraron datos para el reporte"
-        
-        # Ajustar anchos de columna
-        self._adjust_column_widths(ws)
-        
         buffer = BytesIO()
-        wb.save(buffer)
+        self.write_excel(query_results, parsed_command, buffer)
         buffer.seek(0)
         return buffer
-    
-    def _add_data_table(self, worksheet, query_results, header_font, header_fill, center_align):
-        if not query_results:
-            return
-        
-        # Encabezados
-        headers = list(query_results[0].keys())
-        start_row = 6
-        
-        for col, header in enumerate(headers, 1):
-            cell = worksheet.cell(row=start_row, column=col)
-            cell.value = header
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = center_align
-        
-        # Datos
-        for row_idx, row_data in enumerate(query_results, start_row + 1):
-            for col_idx, header in enumerate(headers, 1):
-                cell = worksheet.cell(row=row_idx, column=col_idx)
-                cell.value = row_data[header]
-                cell.alignment = center_align
-    
-    def _adjust_column_widths(self, worksheet):
-        for column in worksheet.columns:
-            max_length = 0
-            column_letter = get_column_letter(column[0].column)
-            
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            
-            adjusted_width = (max_length + 2)
-            worksheet.column_dimensions[column_letter].width = adjusted_width
-    
+
+    def write_excel(self, rows, parsed_command, output):
+        """
+        Escribe el reporte en output (ruta o archivo). rows puede ser cualquier
+        iterable de diccionarios, p. ej. las filas de un cursor sin materializar.
+        """
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet(f"Reporte {parsed_command['report_type']}")
+
+        title_style, header_style, data_style = build_styles()
+        for style in (title_style, header_style, data_style):
+            wb.add_named_style(style)
+
+        rows = iter(rows)
+        sample = list(islice(rows, WIDTH_SAMPLE_ROWS))
+        headers = list(sample[0].keys()) if sample else []
+
+        # En write_only los anchos se fijan antes de escribir la primera fila
+        for col_idx, width in enumerate(self._column_widths(headers, sample), 1):
+            ws.column_dimensions[get_column_letter(col_idx)].width = width
+
+        title = WriteOnlyCell(ws, value=f"Reporte de {parsed_command['report_type'].title()}")
+        title.style = title_style.name
+        ws.append([title])
+        ws.append([])
+        ws.append(["Comando:", parsed_command['original_command']])
+        ws.append(["Generado:", datetime.now().strftime('%Y-%m-%d %H:%M')])
+        ws.append([])
+
+        # Tabla de datos
+        if headers:
+            self._add_data_table(ws, headers, chain(sample, rows), header_style, data_style)
+        else:
+            ws.append(["No se encontraron datos para el reporte"])
+
+        wb.save(output)
+
+    def _add_data_table(self, worksheet, headers, rows, header_style, data_style):
+        header_cells = []
+        for header in headers:
+            cell = WriteOnlyCell(worksheet, value=header)
+            cell.style = header_style.name
+            header_cells.append(cell)
+        worksheet.append(header_cells)
+
+        # Una celda por columna reutilizada en todas las filas: append la escribe de inmediato
+        cells = []
+        for _ in headers:
+            cell = WriteOnlyCell(worksheet)
+            cell.style = data_style.name
+            cells.append(cell)
+
+        for row_data in rows:
+            for cell, header in zip(cells, headers):
+                value = row_data[header]
+                # Excel no admite zonas horarias: las fechas aware se pasan a hora local
+                if isinstance(value, datetime) and value.tzinfo is not None:
+                    value = timezone.make_naive(value)
+                cell.value = value
+            worksheet.append(cells)
+
+    def _column_widths(self, headers, sample):
+        """Ancho por columna según el encabezado y las filas de muestra"""
+        widths = []
+        for header in headers:
+            max_length = len(str(header))
+            for row in sample:
+                max_length = max(max_length, len(str(row[header])))
+            widths.append(min(max_length + 2, MAX_COLUMN_WIDTH))
+        return widths
+
     def create_excel_response(self, data, parsed_command, query_results, filename=None):
         excel_buffer = self.generate_excel(data, parsed_command, query_results)
-        
+
         if not filename:
             filename = f"reporte_{parsed_command['report_type']}_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
-        
-        response = HttpResponse(
-            excel_buffer.getvalue(),
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
+
+        response = HttpResponse(excel_buffer.getvalue(), content_type=CONTENT_TYPE)
         response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        return response
\ No newline at end of file
+        return response
+
+    def create_streaming_excel_response(self, rows, parsed_command, filename=None):
+        """
+        Escribe el libro en un archivo temporal y lo envía por partes; el
+        archivo se borra al cerrar la respuesta.
+        """
+        if not filename:
+            filename = f"reporte_{parsed_command['report_type']}_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
+
+        tmp = tempfile.TemporaryFile(suffix='.xlsx')
+        self.write_excel(rows, parsed_command, tmp)
+        tmp.seek(0)
+        return FileResponse(tmp, as_attachment=True, filename=filename, content_type=CONTENT_TYPE)
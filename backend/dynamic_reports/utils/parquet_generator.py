@@ -0,0 +1,81 @@
+import tempfile
+import pyarrow as pa
+import pyarrow.parquet as pq
+from django.http import FileResponse
+from datetime import datetime
+
+CONTENT_TYPE = 'application/vnd.apache.parquet'
+
+# Filas por row group: los lotes del cursor son pequeños, se agrupan antes de escribir
+ROW_GROUP_SIZE = 100000
+
+
+class ParquetGenerator:
+    """
+    Genera reportes en Parquet. Cada lote (columnas, filas) del cursor se
+    convierte directamente en un RecordBatch de Arrow, columna por columna.
+    """
+
+    def write_parquet(self, batches, parsed_command, output):
+        writer = None
+        schema = None
+        pending = []
+        pending_rows = 0
+
+        try:
+            for columns, rows in batches:
+                record_batch = self._record_batch(columns, rows, schema)
+                if writer is None:
+                    schema = record_batch.schema
+                    writer = pq.ParquetWriter(output, schema, compression='snappy')
+
+                pending.append(record_batch)
+                pending_rows += record_batch.num_rows
+                if pending_rows >= ROW_GROUP_SIZE:
+                    writer.write_table(pa.Table.from_batches(pending, schema=schema))
+                    pending, pending_rows = [], 0
+
+            if writer is None:
+                # Sin filas: archivo válido sin columnas
+                writer = pq.ParquetWriter(output, pa.schema([]))
+            elif pending:
+                writer.write_table(pa.Table.from_batches(pending, schema=schema))
+        finally:
+            if writer is not None:
+                writer.close()
+
+    def _record_batch(self, columns, rows, schema):
+        """
+        Transpone el lote a columnas. Los tipos se infieren del primer lote y
+        los siguientes se convierten a ese esquema; una columna sin valores en
+        el primer lote se guarda como texto.
+        """
+        values = list(zip(*rows)) if rows else [()] * len(columns)
+        if schema is None:
+            arrays = []
+            for column_values in values:
+                array = pa.array(column_values)
+                if pa.types.is_null(array.type):
+                    array = array.cast(pa.string())
+                arrays.append(array)
+            return pa.RecordBatch.from_arrays(arrays, names=columns)
+
+        arrays = []
+        for column_values, field in zip(values, schema):
+            if pa.types.is_string(field.type):
+                column_values = [None if value is None else str(value) for value in column_values]
+            arrays.append(pa.array(column_values, type=field.type))
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    def create_streaming_parquet_response(self, batches, parsed_command, filename=None):
+        """
+        Parquet escribe el pie al final, así que se arma en un archivo temporal
+        y se envía por partes; el archivo se borra al cerrar la respuesta.
+        """
+        if not filename:
+            filename = f"reporte_{parsed_command['report_type']}_{datetime.now().strftime('%Y%m%d_%H%M')}.parquet"
+
+        tmp = tempfile.TemporaryFile(suffix='.parquet')
+        self.write_parquet(batches, parsed_command, tmp)
+        tmp.seek(0)
+        return FileResponse(tmp, as_attachment=True, filename=filename, content_type=CONTENT_TYPE)
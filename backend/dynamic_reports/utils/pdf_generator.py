@@ -1,22 +1,62 @@
 from io import BytesIO
+from itertools import islice
+import tempfile
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib import colors
 from reportlab.lib.units import inch
-from django.http import HttpResponse
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
 import json
 from datetime import datetime
+from decimal import Decimal
+
+# Filas por tabla: cada bloque cabe en una página y lleva su propio encabezado,
+# así reportlab nunca tiene que partir una tabla gigante
+ROWS_PER_TABLE = 35
+
+# Filas iniciales usadas para repartir el ancho de las columnas
+WIDTH_SAMPLE_ROWS = 200
+
+# Estilo compartido por todos los bloques (se construye una sola vez)
+TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+
+def max_pdf_rows():
+    """Filas que se dibujan como máximo; el resto se resume"""
+    return getattr(settings, 'REPORT_PDF_MAX_ROWS', 10000)
+
 
 class PDFGenerator:
     """
     Genera reportes en formato PDF
     """
-    
+
     def generate_pdf(self, data, parsed_command, query_results):
         buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=1*inch)
-        
+        self.write_pdf(query_results, parsed_command, buffer)
+        buffer.seek(0)
+        return buffer
+
+    def write_pdf(self, rows, parsed_command, output, max_rows=None):
+        """
+        Escribe el reporte en output. rows puede ser cualquier iterable de
+        diccionarios; se dibujan hasta max_rows filas en tablas de una página
+        y del resto solo se cuentan filas y se suman columnas numéricas.
+        """
+        max_rows = max_pdf_rows() if max_rows is None else max_rows
+        doc = SimpleDocTemplate(output, pagesize=A4, topMargin=1*inch)
+
         styles = getSampleStyleSheet()
         title_style = ParagraphStyle(
             'CustomTitle',
@@ -25,61 +65,107 @@ class PDFGenerator:
             spaceAfter=30,
             textColor=colors.darkblue
         )
-        
+
         elements = []
-        
+
         # Título
         title = Paragraph(f"Reporte de {parsed_command['report_type'].title()}", title_style)
         elements.append(title)
-        
+
         # Información del reporte
         info_style = styles['Normal']
         elements.append(Paragraph(f"<b>Comando:</b> {parsed_command['original_command']}", info_style))
         elements.append(Paragraph(f"<b>Generado:</b> {datetime.now().strftime('%Y-%m-%d %H:%M')}", info_style))
         elements.append(Spacer(1, 20))
-        
+
         # Tabla de datos
-        if query_results:
-            table_data = self._prepare_table_data(query_results)
-            table = Table(table_data)
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            elements.append(table)
+        rows = iter(rows)
+        sample = list(islice(rows, WIDTH_SAMPLE_ROWS))
+        if sample:
+            headers = list(sample[0].keys())
+            col_widths = self._column_widths(headers, sample, doc.width)
+            summary = self._add_table_chunks(elements, headers, sample, rows, col_widths, max_rows)
+            if summary:
+                elements.append(Spacer(1, 12))
+                for line in summary:
+                    elements.append(Paragraph(line, info_style))
         else:
             elements.append(Paragraph("No se encontraron datos para el reporte", info_style))
-        
+
         doc.build(elements)
-        buffer.seek(0)
-        return buffer
-    
-    def _prepare_table_data(self, query_results):
-        if not query_results:
-            return [['No hay datos']]
-        
-        # Encabezados
-        headers = list(query_results[0].keys())
-        table_data = [headers]
-        
-        # Datos
-        for row in query_results:
-            table_data.append([str(row[header]) for header in headers])
-        
-        return table_data
-    
+
+    def _add_table_chunks(self, elements, headers, sample, rows, col_widths, max_rows):
+        """Agrega bloques de ROWS_PER_TABLE filas; retorna el resumen si se superó max_rows"""
+        numeric_totals = {}
+        total_rows = 0
+        chunk = [headers]
+
+        for source in (sample, rows):
+            for row in source:
+                total_rows += 1
+                for header in headers:
+                    value = row[header]
+                    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool) and not self._is_id(header):
+                        # En Decimal: una columna puede mezclar Decimal con float/int
+                        numeric_totals[header] = numeric_totals.get(header, Decimal(0)) + self._to_decimal(value)
+
+                if total_rows > max_rows:
+                    continue
+
+                chunk.append([str(row[header]) for header in headers])
+                if len(chunk) > ROWS_PER_TABLE:
+                    elements.append(Table(chunk, colWidths=col_widths, style=TABLE_STYLE, repeatRows=1))
+                    chunk = [headers]
+
+        if len(chunk) > 1:
+            elements.append(Table(chunk, colWidths=col_widths, style=TABLE_STYLE, repeatRows=1))
+
+        if total_rows <= max_rows:
+            return None
+
+        summary = [f"<b>Se muestran {max_rows} de {total_rows} filas.</b> "
+                   "Para el resultado completo solicite el reporte en Excel."]
+        for header, total in numeric_totals.items():
+            summary.append(f"<b>Total {header}:</b> {total:,.2f}")
+        return summary
+
+    def _is_id(self, header):
+        return header == 'id' or header.endswith('_id')
+
+    def _to_decimal(self, value):
+        # str() evita arrastrar el error binario del float
+        return Decimal(str(value)) if isinstance(value, float) else Decimal(value)
+
+    def _column_widths(self, headers, sample, available_width):
+        """Reparte el ancho de la página según el texto más largo de cada columna"""
+        lengths = []
+        for header in headers:
+            max_length = len(str(header))
+            for row in sample:
+                max_length = max(max_length, len(str(row[header])))
+            lengths.append(max(max_length, 4))
+        total = sum(lengths)
+        return [available_width * length / total for length in lengths]
+
     def create_pdf_response(self, data, parsed_command, query_results, filename=None):
         pdf_buffer = self.generate_pdf(data, parsed_command, query_results)
-        
+
         if not filename:
             filename = f"reporte_{parsed_command['report_type']}_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf"
-        
+
         response = HttpResponse(pdf_buffer.getvalue(), content_type='application/pdf')
         response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        return response
\ No newline at end of file
+        return response
+
+    def create_streaming_pdf_response(self, rows, parsed_command, filename=None):
+        """
+        Escribe el PDF en un archivo temporal y lo envía por partes; el
+        archivo se borra al cerrar la respuesta.
+        """
+        if not filename:
+            filename = f"reporte_{parsed_command['report_type']}_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf"
+
+        tmp = tempfile.TemporaryFile(suffix='.pdf')
+        self.write_pdf(rows, parsed_command, tmp)
+        tmp.seek(0)
+        return FileResponse(tmp, as_attachment=True, filename=filename, content_type='application/pdf')
@@ -1,40 +1,22 @@
 from django.db import connection
-from datetime import datetime
-from backend.commercial.models import Venta, Producto, Cliente
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from django.utils import timezone
+from backend.commercial.rollup import rollup_enabled
 
-class QueryBuilder:
-    
-    def build_query(self, parsed_command):
-        report_type = parsed_command['report_type']
-        
-        if report_type == 'ventas':
-            return self._build_sales_query(parsed_command)
-        elif report_type == 'productos':
-            return self._build_products_query(parsed_command)
-        elif report_type == 'clientes':
-            return self._build_clients_query(parsed_command)
-        return self._build_sales_query(parsed_command)
-    
-    def _build_sales_query(self, parsed_command):
-        date_range = parsed_command['date_range']
-        group_by = parsed_command['group_by']
+# Límites usados cuando el comando no trae fecha de inicio o de fin, para que
+# cada plantilla tenga siempre los mismos parámetros y el mismo texto SQL
+MIN_DAY = date(1900, 1, 1)
+MAX_DAY = date(9999, 12, 31)
 
-        where_conditions = []
-        if date_range:
-            if len(date_range) >= 1:
-                start = date_range[0]
-                if isinstance(start, datetime):
-                    start = start.strftime('%Y-%m-%d')
-                where_conditions.append(f"v.fecha_venta >= '{start}'")
-            if len(date_range) >= 2:
-                end = date_range[1]
-                if isinstance(end, datetime):
-                    end = end.strftime('%Y-%m-%d')
-                where_conditions.append(f"v.fecha_venta <= '{end}'")
-        
-        # Query base
-        query = """
-        SELECT 
+# Plantillas canónicas: el texto es fijo y los valores viajan como parámetros
+# (params documenta cuáles usa cada una); el mismo reporte produce siempre el
+# mismo SQL, que se agrupa en pg_stat_statements y nunca interpola valores
+QUERY_TEMPLATES = {
+    'ventas_detalle': {
+        'params': ['start', 'end'],
+        'sql': """
+        SELECT
             v.id,
             v.fecha_venta as fecha,
             c.nombre as cliente_nombre,
@@ -45,56 +27,95 @@ class QueryBuilder:
         FROM ventas v
         JOIN clientes c ON v.cliente_id = c.id
         JOIN productos p ON v.producto_id = p.id
-        """
-        if where_conditions:
-            query += " WHERE " + " AND ".join(where_conditions)
-
-        # Agrupamientos
-        if group_by == 'producto':
-            query = f"""
-            SELECT 
-                p.nombre as producto_nombre,
-                COUNT(v.id) as total_ventas,
-                SUM(v.cantidad) as total_unidades,
-                SUM(v.total) as monto_total
-            FROM ventas v
-            JOIN productos p ON v.producto_id = p.id
-            """
-            if where_conditions:
-                query += " WHERE " + " AND ".join(where_conditions)
-            query += " GROUP BY p.id, p.nombre"
-        
-        elif group_by == 'cliente':
-            query = f"""
-            SELECT 
-                c.nombre as cliente_nombre,
-                COUNT(v.id) as total_compras,
-                SUM(v.total) as monto_total
-            FROM ventas v
-            JOIN clientes c ON v.cliente_id = c.id
-            """
-            if where_conditions:
-                query += " WHERE " + " AND ".join(where_conditions)
-            query += " GROUP BY c.id, c.nombre"
-        
-        elif group_by == 'mes':
-            query = f"""
-            SELECT 
-                DATE_TRUNC('month', v.fecha_venta) as mes,
-                COUNT(v.id) as total_ventas,
-                SUM(v.cantidad) as total_unidades,
-                SUM(v.total) as monto_total
-            FROM ventas v
-            """
-            if where_conditions:
-                query += " WHERE " + " AND ".join(where_conditions)
-            query += " GROUP BY mes ORDER BY mes"
-
-        return query
-    
-    def _build_products_query(self, parsed_command):
-        return """
-        SELECT 
+        WHERE v.fecha_venta >= %(start)s AND v.fecha_venta < %(end)s
+        """,
+    },
+    'ventas_por_producto': {
+        'params': ['start', 'end'],
+        'sql': """
+        SELECT
+            p.nombre as producto_nombre,
+            COUNT(v.id) as total_ventas,
+            SUM(v.cantidad) as total_unidades,
+            SUM(v.total) as monto_total
+        FROM ventas v
+        JOIN productos p ON v.producto_id = p.id
+        WHERE v.fecha_venta >= %(start)s AND v.fecha_venta < %(end)s
+        GROUP BY p.id, p.nombre
+        """,
+    },
+    'ventas_por_cliente': {
+        'params': ['start', 'end'],
+        'sql': """
+        SELECT
+            c.nombre as cliente_nombre,
+            COUNT(v.id) as total_compras,
+            SUM(v.total) as monto_total
+        FROM ventas v
+        JOIN clientes c ON v.cliente_id = c.id
+        WHERE v.fecha_venta >= %(start)s AND v.fecha_venta < %(end)s
+        GROUP BY c.id, c.nombre
+        """,
+    },
+    'ventas_por_mes': {
+        'params': ['start', 'end'],
+        'sql': """
+        SELECT
+            DATE_TRUNC('month', v.fecha_venta) as mes,
+            COUNT(v.id) as total_ventas,
+            SUM(v.cantidad) as total_unidades,
+            SUM(v.total) as monto_total
+        FROM ventas v
+        WHERE v.fecha_venta >= %(start)s AND v.fecha_venta < %(end)s
+        GROUP BY mes ORDER BY mes
+        """,
+    },
+    # Mismos resultados desde el resumen diario ventas_diarias (fechas sin hora);
+    # los datos del producto (nombre, categoría) se leen al consultar
+    'rollup_por_producto': {
+        'params': ['start', 'end'],
+        'sql': """
+        SELECT
+            p.nombre as producto_nombre,
+            SUM(r.cantidad_ventas) as total_ventas,
+            SUM(r.unidades) as total_unidades,
+            SUM(r.ingresos) as monto_total
+        FROM ventas_diarias r
+        JOIN productos p ON r.producto_id = p.id
+        WHERE r.fecha >= %(start)s AND r.fecha < %(end)s
+        GROUP BY p.id, p.nombre
+        """,
+    },
+    'rollup_por_cliente': {
+        'params': ['start', 'end'],
+        'sql': """
+        SELECT
+            c.nombre as cliente_nombre,
+            SUM(r.cantidad_ventas) as total_compras,
+            SUM(r.ingresos) as monto_total
+        FROM ventas_diarias r
+        JOIN clientes c ON r.cliente_id = c.id
+        WHERE r.fecha >= %(start)s AND r.fecha < %(end)s
+        GROUP BY c.id, c.nombre
+        """,
+    },
+    'rollup_por_mes': {
+        'params': ['start', 'end'],
+        'sql': """
+        SELECT
+            DATE_TRUNC('month', r.fecha) as mes,
+            SUM(r.cantidad_ventas) as total_ventas,
+            SUM(r.unidades) as total_unidades,
+            SUM(r.ingresos) as monto_total
+        FROM ventas_diarias r
+        WHERE r.fecha >= %(start)s AND r.fecha < %(end)s
+        GROUP BY mes ORDER BY mes
+        """,
+    },
+    'productos': {
+        'params': [],
+        'sql': """
+        SELECT
             p.nombre,
             cat.nombre as categoria,
             p.precio,
@@ -105,11 +126,12 @@ class QueryBuilder:
         LEFT JOIN categorias cat ON p.categoria_id = cat.id
         LEFT JOIN ventas v ON p.id = v.producto_id
         GROUP BY p.id, p.nombre, cat.nombre, p.precio, p.stock
-        """
-    
-    def _build_clients_query(self, parsed_command):
-        return """
-        SELECT 
+        """,
+    },
+    'clientes': {
+        'params': [],
+        'sql': """
+        SELECT
             c.nombre,
             c.email,
             c.telefono,
@@ -118,18 +140,125 @@ class QueryBuilder:
         FROM clientes c
         LEFT JOIN ventas v ON c.id = v.cliente_id
         GROUP BY c.id, c.nombre, c.email, c.telefono
+        """,
+    },
+}
+
+# type_code de NUMERIC en PostgreSQL; en SQLite es None y se revisa la primera fila
+DECIMAL_TYPE_CODES = {1700}
+
+# Filas por fetchmany al recorrer resultados
+STREAM_BATCH_SIZE = 2000
+
+SALES_TEMPLATES = {
+    None: 'ventas_detalle',
+    'producto': 'ventas_por_producto',
+    'cliente': 'ventas_por_cliente',
+    'mes': 'ventas_por_mes',
+}
+
+# Agrupaciones con grano de día o mayor que se pueden responder desde el resumen
+ROLLUP_TEMPLATES = {
+    'ventas_por_producto': 'rollup_por_producto',
+    'ventas_por_cliente': 'rollup_por_cliente',
+    'ventas_por_mes': 'rollup_por_mes',
+}
+
+
+class QueryBuilder:
+
+    def build_query(self, parsed_command):
+        """Retorna (nombre de plantilla, sql, parámetros)"""
+        report_type = parsed_command['report_type']
+
+        if report_type == 'productos':
+            return self._build_template('productos', {})
+        elif report_type == 'clientes':
+            return self._build_template('clientes', {})
+        return self._build_sales_query(parsed_command)
+
+    def _build_sales_query(self, parsed_command):
+        date_range = parsed_command['date_range']
+        group_by = parsed_command['group_by']
+
+        # Rango de días [start, end); el día final se incluye completo
+        start, end = MIN_DAY, MAX_DAY
+        if date_range:
+            if len(date_range) >= 1:
+                start = self._to_day(date_range[0])
+            if len(date_range) >= 2:
+                end = self._to_day(date_range[1]) + timedelta(days=1)
+
+        name = SALES_TEMPLATES.get(group_by, 'ventas_detalle')
+        if name in ROLLUP_TEMPLATES and rollup_enabled():
+            return self._build_template(ROLLUP_TEMPLATES[name], {'start': start, 'end': end})
+
+        return self._build_template(name, {'start': self._start_of_day(start), 'end': self._start_of_day(end)})
+
+    def _build_template(self, name, params):
+        return name, QUERY_TEMPLATES[name]['sql'], params
+
+    def _to_day(self, value):
+        if isinstance(value, str):
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        if isinstance(value, datetime):
+            return value.date()
+        return value
+
+    def _start_of_day(self, day):
+        return timezone.make_aware(datetime.combine(day, time.min))
+
+    def stream_query(self, sql, params, batch_size=STREAM_BATCH_SIZE):
         """
-    
-    def execute_query(self, query):
-        with connection.cursor() as cursor:
-            cursor.execute(query)
-            columns = [col[0] for col in cursor.description]
-            results = []
-            for row in cursor.fetchall():
-                row_dict = dict(zip(columns, row))
-                # Convertir Decimal a float
-                for key, value in row_dict.items():
-                    if hasattr(value, '__class__') and value.__class__.__name__ == 'Decimal':
-                        row_dict[key] = float(value)
-                results.append(row_dict)
-            return results
+        Genera los resultados en lotes de diccionarios sin cargarlos todos en
+        memoria. En PostgreSQL usa un cursor del lado del servidor con el texto
+        estable de la plantilla.
+        """
+        with connection.chunked_cursor() as cursor:
+            cursor.execute(sql, params)
+            yield from self._iter_batches(cursor, batch_size)
+
+    def stream_rows(self, sql, params, batch_size=STREAM_BATCH_SIZE):
+        """
+        Como stream_query pero sin crear diccionarios: genera lotes
+        (columnas, filas) con las filas como tuplas del cursor, para formatos
+        que escriben por columna o por posición (CSV, Parquet).
+        """
+        with connection.chunked_cursor() as cursor:
+            cursor.execute(sql, params)
+            yield from self._iter_row_batches(cursor, batch_size)
+
+    def _iter_batches(self, cursor, batch_size):
+        for columns, rows in self._iter_row_batches(cursor, batch_size):
+            yield [dict(zip(columns, row)) for row in rows]
+
+    def _iter_row_batches(self, cursor, batch_size):
+        rows = cursor.fetchmany(batch_size)
+        # Los cursores con nombre solo exponen description después del primer fetch
+        if cursor.description is None:
+            return
+        columns = [col[0] for col in cursor.description]
+        decimal_columns = self._decimal_columns(cursor.description, rows[0] if rows else None)
+
+        while rows:
+            if decimal_columns:
+                rows = [self._convert_decimals(row, decimal_columns) for row in rows]
+            yield columns, rows
+            rows = cursor.fetchmany(batch_size)
+
+    def _decimal_columns(self, description, first_row):
+        """Índices de columnas numéricas a convertir a float, decidido una vez por columna"""
+        columns = []
+        for index, column in enumerate(description):
+            if column[1] in DECIMAL_TYPE_CODES:
+                columns.append(index)
+            elif column[1] is None and first_row is not None and isinstance(first_row[index], Decimal):
+                columns.append(index)
+        return columns
+
+    def _convert_decimals(self, row, decimal_columns):
+        row = list(row)
+        for index in decimal_columns:
+            if row[index] is not None:
+                row[index] = float(row[index])
+        return row
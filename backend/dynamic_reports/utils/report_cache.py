@@ -0,0 +1,102 @@
+import hashlib
+import json
+import threading
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+
+# Alias de caché (ver CACHES en settings; LocMemCache con MAX_ENTRIES desaloja por LRU)
+CACHE_ALIAS = 'reports'
+# La generación va en un alias compartido entre procesos (REPORT_CACHE_GENERATION_BACKEND)
+GENERATION_ALIAS = 'report_generation'
+GENERATION_KEY = 'report:generation'
+
+
+class ReportCache:
+    """
+    Resultados de reportes por comando normalizado (plantilla, parámetros y
+    campos). Cualquier escritura de ventas incrementa la generación y deja
+    obsoletas todas las entradas; además cada entrada expira con REPORT_CACHE_TTL.
+    Las filas quedan en la memoria de cada proceso, pero la generación se lee
+    del alias compartido, así la invalidación alcanza a todos los workers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _cache(self):
+        return caches[CACHE_ALIAS]
+
+    @property
+    def timeout(self):
+        return getattr(settings, 'REPORT_CACHE_TTL', 300)
+
+    @property
+    def max_rows(self):
+        """Resultados más grandes no se guardan (se transmiten sin acumular)"""
+        return getattr(settings, 'REPORT_CACHE_MAX_ROWS', 10000)
+
+    def _generation_cache(self):
+        return caches[GENERATION_ALIAS]
+
+    def _generation(self):
+        return self._generation_cache().get_or_set(GENERATION_KEY, 0, timeout=None)
+
+    def make_key(self, template_name, params, fields):
+        raw = json.dumps(
+            {'template': template_name, 'params': params, 'fields': sorted(fields or [])},
+            sort_keys=True, cls=DjangoJSONEncoder
+        )
+        digest = hashlib.sha1(raw.encode('utf-8')).hexdigest()
+        return f'report:{self._generation()}:{digest}'
+
+    def get(self, key):
+        results = self._cache().get(key)
+        with self._lock:
+            if results is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return results
+
+    def set(self, key, results):
+        if len(results) <= self.max_rows:
+            self._cache().set(key, results, timeout=self.timeout)
+
+    def iter_and_store(self, batches, key):
+        """
+        Aplana los lotes del cursor fila a fila y, al terminar, guarda el
+        resultado si no superó max_rows (deja de acumular al pasarse)
+        """
+        collected = []
+        for batch in batches:
+            yield from batch
+            if collected is not None:
+                collected.extend(batch)
+                if len(collected) > self.max_rows:
+                    collected = None
+
+        if collected is not None:
+            self.set(key, collected)
+
+    def invalidate(self):
+        cache = self._generation_cache()
+        try:
+            cache.incr(GENERATION_KEY)
+        except ValueError:
+            # La clave no existía todavía
+            cache.set(GENERATION_KEY, 1, timeout=None)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+# Instancia global
+report_cache = ReportCache()
@@ -1,12 +1,35 @@
 import re
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 import calendar
 
+# Patrones compilados una sola vez al importar el módulo
+DMY_PATTERN = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})')
+ISO_PATTERN = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})')
+MONTH_PATTERN = re.compile(r'mes de (\w+)(?: del? (\d{4}))?')
+DAY_MONTH_PATTERN = re.compile(r'\b(\d{1,2}) de (\w+)(?: del? (\d{4}))?')
+
+MONTHS = {
+    'enero': 1, 'febrero': 2, 'marzo': 3, 'abril': 4, 'mayo': 5, 'junio': 6,
+    'julio': 7, 'agosto': 8, 'septiembre': 9, 'setiembre': 9, 'octubre': 10,
+    'noviembre': 11, 'diciembre': 12,
+}
+
+WEEKDAYS = {
+    'lunes': 0, 'martes': 1, 'miércoles': 2, 'miercoles': 2, 'jueves': 3,
+    'viernes': 4, 'sábado': 5, 'sabado': 5, 'domingo': 6,
+}
+WEEKDAY_PATTERN = re.compile(r'\b(?:el|desde el) (' + '|'.join(WEEKDAYS) + r')\b')
+
+# Comandos distintos recordados (las fechas relativas dependen del día)
+PARSE_CACHE_SIZE = 512
+
+
 class ReportParser:
     """
     Parser para interpretar comandos de texto naturales y convertirlos en consultas
     """
-    
+
     def __init__(self):
         self.keywords = {
             'ventas': ['venta', 'ventas', 'compras', 'transacciones'],
@@ -14,18 +37,33 @@ class ReportParser:
             'clientes': ['cliente', 'clientes', 'compradores'],
             'periodos': ['mes', 'año', 'semana', 'día', 'periodo', 'fecha'],
             'agrupaciones': ['agrupar', 'por', 'agrupado', 'grupo'],
-            'formatos': ['pdf', 'excel', 'json', 'pantalla']
+            'formatos': ['pdf', 'excel', 'csv', 'parquet', 'json', 'pantalla']
         }
-    
+        self._parse_cached = lru_cache(maxsize=PARSE_CACHE_SIZE)(self._parse)
+
     def parse_command(self, command):
+        """
+        Interpreta el comando. Los resultados se recuerdan por (comando, día):
+        se retorna una copia para que quien llama pueda modificarla.
+        """
+        parsed = self._parse_cached(command, date.today())
+        return {**parsed, 'date_range': list(parsed['date_range']), 'fields': list(parsed['fields'])}
+
+    def parse_uncached(self, command):
+        return self._parse(command, date.today())
+
+    def cache_info(self):
+        return self._parse_cached.cache_info()
+
+    def _parse(self, command, today):
         command_lower = command.lower()
-        
+
         report_type = self._extract_report_type(command_lower)
-        date_range = self._extract_dates(command_lower)
+        date_range = self._extract_dates(command_lower, today)
         group_by = self._extract_group_by(command_lower)
         output_format = self._extract_format(command_lower)
         fields = self._extract_fields(command_lower)
-        
+
         return {
             'report_type': report_type,
             'date_range': date_range,
@@ -34,7 +72,7 @@ class ReportParser:
             'fields': fields,
             'original_command': command
         }
-    
+
     def _extract_report_type(self, command):
         if any(word in command for word in self.keywords['ventas']):
             return 'ventas'
@@ -43,68 +81,58 @@ class ReportParser:
         elif any(word in command for word in self.keywords['clientes']):
             return 'clientes'
         return 'ventas'
-    
-    def _extract_dates(self, command):
+
+    def _extract_dates(self, command, today):
         dates = []
 
         # DD/MM/YYYY
-        matches = re.findall(r'(\d{1,2})/(\d{1,2})/(\d{4})', command)
-        for d, m, y in matches:
-            try:
-                dates.append(datetime(int(y), int(m), int(d)))
-            except:
-                pass
+        for d, m, y in DMY_PATTERN.findall(command):
+            self._append_date(dates, int(y), int(m), int(d))
 
         # YYYY-MM-DD
-        matches = re.findall(r'(\d{4})-(\d{1,2})-(\d{1,2})', command)
-        for y, m, d in matches:
-            try:
-                dates.append(datetime(int(y), int(m), int(d)))
-            except:
-                pass
-
-        # Mes de septiembre
-        matches = re.findall(r'mes de (\w+)', command)
-        for month_name in matches:
-            try:
-                month = list(calendar.month_name).index(month_name.capitalize())
-                start = datetime(datetime.now().year, month, 1)
-                last_day = calendar.monthrange(datetime.now().year, month)[1]
-                end = datetime(datetime.now().year, month, last_day)
-                dates.extend([start, end])
-            except:
-                pass
-
-        # 15 de septiembre
-        matches = re.findall(r'(\d{1,2}) de (\w+)', command)
-        for day_str, month_name in matches:
-            try:
-                day = int(day_str)
-                month = list(calendar.month_name).index(month_name.capitalize())
-                date_obj = datetime(datetime.now().year, month, day)
-                dates.append(date_obj)
-            except:
-                pass
-
-        # Fechas relativas
+        for y, m, d in ISO_PATTERN.findall(command):
+            self._append_date(dates, int(y), int(m), int(d))
+
+        # Mes de septiembre (de 2024)
+        for month_name, year in MONTH_PATTERN.findall(command):
+            month = MONTHS.get(month_name)
+            if month:
+                year = int(year) if year else today.year
+                last_day = calendar.monthrange(year, month)[1]
+                dates.extend([datetime(year, month, 1), datetime(year, month, last_day)])
+
+        # 15 de septiembre (de 2024)
+        for day_str, month_name, year in DAY_MONTH_PATTERN.findall(command):
+            month = MONTHS.get(month_name)
+            if month:
+                self._append_date(dates, int(year) if year else today.year, month, int(day_str))
+
+        # Fechas relativas (a medianoche: la consulta solo usa el día)
         if not dates:
+            midnight = datetime.combine(today, datetime.min.time())
+            weekday = WEEKDAY_PATTERN.search(command)
             if 'ayer' in command:
-                dates.append(datetime.now() - timedelta(days=1))
+                dates.append(midnight - timedelta(days=1))
             elif 'hoy' in command:
-                dates.append(datetime.now())
+                dates.append(midnight)
+            elif weekday:
+                # Último día con ese nombre (hoy si coincide)
+                days_back = (today.weekday() - WEEKDAYS[weekday.group(1)]) % 7
+                dates.append(midnight - timedelta(days=days_back))
             elif 'semana' in command:
-                dates.extend([datetime.now() - timedelta(days=7), datetime.now()])
+                dates.extend([midnight - timedelta(days=7), midnight])
             elif 'mes' in command and 'este' in command:
-                start = datetime.now().replace(day=1)
-                end = datetime.now()
-                dates.extend([start, end])
+                dates.extend([midnight.replace(day=1), midnight])
             elif 'año' in command and 'este' in command:
-                start = datetime.now().replace(month=1, day=1)
-                end = datetime.now()
-                dates.extend([start, end])
+                dates.extend([midnight.replace(month=1, day=1), midnight])
 
         return dates[:2]
-    
+
+    def _append_date(self, dates, year, month, day):
+        """Agrega la fecha si existe (31/02 se ignora)"""
+        if 1 <= month <= 12 and 1 <= day <= calendar.monthrange(year, month)[1]:
+            dates.append(datetime(year, month, day))
+
     def _extract_group_by(self, command):
         if 'agrupar por producto' in command or 'agrupado por producto' in command:
             return 'producto'
@@ -115,14 +143,18 @@ class ReportParser:
         elif 'agrupar por categoría' in command or 'agrupado por categoría' in command:
             return 'categoria'
         return None
-    
+
     def _extract_format(self, command):
         if 'pdf' in command:
             return 'PDF'
         elif 'excel' in command:
             return 'EXCEL'
+        elif 'csv' in command:
+            return 'CSV'
+        elif 'parquet' in command or 'arrow' in command:
+            return 'PARQUET'
         return 'JSON'
-    
+
     def _extract_fields(self, command):
         fields = []
         if 'nombre' in command and 'cliente' in command:
@@ -134,3 +166,7 @@ class ReportParser:
         if 'fecha' in command:
             fields.append('fecha')
         return fields if fields else ['*']
+
+
+# Instancia global
+report_parser = ReportParser()
@@ -0,0 +1,71 @@
+import json
+import zlib
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+def store_results_enabled():
+    return getattr(settings, 'REPORT_STORE_RESULTS', False)
+
+
+def max_stored_rows():
+    """Resultados más grandes solo registran cantidad_resultados"""
+    return getattr(settings, 'REPORT_STORE_RESULTS_MAX_ROWS', 10000)
+
+
+def compress_rows(rows):
+    return zlib.compress(json.dumps(rows, cls=DjangoJSONEncoder).encode('utf-8'))
+
+
+def decompress_rows(data):
+    if data is None:
+        return None
+    return json.loads(zlib.decompress(bytes(data)).decode('utf-8'))
+
+
+class ResultRecorder:
+    """
+    Cuenta las filas de un reporte a medida que se escriben y, si
+    REPORT_STORE_RESULTS está activo, guarda una copia comprimida mientras
+    no supere REPORT_STORE_RESULTS_MAX_ROWS.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.rows = [] if store_results_enabled() else None
+
+    def track(self, rows):
+        """Deja pasar filas en diccionarios"""
+        for row in rows:
+            self._add(row)
+            yield row
+
+    def track_batches(self, batches):
+        """Deja pasar lotes de diccionarios (JSON)"""
+        for batch in batches:
+            for row in batch:
+                self._add(row)
+            yield batch
+
+    def track_row_batches(self, batches):
+        """Deja pasar lotes (columnas, filas) (CSV, Parquet)"""
+        for columns, rows in batches:
+            for row in rows:
+                self._add(row, columns)
+            yield columns, rows
+
+    def _add(self, row, columns=None):
+        self.count += 1
+        if self.rows is None:
+            return
+        if self.count > max_stored_rows():
+            self.rows = None
+            return
+        self.rows.append(dict(zip(columns, row)) if columns else row)
+
+    def fields(self):
+        """Campos de ReporteGenerado a actualizar al terminar"""
+        return {
+            'cantidad_resultados': self.count,
+            'resultado_comprimido': compress_rows(self.rows) if self.rows is not None else None,
+        }
@@ -0,0 +1,42 @@
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from django.http import FileResponse
+import os
+from ..report_jobs import serialize_report
+from backend.commercial.models import ReporteGenerado
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_report_job(request, reporte_id):
+    """
+    Estado de un reporte generado en segundo plano
+    """
+    reporte = ReporteGenerado.objects.filter(id=reporte_id, usuario=request.user).defer('resultado_comprimido').first()
+    if not reporte:
+        return Response({'error': 'Reporte no encontrado'}, status=status.HTTP_404_NOT_FOUND)
+
+    return Response(serialize_report(reporte), status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def download_report_job(request, reporte_id):
+    """
+    Descarga el archivo de un reporte generado en segundo plano
+    """
+    reporte = ReporteGenerado.objects.filter(id=reporte_id, usuario=request.user).defer('resultado_comprimido').first()
+    if not reporte:
+        return Response({'error': 'Reporte no encontrado'}, status=status.HTTP_404_NOT_FOUND)
+
+    if reporte.estado != 'COMPLETADO' or not reporte.archivo_generado:
+        return Response(
+            {'error': 'El reporte todavía no está listo', **serialize_report(reporte)},
+            status=status.HTTP_409_CONFLICT
+        )
+
+    return FileResponse(
+        reporte.archivo_generado.open('rb'),
+        as_attachment=True,
+        filename=os.path.basename(reporte.archivo_generado.name)
+    )
@@ -2,11 +2,20 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from itertools import chain
+import json
 import time
-from ..utils.report_parser import ReportParser
+from ..utils.report_parser import report_parser
 from ..utils.query_builder import QueryBuilder
+from ..utils.report_cache import report_cache
 from ..utils.pdf_generator import PDFGenerator
 from ..utils.excel_generator import ExcelGenerator
+from ..utils.csv_generator import CSVGenerator, dict_batches
+from ..utils.parquet_generator import ParquetGenerator
+from ..utils.result_store import ResultRecorder, decompress_rows
+from ..report_jobs import FILE_FORMATS, enqueue_report, serialize_report
 from backend.commercial.models import ReporteGenerado
 
 @api_view(['POST'])
@@ -15,94 +24,280 @@ def generate_text_report(request):
     """
     CU6 - Generar Reporte Dinámico por Texto
     """
+    prompt = request.data.get('prompt')
+    
+    if not prompt:
+        return Response(
+            {'error': 'El prompt es requerido'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    return generate_report(request, prompt, request.data.get('formato'))
+
+def generate_report(request, prompt, formato=None):
+    """
+    Genera el reporte de un comando ya en texto (escrito o transcrito de voz)
+    """
     try:
-        prompt = request.data.get('prompt')
-        formato = request.data.get('formato', 'JSON')
-        
-        if not prompt:
-            return Response(
-                {'error': 'El prompt es requerido'}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
         start_time = time.time()
         
         # Parsear el comando
-        parser = ReportParser()
-        parsed_command = parser.parse_command(prompt)
+        parsed_command = report_parser.parse_command(prompt)
+        
+        # Sin formato explícito vale el del texto ("en csv", "en parquet", ...)
+        formato = formato or parsed_command['output_format']
         
+        # Archivos en segundo plano: se responde con el id del reporte
+        if formato in FILE_FORMATS and str(request.data.get('async', '')).lower() in ('1', 'true'):
+            reporte = enqueue_report(request.user, prompt, formato, parsed_command)
+            if reporte is None:
+                return Response(
+                    {'error': 'Tiene demasiados reportes en proceso. Espere a que terminen.'},
+                    status=status.HTTP_429_TOO_MANY_REQUESTS
+                )
+            return Response(
+                {'message': 'Reporte en cola', **serialize_report(reporte)},
+                status=status.HTTP_202_ACCEPTED
+            )
+
         # Construir y ejecutar la consulta
         query_builder = QueryBuilder()
-        query = query_builder.build_query(parsed_command)
-        results = query_builder.execute_query(query)
-        
-        execution_time = time.time() - start_time
-        
-        # Guardar en base de datos
+        template_name, query, params = query_builder.build_query(parsed_command)
+
+        # Mismo comando normalizado => mismos resultados mientras no cambien las ventas
+        cache_key = report_cache.make_key(template_name, params, parsed_command['fields'])
+        cached_results = report_cache.get(cache_key)
+
+        if formato in ('CSV', 'PARQUET'):
+            return columnar_report(
+                request, prompt, formato, parsed_command, query_builder, query, params,
+                start_time, cached_results
+            )
+
+        if formato not in ('PDF', 'EXCEL'):
+            return stream_json_report(
+                request, prompt, formato, parsed_command, query_builder, query, params,
+                start_time, cache_key, cached_results
+            )
+
+        # Archivo escrito fila a fila desde el cursor (Excel write_only, PDF
+        # en tablas de una página)
         reporte = ReporteGenerado.objects.create(
             usuario=request.user,
             prompt=prompt,
             formato_solicitado=formato,
-            consulta_sql=query,
-            resultado=results,
-            tiempo_ejecucion=execution_time
+            consulta_sql=query
         )
-        
-        # Generar respuesta según el formato
-        if formato == 'PDF':
-            pdf_generator = PDFGenerator()
-            return pdf_generator.create_pdf_response(
-                results, parsed_command, results,
-                filename=f"reporte_{reporte.id}.pdf"
-            )
-        
-        elif formato == 'EXCEL':
+        if cached_results is not None:
+            rows = cached_results
+        else:
+            rows = report_cache.iter_and_store(query_builder.stream_query(query, params), cache_key)
+        recorder = ResultRecorder()
+        rows = recorder.track(rows)
+
+        if formato == 'EXCEL':
             excel_generator = ExcelGenerator()
-            return excel_generator.create_excel_response(
-                results, parsed_command, results,
+            response = excel_generator.create_streaming_excel_response(
+                rows, parsed_command,
                 filename=f"reporte_{reporte.id}.xlsx"
             )
+        else:  # PDF
+            pdf_generator = PDFGenerator()
+            response = pdf_generator.create_streaming_pdf_response(
+                rows, parsed_command,
+                filename=f"reporte_{reporte.id}.pdf"
+            )
+        ReporteGenerado.objects.filter(pk=reporte.pk).update(
+            tiempo_ejecucion=time.time() - start_time, **recorder.fields()
+        )
+
+        # Metadatos de caché en cabeceras (el cuerpo es un archivo)
+        response['X-Report-Cache'] = 'HIT' if cached_results is not None else 'MISS'
+        response['X-Report-Cache-Hit-Ratio'] = str(report_cache.stats()['hit_ratio'])
+        return response
         
-        else:  # JSON para vista en pantalla
-            return Response({
-                'message': 'Reporte generado exitosamente',
-                'reporte_id': reporte.id,
-                'datos': results,
-                'consulta': query,
-                'tiempo_ejecucion': execution_time,
-                'comando_interpretado': parsed_command
-            }, status=status.HTTP_200_OK)
-            
     except Exception as e:
         return Response(
             {'error': f'Error generando reporte: {str(e)}'}, 
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+def stream_json_report(request, prompt, formato, parsed_command, query_builder, query, params,
+                       start_time, cache_key, cached_results):
+    """
+    JSON para vista en pantalla, enviado por partes a medida que llegan los
+    lotes del cursor: la memoria no crece con el tamaño del resultado. Los
+    resultados pequeños se guardan en la caché de reportes.
+    """
+    if cached_results is not None:
+        batches = iter([])
+        first_batch = cached_results
+    else:
+        batches = query_builder.stream_query(query, params)
+        # Ejecutar la consulta antes de responder para que los errores den 500
+        first_batch = next(batches, [])
+
+    reporte = ReporteGenerado.objects.create(
+        usuario=request.user,
+        prompt=prompt,
+        formato_solicitado=formato,
+        consulta_sql=query
+    )
+
+    header = {
+        'message': 'Reporte generado exitosamente',
+        'reporte_id': reporte.id,
+        'consulta': query,
+        'parametros': params,
+        'comando_interpretado': parsed_command,
+        'cache': {'hit': cached_results is not None, **report_cache.stats()}
+    }
+
+    def generate():
+        # Se abre el objeto del encabezado y se deja "datos" como último arreglo
+        yield json.dumps(header, cls=DjangoJSONEncoder)[:-1] + ', "datos": ['
+        count = 0
+        # Se acumula para la caché solo mientras no supere REPORT_CACHE_MAX_ROWS
+        collected = [] if cached_results is None else None
+        recorder = ResultRecorder()
+        for batch in recorder.track_batches(chain([first_batch], batches)):
+            if not batch:
+                continue
+            yield (',' if count else '') + ','.join(json.dumps(row, cls=DjangoJSONEncoder) for row in batch)
+            count += len(batch)
+            if collected is not None:
+                collected.extend(batch)
+                if len(collected) > report_cache.max_rows:
+                    collected = None
+
+        if collected is not None:
+            report_cache.set(cache_key, collected)
+
+        execution_time = time.time() - start_time
+        ReporteGenerado.objects.filter(pk=reporte.pk).update(tiempo_ejecucion=execution_time, **recorder.fields())
+        yield f'], "cantidad_resultados": {count}, "tiempo_ejecucion": {json.dumps(execution_time)}}}'
+
+    return StreamingHttpResponse(generate(), content_type='application/json')
+
+def columnar_report(request, prompt, formato, parsed_command, query_builder, query, params,
+                    start_time, cached_results):
+    """
+    Extractos CSV/Parquet: las filas llegan del cursor como tuplas (sin
+    diccionarios) y se escriben lote a lote. Estos resultados no se guardan
+    en la caché; si ya estaban en ella se usan.
+    """
+    if cached_results is not None:
+        batches = dict_batches(cached_results)
+    else:
+        batches = query_builder.stream_rows(query, params)
+    # Ejecutar la consulta antes de responder para que los errores den 500
+    first_batch = next(batches, None)
+    batches = chain([first_batch], batches) if first_batch else iter([])
+
+    reporte = ReporteGenerado.objects.create(
+        usuario=request.user,
+        prompt=prompt,
+        formato_solicitado=formato,
+        consulta_sql=query
+    )
+
+    recorder = ResultRecorder()
+
+    def timed(batches):
+        # Tiempo y cantidad se registran al terminar de escribir (el CSV se envía por partes)
+        yield from recorder.track_row_batches(batches)
+        ReporteGenerado.objects.filter(pk=reporte.pk).update(
+            tiempo_ejecucion=time.time() - start_time, **recorder.fields()
+        )
+
+    if formato == 'CSV':
+        csv_generator = CSVGenerator()
+        response = csv_generator.create_streaming_csv_response(
+            timed(batches), parsed_command,
+            filename=f"reporte_{reporte.id}.csv"
+        )
+    else:  # PARQUET
+        parquet_generator = ParquetGenerator()
+        response = parquet_generator.create_streaming_parquet_response(
+            timed(batches), parsed_command,
+            filename=f"reporte_{reporte.id}.parquet"
+        )
+
+    response['X-Report-Cache'] = 'HIT' if cached_results is not None else 'MISS'
+    response['X-Report-Cache-Hit-Ratio'] = str(report_cache.stats()['hit_ratio'])
+    return response
+
+# Tamaño de página del historial
+HISTORY_PAGE_SIZE = 50
+MAX_HISTORY_PAGE_SIZE = 200
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_report_history(request):
     """
-    Obtener historial de reportes del usuario
+    Obtener historial de reportes del usuario, del más reciente al más
+    antiguo. Paginación por clave: ?antes_de=<id> devuelve los reportes
+    anteriores a ese id y "siguiente" trae el valor para la próxima página.
     """
     try:
-        reportes = ReporteGenerado.objects.filter(usuario=request.user).order_by('-fecha_creacion')[:50]
+        try:
+            limit = min(int(request.query_params.get('limite', HISTORY_PAGE_SIZE)), MAX_HISTORY_PAGE_SIZE)
+            before = request.query_params.get('antes_de')
+            before = int(before) if before else None
+        except ValueError:
+            return Response(
+                {'error': 'limite y antes_de deben ser números enteros'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        reportes = ReporteGenerado.objects.filter(usuario=request.user).defer(
+            'resultado_comprimido', 'consulta_sql'
+        )
+        if before is not None:
+            reportes = reportes.filter(id__lt=before)
+        # Se pide una fila extra para saber si hay otra página
+        reportes = list(reportes.order_by('-id')[:limit + 1])
+        siguiente = reportes[limit - 1].id if len(reportes) > limit else None
         
         data = []
-        for reporte in reportes:
+        for reporte in reportes[:limit]:
             data.append({
                 'id': reporte.id,
                 'prompt': reporte.prompt,
                 'formato': reporte.formato_solicitado,
+                'estado': reporte.estado,
                 'fecha_creacion': reporte.fecha_creacion,
                 'tiempo_ejecucion': reporte.tiempo_ejecucion,
-                'cantidad_resultados': len(reporte.resultado) if reporte.resultado else 0
+                'cantidad_resultados': reporte.cantidad_resultados or 0
             })
         
-        return Response({'reportes': data}, status=status.HTTP_200_OK)
+        return Response({'reportes': data, 'siguiente': siguiente}, status=status.HTTP_200_OK)
         
     except Exception as e:
         return Response(
             {'error': f'Error obteniendo historial: {str(e)}'}, 
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
\ No newline at end of file
+        )
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_report_result(request, reporte_id):
+    """
+    Filas guardadas de un reporte (solo si se generó con REPORT_STORE_RESULTS)
+    """
+    reporte = ReporteGenerado.objects.filter(id=reporte_id, usuario=request.user).only(
+        'id', 'cantidad_resultados', 'resultado_comprimido'
+    ).first()
+    if reporte is None:
+        return Response({'error': 'Reporte no encontrado'}, status=status.HTTP_404_NOT_FOUND)
+    if reporte.resultado_comprimido is None:
+        return Response(
+            {'error': 'Las filas de este reporte no se guardaron'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    return Response({
+        'reporte_id': reporte.id,
+        'cantidad_resultados': reporte.cantidad_resultados,
+        'datos': decompress_rows(reporte.resultado_comprimido)
+    }, status=status.HTTP_200_OK)
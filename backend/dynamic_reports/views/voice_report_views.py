@@ -1,23 +1,17 @@
 # backend/dynamic_reports/views/voice_report_views.py
-import os
 import traceback
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-import speech_recognition as sr
 
-# Importamos el conversor (usa pydub internamente)
-from ..utils.audio_converter import convertir_audio_a_wav, ensure_ffmpeg_configured
-
-# Configuramos ffmpeg/ffprobe para todo el proceso
-try:
-    ffmpeg_path, ffprobe_path = ensure_ffmpeg_configured()
-    print("VOICE VIEW - ffmpeg:", ffmpeg_path, "exists?", os.path.exists(ffmpeg_path))
-    print("VOICE VIEW - ffprobe:", ffprobe_path, "exists?", os.path.exists(ffprobe_path))
-except Exception as e:
-    print("VOICE VIEW - ERROR configurando ffmpeg/ffprobe:", str(e))
-    ffmpeg_path = ffprobe_path = None
+from ..utils.audio_converter import (
+    AudioConversionError, SAMPLE_RATE, SAMPLE_WIDTH, convertir_audio_a_pcm, resolve_ffmpeg
+)
+from ..speech import (
+    TranscriptionBusyError, TranscriptionError, TranscriptionServiceError, transcription_service
+)
+from .text_report_views import generate_report
 
 
 @api_view(['POST'])
@@ -25,13 +19,14 @@ except Exception as e:
 def process_voice_command(request):
     """
     CU7 - Procesar comando de voz y generar reporte.
-    Requiere que ffmpeg/ffprobe estén disponibles (configurados por audio_converter.ensure_ffmpeg_configured).
+    Requiere ffmpeg (ubicado una vez por proceso por audio_converter.resolve_ffmpeg).
     """
     try:
         # Validar configuración de ffmpeg
-        if ffmpeg_path is None or ffprobe_path is None:
+        ffmpeg_path = resolve_ffmpeg()['ffmpeg']
+        if ffmpeg_path is None:
             return Response(
-                {'error': 'FFmpeg/ffprobe no están configurados en el servidor. Revisa los logs.'},
+                {'error': 'FFmpeg no está configurado en el servidor. Revisa /api/reports/voice-report/status/.'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
@@ -40,47 +35,53 @@ def process_voice_command(request):
         if not audio_file:
             return Response({'error': 'Archivo de audio requerido'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Convertir el audio a WAV
-        converted_audio_path = convertir_audio_a_wav(audio_file)
-
-        try:
-            # Transcribir a texto con SpeechRecognition
-            recognizer = sr.Recognizer()
-            with sr.AudioFile(converted_audio_path) as source:
-                audio_data = recognizer.record(source)
-
-            text = recognizer.recognize_google(audio_data, language='es-ES')
-
-            # Determinar formato de salida (por defecto JSON)
-            formato = request.data.get('formato', 'JSON')
+        # Decodificar en memoria a PCM (sin archivos temporales)
+        pcm = convertir_audio_a_pcm(audio_file, ffmpeg_path)
 
-            # Importar y llamar directamente al generador de reportes
-            from .text_report_views import generate_text_report
+        # Transcribir con el motor configurado (VOICE_STT_BACKEND)
+        text = transcription_service.transcribe(pcm, SAMPLE_RATE, SAMPLE_WIDTH)
 
-            # ✅ Llamamos directamente pasando los parámetros necesarios
-            response = generate_text_report(
-                prompt=text,
-                formato=formato,
-                user=request.user
-            )
-
-            return Response(response, status=status.HTTP_200_OK)
+        # Formato elegido o, si no viene, el mencionado en el comando
+        return generate_report(request, text, request.data.get('formato'))
 
-        finally:
-            # Borramos el archivo temporal
-            if converted_audio_path and os.path.exists(converted_audio_path):
-                try:
-                    os.unlink(converted_audio_path)
-                except Exception:
-                    pass
-
-    except sr.UnknownValueError:
-        return Response({'error': 'No se pudo entender el audio.'},
-                        status=status.HTTP_400_BAD_REQUEST)
-    except sr.RequestError as e:
-        return Response({'error': f'Error en el servicio de reconocimiento: {str(e)}'},
-                        status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    except AudioConversionError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except TranscriptionError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except TranscriptionBusyError as e:
+        return Response({'error': str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    except TranscriptionServiceError as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     except Exception as e:
         traceback.print_exc()
         return Response({'error': f'Error procesando comando de voz: {str(e)}'},
                         status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def voice_status(request):
+    """
+    Estado de la cadena de voz: ffmpeg encontrado y motor de transcripción.
+    ?refrescar=1 vuelve a buscar ffmpeg (p. ej. después de instalarlo).
+    Solo administradores: expone rutas y versión de ffmpeg del servidor.
+    """
+    if not (request.user.rol and request.user.rol.nombre == 'Administrador'):
+        return Response(
+            {'error': 'Solo los administradores pueden ver el estado del servicio de voz'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    if request.query_params.get('refrescar') in ('1', 'true'):
+        resolve_ffmpeg.cache_clear()
+
+    toolchain = resolve_ffmpeg()
+    ready = toolchain['ffmpeg'] is not None
+    return Response(
+        {
+            'listo': ready,
+            'ffmpeg': toolchain,
+            'transcripcion': transcription_service.status(),
+        },
+        status=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE
+    )
@@ -0,0 +1,266 @@
+import asyncio
+import json
+import os
+import time
+import traceback
+from itertools import islice
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from backend.commercial.models import ReporteGenerado
+from .report_jobs import FILE_FORMATS, freeze_command, render_report, report_rows, serialize_report
+from .speech import (
+    TranscriptionBusyError, TranscriptionError, TranscriptionServiceError, transcription_service
+)
+from .utils.audio_converter import (
+    AudioConversionError, SAMPLE_RATE, SAMPLE_WIDTH, StreamingDecoder, resolve_ffmpeg
+)
+from .utils.report_parser import report_parser
+from .utils.result_store import ResultRecorder
+
+# Ruta del websocket (la atiende backend/asgi.py, en un proceso aparte del HTTP)
+VOICE_STREAM_PATH = '/ws/reports/voice/'
+
+# Filas por mensaje "datos" y bytes por mensaje binario de archivo
+ROWS_PER_MESSAGE = 500
+FILE_CHUNK_SIZE = 64 * 1024
+
+# Códigos de cierre del websocket (4000-4999 son de la aplicación)
+CLOSE_NORMAL = 1000
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_BAD_REQUEST = 4400
+CLOSE_TIMEOUT = 4408
+CLOSE_BUSY = 4503
+CLOSE_ERROR = 1011
+
+
+def max_stream_bytes():
+    return getattr(settings, 'VOICE_STREAM_MAX_BYTES', 10 * 1024 * 1024)
+
+
+def idle_timeout():
+    return getattr(settings, 'VOICE_STREAM_IDLE_TIMEOUT', 30)
+
+
+class StreamClosed(Exception):
+    """Se cierra el websocket con un mensaje de error y un código"""
+
+    def __init__(self, message, code):
+        super().__init__(message)
+        self.code = code
+
+
+def authenticate(token_key):
+    """
+    Usuario activo del token DRF. Los navegadores no envían cabeceras en
+    websockets, así que el token llega en el primer mensaje (no en la URL,
+    que queda en los logs del proxy y del servidor).
+    """
+    if not isinstance(token_key, str) or not token_key:
+        return None
+    close_old_connections()
+    try:
+        token = Token.objects.select_related('user').get(key=token_key)
+    except Token.DoesNotExist:
+        return None
+    finally:
+        close_old_connections()
+    return token.user if token.user.is_active else None
+
+
+def run_report(usuario, prompt, formato, send_json, send_bytes):
+    """
+    Ejecuta el reporte del comando transcrito y lo envía por el websocket.
+    Los archivos (PDF/Excel/CSV/Parquet) se generan con render_report, igual
+    que los reportes en segundo plano, y se envían en mensajes binarios; el
+    JSON va en mensajes "datos" de ROWS_PER_MESSAGE filas. Corre en un hilo
+    (send_* son async_to_sync).
+    """
+    close_old_connections()
+    try:
+        start_time = time.time()
+        parsed_command = report_parser.parse_command(prompt)
+        formato = formato or parsed_command['output_format']
+
+        if formato in FILE_FORMATS:
+            reporte = render_report(ReporteGenerado.objects.create(
+                usuario=usuario,
+                prompt=prompt,
+                formato_solicitado=formato,
+                comando_interpretado=freeze_command(parsed_command),
+                estado='PROCESANDO',
+                fecha_inicio=timezone.now()
+            ))
+            if reporte.estado != 'COMPLETADO':
+                raise StreamClosed(f'Error generando reporte: {reporte.error}', CLOSE_ERROR)
+
+            send_json({
+                'tipo': 'archivo',
+                'nombre': os.path.basename(reporte.archivo_generado.name),
+                **serialize_report(reporte),
+            })
+            with reporte.archivo_generado.open('rb') as archivo:
+                for chunk in iter(lambda: archivo.read(FILE_CHUNK_SIZE), b''):
+                    send_bytes(chunk)
+            send_json({
+                'tipo': 'fin',
+                'reporte_id': reporte.id,
+                'cantidad_resultados': reporte.cantidad_resultados,
+                'tiempo_ejecucion': reporte.tiempo_ejecucion,
+            })
+            return
+
+        query, rows = report_rows(parsed_command)
+        reporte = ReporteGenerado.objects.create(
+            usuario=usuario,
+            prompt=prompt,
+            formato_solicitado=formato,
+            consulta_sql=query
+        )
+        send_json({
+            'tipo': 'reporte',
+            'message': 'Reporte generado exitosamente',
+            'reporte_id': reporte.id,
+            'consulta': query,
+            'comando_interpretado': parsed_command,
+        })
+        recorder = ResultRecorder()
+        rows = iter(recorder.track(rows))
+        for batch in iter(lambda: list(islice(rows, ROWS_PER_MESSAGE)), []):
+            send_json({'tipo': 'datos', 'filas': batch})
+
+        execution_time = time.time() - start_time
+        fields = recorder.fields()
+        ReporteGenerado.objects.filter(pk=reporte.pk).update(tiempo_ejecucion=execution_time, **fields)
+        send_json({
+            'tipo': 'fin',
+            'reporte_id': reporte.id,
+            'cantidad_resultados': fields['cantidad_resultados'],
+            'tiempo_ejecucion': execution_time,
+        })
+    finally:
+        close_old_connections()
+
+
+async def receive_start(receive):
+    """
+    Primer mensaje del cliente: {"token": "...", "formato": "PDF"} (formato
+    opcional). Retorna (usuario, formato) o lanza StreamClosed.
+    """
+    try:
+        message = await asyncio.wait_for(receive(), timeout=idle_timeout())
+    except asyncio.TimeoutError:
+        raise StreamClosed('No se recibió la autenticación a tiempo.', CLOSE_TIMEOUT)
+    if message['type'] == 'websocket.disconnect':
+        return None, None
+
+    try:
+        start = json.loads(message.get('text') or '')
+    except ValueError:
+        start = None
+    if not isinstance(start, dict):
+        raise StreamClosed('El primer mensaje debe ser {"token": "...", "formato": "..."}.', CLOSE_UNAUTHORIZED)
+
+    usuario = await sync_to_async(authenticate, thread_sensitive=False)(start.get('token'))
+    if usuario is None:
+        raise StreamClosed('Sesión no válida.', CLOSE_UNAUTHORIZED)
+
+    formato = str(start.get('formato') or '').upper() or None
+    if formato not in (None, 'JSON', *FILE_FORMATS):
+        raise StreamClosed(f"Formato no soportado: {formato}", CLOSE_BAD_REQUEST)
+    return usuario, formato
+
+
+async def voice_stream_application(scope, receive, send):
+    """
+    CU7 por streaming. El cliente se conecta a VOICE_STREAM_PATH, envía
+    {"token": "<token>", "formato": "<JSON|PDF|...>"} como primer mensaje, el
+    audio en mensajes binarios a medida que se graba y al terminar
+    {"accion": "fin"}. El audio se decodifica mientras llega; con el último
+    fragmento se transcribe y se ejecuta la consulta de inmediato.
+
+    Mensajes del servidor (texto JSON, campo "tipo"): progreso, transcripcion,
+    reporte + datos... (JSON) o archivo + fragmentos binarios, fin y error.
+    """
+    message = await receive()
+    if message['type'] != 'websocket.connect':
+        return
+
+    await send({'type': 'websocket.accept'})
+
+    async def send_json(data):
+        await send({'type': 'websocket.send', 'text': json.dumps(data, cls=DjangoJSONEncoder)})
+
+    async def send_bytes(data):
+        await send({'type': 'websocket.send', 'bytes': data})
+
+    decoder = None
+    try:
+        usuario, formato = await receive_start(receive)
+        if usuario is None:
+            return
+
+        ffmpeg_path = resolve_ffmpeg()['ffmpeg']
+        if ffmpeg_path is None:
+            raise StreamClosed('FFmpeg no está configurado en el servidor.', CLOSE_ERROR)
+        decoder = StreamingDecoder(ffmpeg_path, max_bytes=max_stream_bytes())
+        feed = sync_to_async(decoder.feed, thread_sensitive=False)
+
+        # Recibir y decodificar fragmentos hasta {"accion": "fin"}
+        while True:
+            try:
+                message = await asyncio.wait_for(receive(), timeout=idle_timeout())
+            except asyncio.TimeoutError:
+                raise StreamClosed('No se recibió audio a tiempo.', CLOSE_TIMEOUT)
+
+            if message['type'] == 'websocket.disconnect':
+                return
+            if message.get('bytes'):
+                await feed(message['bytes'])
+                await send_json({'tipo': 'progreso', 'bytes': decoder.received, 'segundos': round(decoder.seconds, 2)})
+            elif message.get('text'):
+                try:
+                    accion = json.loads(message['text']).get('accion')
+                except (ValueError, AttributeError):
+                    accion = None
+                if accion == 'fin':
+                    break
+                raise StreamClosed('Mensaje no reconocido; se espera audio o {"accion": "fin"}.', CLOSE_BAD_REQUEST)
+
+        pcm = await sync_to_async(decoder.finish, thread_sensitive=False)()
+        decoder = None
+
+        text = await sync_to_async(transcription_service.transcribe, thread_sensitive=False)(
+            pcm, SAMPLE_RATE, SAMPLE_WIDTH
+        )
+        await send_json({'tipo': 'transcripcion', 'texto': text})
+
+        # Formato elegido o, si no viene, el mencionado en el comando
+        await sync_to_async(run_report, thread_sensitive=False)(
+            usuario, text, formato, async_to_sync(send_json), async_to_sync(send_bytes)
+        )
+        await send({'type': 'websocket.close', 'code': CLOSE_NORMAL})
+
+    except StreamClosed as e:
+        await close_with_error(send, str(e), e.code)
+    except (AudioConversionError, TranscriptionError) as e:
+        await close_with_error(send, str(e), CLOSE_BAD_REQUEST)
+    except TranscriptionBusyError as e:
+        await close_with_error(send, str(e), CLOSE_BUSY)
+    except TranscriptionServiceError as e:
+        await close_with_error(send, str(e), CLOSE_ERROR)
+    except Exception as e:
+        traceback.print_exc()
+        await close_with_error(send, f'Error procesando comando de voz: {str(e)}', CLOSE_ERROR)
+    finally:
+        if decoder is not None:
+            # abort() espera a ffmpeg y a sus hilos: fuera del event loop
+            await sync_to_async(decoder.abort, thread_sensitive=False)()
+
+
+async def close_with_error(send, error, code):
+    await send({'type': 'websocket.send', 'text': json.dumps({'tipo': 'error', 'error': error})})
+    await send({'type': 'websocket.close', 'code': code})
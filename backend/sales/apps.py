@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class SalesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'backend.sales'
\ No newline at end of file
+    name = 'backend.sales'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,74 @@
+import hashlib
+import os
+import uuid
+import joblib
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class ArtifactChecksumError(Exception):
+    pass
+
+
+def file_checksum(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class LocalArtifactStore:
+    """
+    Guarda los modelos entrenados como archivos joblib comprimidos en un
+    directorio local. No se usa mmap_mode: al cargar un RandomForestRegressor
+    sklearn copia los arreglos de cada árbol, así que mapear el archivo no
+    comparte memoria entre workers y la compresión solo ahorra disco.
+    """
+
+    def __init__(self, base_dir=None, compress=None, verify=None):
+        self.base_dir = str(base_dir or getattr(
+            settings, 'SALES_MODEL_ARTIFACT_DIR', os.path.join(settings.BASE_DIR, 'model_artifacts')
+        ))
+        self.compress = compress if compress is not None else getattr(settings, 'SALES_MODEL_ARTIFACT_COMPRESS', 3)
+        self.verify = verify if verify is not None else getattr(settings, 'SALES_MODEL_ARTIFACT_VERIFY', True)
+
+    def save(self, payload, model_name):
+        """Escribe el artefacto y retorna (ruta relativa, sha256, tamaño en bytes)"""
+        directory = os.path.join(self.base_dir, model_name)
+        os.makedirs(directory, exist_ok=True)
+
+        relative_path = os.path.join(model_name, f'{uuid.uuid4().hex}.joblib')
+        full_path = os.path.join(self.base_dir, relative_path)
+
+        # Escribir a un temporal y renombrar para no dejar archivos a medias
+        tmp_path = full_path + '.tmp'
+        joblib.dump(payload, tmp_path, compress=self.compress)
+        os.replace(tmp_path, full_path)
+
+        return relative_path, file_checksum(full_path), os.path.getsize(full_path)
+
+    def load(self, relative_path, checksum=None):
+        full_path = os.path.join(self.base_dir, relative_path)
+
+        if self.verify and checksum and file_checksum(full_path) != checksum:
+            raise ArtifactChecksumError(f'Checksum inválido para el artefacto {relative_path}')
+
+        return joblib.load(full_path)
+
+    def delete(self, relative_path):
+        full_path = os.path.join(self.base_dir, relative_path)
+        if os.path.exists(full_path):
+            os.unlink(full_path)
+
+
+_store = None
+
+
+def get_artifact_store():
+    """Almacén configurado en SALES_MODEL_ARTIFACT_STORE (por defecto LocalArtifactStore)"""
+    global _store
+    if _store is None:
+        store_path = getattr(settings, 'SALES_MODEL_ARTIFACT_STORE', 'backend.sales.artifact_store.LocalArtifactStore')
+        _store = import_string(store_path)()
+    return _store
@@ -0,0 +1,99 @@
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+import numpy as np
+from django.utils import timezone
+from backend.commercial.models import Categoria, Producto, Cliente, Venta
+from backend.commercial.rollup import rebuild_rollup
+
+BULK_BATCH_SIZE = 5000
+
+
+@contextmanager
+def manual_fecha_venta():
+    """Permite fijar fecha_venta en bulk_create (normalmente es auto_now_add)"""
+    field = Venta._meta.get_field('fecha_venta')
+    original = field.auto_now_add
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = original
+
+
+def ensure_catalog(n_categories=5, n_products=50, n_clients=200):
+    """Crea (si faltan) categorías, productos y clientes de benchmark"""
+    categorias = []
+    for i in range(n_categories):
+        categoria, _ = Categoria.objects.get_or_create(nombre=f'Bench Categoría {i + 1}')
+        categorias.append(categoria)
+
+    productos = []
+    for i in range(n_products):
+        producto, _ = Producto.objects.get_or_create(
+            nombre=f'Bench Producto {i + 1}',
+            defaults={
+                'categoria': categorias[i % n_categories],
+                'precio': Decimal(str(round(10 + (i * 37) % 490, 2))),
+                'stock': 1000000,
+            }
+        )
+        productos.append(producto)
+
+    clientes = []
+    for i in range(n_clients):
+        cliente, _ = Cliente.objects.get_or_create(
+            email=f'bench{i + 1}@smartsales365.test',
+            defaults={'nombre': f'Bench Cliente {i + 1}'}
+        )
+        clientes.append(cliente)
+
+    return productos, clientes
+
+
+def generate_sales(n_rows, history_days=730, seed=42):
+    """
+    Inserta n_rows ventas sintéticas repartidas en los últimos history_days
+    días, con estacionalidad semanal y anual. Retorna la cantidad insertada.
+    """
+    rng = np.random.default_rng(seed)
+    productos, clientes = ensure_catalog()
+
+    # Más ventas entre semana y hacia fin de año
+    now = timezone.now()
+    dates = [now - timedelta(days=history_days - 1 - d) for d in range(history_days)]
+    weights = np.array([
+        (1.2 if d.weekday() < 5 else 0.7) * (1 + 0.3 * np.sin(2 * np.pi * d.timetuple().tm_yday / 365.25))
+        for d in dates
+    ])
+    weights /= weights.sum()
+
+    inserted = 0
+    with manual_fecha_venta():
+        while inserted < n_rows:
+            size = min(BULK_BATCH_SIZE, n_rows - inserted)
+            day_idx = rng.choice(history_days, size=size, p=weights)
+            product_idx = rng.integers(0, len(productos), size=size)
+            client_idx = rng.integers(0, len(clientes), size=size)
+            quantities = rng.integers(1, 20, size=size)
+            seconds = rng.integers(0, 86400, size=size)
+
+            ventas = []
+            for d, p, c, q, s in zip(day_idx, product_idx, client_idx, quantities, seconds):
+                producto = productos[p]
+                ventas.append(Venta(
+                    cliente=clientes[c],
+                    producto=producto,
+                    cantidad=int(q),
+                    precio_unitario=producto.precio,
+                    total=producto.precio * int(q),
+                    estado='COMPLETADA',
+                    fecha_venta=dates[d].replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(seconds=int(s)),
+                ))
+
+            Venta.objects.bulk_create(ventas, batch_size=BULK_BATCH_SIZE)
+            inserted += size
+
+    # bulk_create no dispara las señales que mantienen el resumen diario
+    rebuild_rollup(since=timezone.localtime(dates[0]).date())
+    return inserted
@@ -0,0 +1,28 @@
+from .ml_service import SalesPredictor, predictor
+from .forecasting import DailyForecaster, daily_forecaster
+
+# Motores de predicción disponibles: 'row' (por venta) y 'daily' (series diarias agregadas)
+ENGINE_CLASSES = {
+    'row': SalesPredictor,
+    'daily': DailyForecaster,
+}
+
+# Instancias globales usadas por las vistas de predicción
+ENGINE_INSTANCES = {
+    'row': predictor,
+    'daily': daily_forecaster,
+}
+
+DEFAULT_ENGINE = 'row'
+
+
+def validate_engine(name):
+    name = name or DEFAULT_ENGINE
+    if name not in ENGINE_CLASSES:
+        raise ValueError(f"Motor desconocido '{name}'. Opciones: {', '.join(ENGINE_CLASSES)}")
+    return name
+
+
+def get_engine(name=None):
+    """Instancia global del motor indicado"""
+    return ENGINE_INSTANCES[validate_engine(name)]
@@ -0,0 +1,60 @@
+import hashlib
+import json
+from datetime import datetime, time, timedelta
+from django.core.cache import caches
+from django.utils import timezone
+
+# Alias de caché (ver CACHES en settings; locmem por defecto)
+CACHE_ALIAS = 'forecasts'
+GENERATION_KEY = 'forecast:generation'
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _generation():
+    """Contador que invalida todas las entradas al guardarse un nuevo modelo"""
+    return _cache().get_or_set(GENERATION_KEY, 0, timeout=None)
+
+
+def scenario_key(scenarios):
+    if not scenarios:
+        return 'default'
+    raw = json.dumps(scenarios, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def make_key(engine, model_id, days, scenarios, start_date):
+    return (
+        f'forecast:{_generation()}:{engine}:{model_id}:{days}:'
+        f'{scenario_key(scenarios)}:{start_date.isoformat()}'
+    )
+
+
+def seconds_until_rollover():
+    """Las entradas expiran al cambiar de día (la fecha de inicio ya no es la misma)"""
+    now = timezone.localtime()
+    tomorrow = datetime.combine(now.date() + timedelta(days=1), time.min, tzinfo=now.tzinfo)
+    return max(int((tomorrow - now).total_seconds()), 1)
+
+
+def get_forecast(engine, model_id, days, scenarios, start_date):
+    return _cache().get(make_key(engine, model_id, days, scenarios, start_date))
+
+
+def set_forecast(engine, model_id, days, scenarios, start_date, response_data):
+    _cache().set(
+        make_key(engine, model_id, days, scenarios, start_date),
+        response_data,
+        timeout=seconds_until_rollover()
+    )
+
+
+def invalidate():
+    cache = _cache()
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        # La clave no existía todavía
+        cache.set(GENERATION_KEY, 1, timeout=None)
@@ -0,0 +1,290 @@
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from django.db.models import F, FloatField, Max, Sum
+from django.db.models.functions import Cast, Coalesce, TruncDate
+from django.utils import timezone
+from sklearn.linear_model import Ridge
+from sklearn.metrics import mean_absolute_error, r2_score
+from backend.commercial.models import Venta
+
+# Rezagos y ventanas móviles (en días) usados como características
+LAGS = [1, 7, 14, 28]
+ROLLING_WINDOWS = [7, 28]
+
+# Días de historia necesarios para calcular todas las características
+HISTORY_DAYS = max(LAGS + ROLLING_WINDOWS)
+
+# Fracción final de la serie que se reserva para evaluar el modelo
+TEST_FRACTION = 0.2
+
+
+def feature_names():
+    names = [f'lag_{lag}' for lag in LAGS]
+    names += [f'rolling_mean_{w}' for w in ROLLING_WINDOWS]
+    names += [f'rolling_std_{w}' for w in ROLLING_WINDOWS]
+    names += [f'dow_{d}' for d in range(7)]
+    names += ['doy_sin', 'doy_cos']
+    return names
+
+
+def to_day(value):
+    """Normaliza datetime/date/None a date"""
+    if isinstance(value, datetime):
+        return timezone.localtime(value).date() if timezone.is_aware(value) else value.date()
+    return value
+
+
+def calendar_features(dates):
+    """Día de la semana en one-hot y estacionalidad anual como seno/coseno"""
+    dates = pd.DatetimeIndex(dates)
+    dow = np.eye(7)[dates.dayofweek.to_numpy()]
+    angle = 2 * np.pi * dates.dayofyear.to_numpy() / 365.25
+    return np.column_stack([dow, np.sin(angle), np.cos(angle)])
+
+
+class DailyForecaster:
+    """
+    Motor de pronóstico sobre series diarias de ingresos agregadas en SQL
+    (GROUP BY día y categoría). Entrena un modelo lineal con rezagos y medias
+    móviles y pronostica de forma recursiva todas las categorías a la vez.
+    """
+
+    model_name = 'daily_forecaster'
+
+    def __init__(self):
+        self.model = None
+        self.feature_columns = feature_names()
+        self.series_keys = []
+
+    def get_daily_series(self, start_day=None, end_day=None, max_id=None):
+        """
+        Serie diaria de ingresos por categoría como DataFrame ancho
+        (índice = día, columnas = categoria_id), con los días sin ventas en 0.
+        """
+        start_day = to_day(start_day)
+        end_day = to_day(end_day)
+
+        queryset = Venta.objects.annotate(day=TruncDate('fecha_venta'))
+        if start_day:
+            queryset = queryset.filter(day__gte=start_day)
+        if end_day:
+            queryset = queryset.filter(day__lte=end_day)
+        if max_id is not None:
+            queryset = queryset.filter(id__lte=max_id)
+
+        rows = list(
+            queryset.values('day', 'producto__categoria_id')
+            .annotate(revenue=Sum(Cast(
+                Coalesce('total', F('cantidad') * F('precio_unitario')), FloatField()
+            )))
+            .order_by()
+            .values_list('day', 'producto__categoria_id', 'revenue')
+        )
+
+        if not rows:
+            return pd.DataFrame()
+
+        long = pd.DataFrame(rows, columns=['day', 'category_id', 'revenue'])
+        wide = long.pivot_table(index='day', columns='category_id', values='revenue', aggfunc='sum', fill_value=0.0)
+        wide.index = pd.DatetimeIndex(wide.index)
+
+        full_range = pd.date_range(start_day or wide.index.min(), end_day or wide.index.max(), freq='D')
+        return wide.reindex(full_range, fill_value=0.0).astype(np.float64)
+
+    def build_training_matrix(self, wide):
+        """
+        Calcula las características con shift/rolling sobre todas las series a
+        la vez y las apila en formato largo (fila = día x serie).
+        """
+        values = wide.to_numpy()
+        n_days, n_series = values.shape
+        shifted = wide.shift(1)
+
+        blocks = [wide.shift(lag).to_numpy() for lag in LAGS]
+        blocks += [shifted.rolling(w).mean().to_numpy() for w in ROLLING_WINDOWS]
+        blocks += [shifted.rolling(w).std(ddof=0).to_numpy() for w in ROLLING_WINDOWS]
+        series_features = np.stack([b.reshape(-1) for b in blocks], axis=1)
+
+        # Las características de calendario son iguales para todas las series del día
+        calendar = np.repeat(calendar_features(wide.index), n_series, axis=0)
+
+        X = np.hstack([series_features, calendar])
+        y = values.reshape(-1)
+        day_index = np.repeat(np.arange(n_days), n_series)
+
+        valid = ~np.isnan(X).any(axis=1)
+        return X[valid], y[valid], day_index[valid]
+
+    def _next_features(self, history, current_date):
+        """Características de un día futuro para todas las series (historia: días x series)"""
+        columns = [history[-lag] for lag in LAGS]
+        columns += [history[-w:].mean(axis=0) for w in ROLLING_WINDOWS]
+        columns += [history[-w:].std(axis=0) for w in ROLLING_WINDOWS]
+        series_features = np.column_stack(columns)
+        calendar = np.repeat(calendar_features([current_date]), history.shape[1], axis=0)
+        return np.hstack([series_features, calendar])
+
+    @staticmethod
+    def check_options(max_rows=None, mode='full'):
+        """El motor diario no muestrea ni entrena incrementalmente: se rechaza, como los escenarios"""
+        if max_rows is not None:
+            raise ValueError("El motor diario no admite max_rows (agrega todas las ventas en SQL)")
+        if mode != 'full':
+            raise ValueError("El motor diario solo admite el modo 'full'")
+
+    def train_model(self, start_date=None, end_date=None, max_rows=None,
+                    n_jobs=-1, progress_callback=None, mode='full'):
+        """
+        Entrena el motor diario. Misma firma y resultado que
+        SalesPredictor.train_model; max_rows y mode distinto de 'full' se
+        rechazan y n_jobs no aplica. Se entrena hasta ayer: el día en curso
+        está incompleto y sesgaría a la baja los rezagos y medias móviles.
+        """
+        def report(progress, message):
+            print(message)
+            if progress_callback:
+                progress_callback(progress, message)
+
+        try:
+            self.check_options(max_rows, mode)
+        except ValueError as e:
+            return {"error": str(e)}
+
+        try:
+            report(5, "Comenzando entrenamiento del motor diario...")
+
+            today = timezone.localdate()
+            yesterday = today - timedelta(days=1)
+            end_day = to_day(end_date)
+            end_day = min(end_day, yesterday) if end_day else yesterday
+
+            # Marca de agua: última venta anterior a hoy (la que cubre el modelo)
+            watermark = Venta.objects.filter(fecha_venta__date__lt=today).aggregate(
+                last_id=Max('id'), last_date=Max('fecha_venta')
+            )
+            wide = self.get_daily_series(start_date, end_day, max_id=watermark['last_id'])
+            report(30, f"Series diarias obtenidas: {len(wide)} días x {len(wide.columns)} categorías")
+
+            if wide.empty or len(wide) < HISTORY_DAYS + 10:
+                return {"error": f"No hay suficiente historia para el motor diario (mínimo {HISTORY_DAYS + 10} días)"}
+
+            X, y, day_index = self.build_training_matrix(wide)
+
+            # División temporal: los últimos días se usan para evaluar
+            split_day = day_index.min() + int((day_index.max() - day_index.min() + 1) * (1 - TEST_FRACTION))
+            train = day_index < split_day
+
+            report(40, "Entrenando modelo diario...")
+            model = Ridge(alpha=1.0)
+            model.fit(X[train], y[train])
+
+            y_pred = np.maximum(model.predict(X[~train]), 0)
+            mae = mean_absolute_error(y[~train], y_pred)
+            r2 = r2_score(y[~train], y_pred)
+            report(85, f"Modelo diario entrenado - R²: {r2:.4f}, MAE: {mae:.2f}")
+
+            # Reentrenar con toda la historia para el modelo final
+            model.fit(X, y)
+            self.model = model
+            self.series_keys = [int(key) for key in wide.columns]
+
+            # El artefacto lo escribe el almacén de modelos al guardar el TrainedModel
+            model_payload = {
+                'model': self.model,
+                'feature_columns': self.feature_columns,
+                'series_keys': self.series_keys,
+                'training_date': datetime.now(),
+                'metrics': {'mae': mae, 'r2': r2}
+            }
+
+            return {
+                'success': True,
+                'accuracy': r2,
+                'mae': mae,
+                'model_payload': model_payload,
+                'feature_columns': self.feature_columns,
+                'training_samples': int(len(y)),
+                'training_mode': 'full',
+                'last_venta_id': watermark['last_id'],
+                'last_venta_date': watermark['last_date']
+            }
+
+        except Exception as e:
+            error_msg = f"Error en entrenamiento diario: {str(e)}"
+            print(error_msg)
+            return {"error": error_msg}
+
+    def load_latest_model(self):
+        from .model_registry import model_registry
+
+        entry = model_registry.get(self.model_name)
+        if not entry:
+            return None
+
+        self.model = entry['model']
+        self.feature_columns = entry['feature_columns']
+        self.series_keys = entry['payload']['series_keys']
+        return entry
+
+    def forecast(self, history, last_history_date, start_date, days):
+        """
+        Pronóstico recursivo desde el día siguiente a la historia hasta
+        start_date + days. Retorna una matriz [días x series] desde start_date.
+        """
+        steps = (start_date - last_history_date).days - 1 + days
+        buffer = np.vstack([history, np.zeros((steps, history.shape[1]))])
+        offset = len(history)
+
+        for step in range(steps):
+            current_date = last_history_date + timedelta(days=step + 1)
+            X = self._next_features(buffer[:offset + step], current_date)
+            buffer[offset + step] = np.maximum(self.model.predict(X), 0)
+
+        return buffer[-days:]
+
+    def predict_sales(self, days=30, scenarios=None):
+        """Genera predicciones diarias totales y por categoría"""
+        try:
+            if scenarios:
+                return {"error": "El motor diario no admite escenarios"}
+
+            latest_model = self.load_latest_model()
+            if not latest_model:
+                return {"error": "No hay modelo diario entrenado disponible. Entrene el modelo primero."}
+
+            start_date = timezone.now().date()
+            last_history_date = start_date - timedelta(days=1)
+
+            # Historia reciente hasta ayer, agregada en SQL
+            wide = self.get_daily_series(
+                start_day=last_history_date - timedelta(days=HISTORY_DAYS - 1),
+                end_day=last_history_date
+            )
+            wide = wide.reindex(columns=self.series_keys, fill_value=0.0) if not wide.empty else pd.DataFrame(
+                np.zeros((HISTORY_DAYS, len(self.series_keys))), columns=self.series_keys
+            )
+
+            forecast = self.forecast(wide.to_numpy(), last_history_date, start_date, days)
+            dates = [start_date + timedelta(days=i) for i in range(days)]
+
+            return {
+                'dates': [d.isoformat() for d in dates],
+                'predictions': forecast.sum(axis=1).tolist(),
+                'categories': [
+                    {'category_id': key, 'predictions': forecast[:, idx].tolist()}
+                    for idx, key in enumerate(self.series_keys)
+                ],
+                'model_id': latest_model['id'],
+                'model_accuracy': latest_model['accuracy'],
+                'last_training': latest_model['training_date'].isoformat()
+            }
+
+        except Exception as e:
+            error_msg = f"Error en predicción diaria: {str(e)}"
+            print(error_msg)
+            return {"error": error_msg}
+
+
+# Instancia global
+daily_forecaster = DailyForecaster()
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+import time
+import tracemalloc
+from backend.sales.benchmark_data import generate_sales
+from backend.sales.engines import ENGINE_CLASSES
+
+class Command(BaseCommand):
+    help = 'Compara tiempo de entrenamiento y memoria del motor por venta contra el motor diario'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=0,
+                            help='Genera N ventas sintéticas (se revierten al terminar)')
+        parser.add_argument('--history-days', type=int, default=730,
+                            help='Días de historia de las ventas sintéticas')
+        parser.add_argument('--n-jobs', type=int, default=1,
+                            help='Núcleos para RandomForest')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['rows']:
+                self.stdout.write(f"Generando {options['rows']} ventas sintéticas...")
+                generate_sales(options['rows'], history_days=options['history_days'])
+
+            self.stdout.write(f"{'motor':>6} {'tiempo (s)':>11} {'pico memoria (MB)':>18} {'filas modelo':>13} {'R²':>8}")
+            for name, engine_class in ENGINE_CLASSES.items():
+                start = time.perf_counter()
+                result = engine_class().train_model(n_jobs=options['n_jobs'])
+                elapsed = time.perf_counter() - start
+
+                if 'error' in result:
+                    self.stdout.write(self.style.ERROR(f"{name:>6} {result['error']}"))
+                    continue
+
+                # Segunda pasada con tracemalloc para no distorsionar el tiempo
+                tracemalloc.start()
+                engine_class().train_model(n_jobs=options['n_jobs'])
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                self.stdout.write(
+                    f"{name:>6} {elapsed:>11.2f} {peak / 1024 / 1024:>18.1f} "
+                    f"{result['training_samples']:>13} {result['accuracy']:>8.4f}"
+                )
+
+            # Los datos sintéticos no se conservan
+            transaction.set_rollback(True)
@@ -0,0 +1,139 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from contextlib import contextmanager
+import json
+import platform
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+import sklearn
+from backend.commercial.models import Venta
+from backend.sales.artifact_store import LocalArtifactStore
+from backend.sales.benchmark_data import generate_sales
+from backend.sales.ml_service import SalesPredictor, FEATURE_COLUMNS
+from backend.sales.training_data import TrainingDataPipeline, TRAINING_COLUMNS, DEFAULT_MAX_ROWS
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class Command(BaseCommand):
+    help = ('Mide cada etapa del pipeline de ML (extracción, DataFrame, entrenamiento, '
+            'serialización, carga y predicción) sobre ventas sintéticas y emite JSON')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000],
+                            help='Cantidades de ventas sintéticas a medir')
+        parser.add_argument('--history-days', type=int, default=730,
+                            help='Días de historia de las ventas sintéticas')
+        parser.add_argument('--max-rows', type=int, default=DEFAULT_MAX_ROWS,
+                            help='Presupuesto de filas del pipeline de entrenamiento')
+        parser.add_argument('--horizon', type=int, default=30,
+                            help='Días a predecir en la etapa predict')
+        parser.add_argument('--n-jobs', type=int, default=1,
+                            help='Núcleos para RandomForest')
+        parser.add_argument('--no-memory', action='store_true',
+                            help='Desactiva tracemalloc (tiempos sin su sobrecarga, sin pico de memoria)')
+        parser.add_argument('--output', type=str, default=None,
+                            help='Archivo donde escribir el JSON (por defecto stdout)')
+
+    def handle(self, *args, **options):
+        self.trace_memory = not options['no_memory']
+        report = {
+            'environment': {
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'pandas': pd.__version__,
+                'sklearn': sklearn.__version__,
+                'database': connection.vendor,
+                'n_jobs': options['n_jobs'],
+                'max_rows': options['max_rows'],
+                'horizon': options['horizon'],
+                'tracemalloc': self.trace_memory,
+            },
+            'results': [],
+        }
+
+        with tempfile.TemporaryDirectory() as artifact_dir:
+            store = LocalArtifactStore(base_dir=artifact_dir, compress=0, verify=True)
+            for size in options['sizes']:
+                self.stderr.write(f"Midiendo {size} ventas sintéticas...")
+                report['results'].append(self._run_size(size, store, options))
+
+        if resource is not None:
+            # ru_maxrss viene en KB en Linux
+            report['environment']['max_rss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(output)
+            self.stderr.write(self.style.SUCCESS(f"Resultados escritos en {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+    def _run_size(self, size, store, options):
+        stages = {}
+        result = {'rows': size, 'stages': stages}
+
+        with transaction.atomic():
+            existing = Venta.objects.count()
+            start = time.perf_counter()
+            generate_sales(size, history_days=options['history_days'])
+            result['generate_seconds'] = round(time.perf_counter() - start, 3)
+            result['existing_rows'] = existing
+
+            pipeline = TrainingDataPipeline(max_rows=options['max_rows'])
+            with self._measure(stages, 'extract'):
+                data = pipeline.load_array()
+            result['training_rows'] = int(len(data))
+            result['sample_step'] = pipeline.sample_step
+
+            with self._measure(stages, 'dataframe'):
+                df = pd.DataFrame(data, columns=TRAINING_COLUMNS)
+
+            predictor = SalesPredictor()
+            with self._measure(stages, 'fit'):
+                model = predictor.build_model(options['n_jobs'])
+                model.fit(df[FEATURE_COLUMNS], df['total_sales'])
+
+            payload = {'model': model, 'feature_columns': list(FEATURE_COLUMNS)}
+            with self._measure(stages, 'serialize'):
+                relative_path, checksum, artifact_size = store.save(payload, 'benchmark')
+            result['artifact_bytes'] = artifact_size
+
+            with self._measure(stages, 'load'):
+                loaded = store.load(relative_path, checksum)
+
+            predictor.model = loaded['model']
+            predictor.feature_columns = loaded['feature_columns']
+            with self._measure(stages, 'predict'):
+                predictor.predict_batch(options['horizon'])
+
+            store.delete(relative_path)
+
+            # Los datos sintéticos no se conservan
+            transaction.set_rollback(True)
+
+        result['total_seconds'] = round(sum(stage['seconds'] for stage in stages.values()), 3)
+        return result
+
+    @contextmanager
+    def _measure(self, stages, name):
+        """Registra duración y pico de memoria Python (tracemalloc) de una etapa"""
+        if self.trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stage = {'seconds': round(time.perf_counter() - start, 4)}
+            if self.trace_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                stage['peak_mb'] = round(peak / 1024 / 1024, 2)
+            stages[name] = stage
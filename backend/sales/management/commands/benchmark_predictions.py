@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand
+from datetime import timedelta
+from django.utils import timezone
+import time
+import numpy as np
+from backend.sales.ml_service import SalesPredictor, DEFAULT_SCENARIO, FEATURE_COLUMNS
+
+class Command(BaseCommand):
+    help = 'Compara la latencia de predicción día a día contra la predicción por lotes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--horizons', type=int, nargs='+', default=[7, 30, 90, 365],
+                            help='Horizontes (días) a medir')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Repeticiones por horizonte (se reporta la mediana)')
+        parser.add_argument('--scenarios', type=int, default=1,
+                            help='Cantidad de escenarios por lote')
+
+    def handle(self, *args, **options):
+        predictor = SalesPredictor()
+
+        # Modelo en memoria con los mismos hiperparámetros que train_model
+        df = predictor.create_sample_data()
+        predictor.feature_columns = list(FEATURE_COLUMNS)
+        predictor.model = predictor.build_model()
+        predictor.model.fit(df[predictor.feature_columns], df['total_sales'])
+
+        # El lote siempre incluye DEFAULT_SCENARIO como primera fila
+        extra = [
+            {**DEFAULT_SCENARIO, 'price': DEFAULT_SCENARIO['price'] + 10 * i}
+            for i in range(1, options['scenarios'])
+        ]
+        scenarios = [DEFAULT_SCENARIO] + extra
+
+        self.stdout.write(f"{'días':>6} {'escenarios':>10} {'por día (ms)':>14} {'lote (ms)':>10} {'speedup':>8}")
+        for days in options['horizons']:
+            loop_ms = self._median_ms(lambda: self._predict_loop(predictor, days, scenarios), options['repeat'])
+            batch_ms = self._median_ms(lambda: predictor.predict_batch(days, extra), options['repeat'])
+            self.stdout.write(
+                f"{days:>6} {len(scenarios):>10} {loop_ms:>14.1f} {batch_ms:>10.1f} {loop_ms / batch_ms:>7.1f}x"
+            )
+
+    def _median_ms(self, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        return float(np.median(timings))
+
+    def _predict_loop(self, predictor, days, scenarios):
+        """Ruta anterior: una llamada a model.predict por día y escenario"""
+        start_date = timezone.now().date()
+        predictions = []
+        for scenario in scenarios:
+            for i in range(days):
+                current_date = start_date + timedelta(days=i)
+                features = {
+                    'month': current_date.month,
+                    'day_of_month': current_date.day,
+                    'day_of_week': current_date.weekday(),
+                    **scenario
+                }
+                feature_array = [features.get(col, 0) for col in predictor.feature_columns]
+                row = predictor._model_input(np.array([feature_array], dtype=np.float64))
+                predictions.append(float(max(0, predictor.model.predict(row)[0])))
+        return predictions
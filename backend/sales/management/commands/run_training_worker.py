@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+import time
+from backend.sales.training_jobs import claim_next_job, run_job
+
+class Command(BaseCommand):
+    help = 'Procesa los trabajos de entrenamiento del modelo de ventas en segundo plano'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='Procesa los trabajos en cola y termina')
+        parser.add_argument('--poll-interval', type=float, default=5.0,
+                            help='Segundos entre consultas cuando no hay trabajos')
+        parser.add_argument('--n-jobs', type=int, default=-1,
+                            help='Núcleos para RandomForest (-1 = todos los del worker)')
+
+    def handle(self, *args, **options):
+        self.stdout.write('Worker de entrenamiento iniciado')
+
+        while True:
+            close_old_connections()
+            job = claim_next_job()
+
+            if job:
+                self.stdout.write(f'Procesando trabajo {job.id}...')
+                job = run_job(job, n_jobs=options['n_jobs'])
+                style = self.style.SUCCESS if job.status == 'DONE' else self.style.ERROR
+                self.stdout.write(style(f'Trabajo {job.id}: {job.status} - {job.message}'))
+                continue
+
+            if options['once']:
+                break
+
+            time.sleep(options['poll_interval'])
+
+        self.stdout.write('Worker de entrenamiento detenido')
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0002_alter_salesprediction_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PredictionRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('horizon_days', models.IntegerField()),
+                ('start_date', models.DateField()),
+                ('status', models.CharField(choices=[('RUNNING', 'En ejecución'), ('COMPLETED', 'Completada'), ('RETIRED', 'Retirada')], default='RUNNING', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('trained_model', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='prediction_runs', to='sales.trainedmodel')),
+            ],
+            options={
+                'verbose_name': 'Ejecución de Predicción',
+                'verbose_name_plural': 'Ejecuciones de Predicción',
+                'db_table': 'prediction_run',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='salesprediction',
+            name='run',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='predictions', to='sales.predictionrun'),
+        ),
+        migrations.AddIndex(
+            model_name='predictionrun',
+            index=models.Index(fields=['trained_model', 'horizon_days', 'start_date', 'status'], name='prediction__trained_06e3ef_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0003_prediction_run'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrainingJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('QUEUED', 'En cola'), ('RUNNING', 'En ejecución'), ('DONE', 'Completado'), ('FAILED', 'Fallido')], default='QUEUED', max_length=10)),
+                ('progress', models.IntegerField(default=0)),
+                ('message', models.TextField(blank=True)),
+                ('params', models.JSONField(blank=True, default=dict)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('trained_model', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='training_jobs', to='sales.trainedmodel')),
+            ],
+            options={
+                'verbose_name': 'Trabajo de Entrenamiento',
+                'verbose_name_plural': 'Trabajos de Entrenamiento',
+                'db_table': 'training_job',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='training_jo_status_73cf95_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0004_training_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trainedmodel',
+            name='last_venta_date',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='trainedmodel',
+            name='last_venta_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='trainedmodel',
+            name='training_mode',
+            field=models.CharField(default='full', max_length=12),
+        ),
+    ]
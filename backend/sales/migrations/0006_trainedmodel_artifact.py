@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0005_trainedmodel_watermark'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trainedmodel',
+            name='artifact_checksum',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='trainedmodel',
+            name='artifact_path',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='trainedmodel',
+            name='artifact_size',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -1,53 +1,71 @@
+import copy
 import pandas as pd
 import numpy as np
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error, r2_score
 from django.db import connection
+from django.db.models import Max
 import joblib
 import io
 from datetime import datetime, timedelta
 from django.utils import timezone
 from backend.commercial.models import Venta, Producto, Cliente, Categoria
+from .training_data import TrainingDataPipeline, DEFAULT_MAX_ROWS
+
+# Valores por defecto para las características que no dependen de la fecha
+DEFAULT_SCENARIO = {
+    'price': 150.0,  # Valor promedio razonable
+    'category_id': 3,  # Categoría promedio
+    'total_quantity': 8  # Cantidad promedio
+}
+
+# Límite de escenarios por solicitud para acotar el tamaño del lote
+MAX_SCENARIOS = 20
+
+# Horizonte máximo de predicción en días
+MAX_DAYS = 365
+
+FEATURE_COLUMNS = ['month', 'day_of_month', 'day_of_week', 'price', 'category_id', 'total_quantity']
+
+# Árboles que agrega cada reentrenamiento incremental y tope antes de reentrenar desde cero
+INCREMENTAL_TREES = 10
+MAX_ESTIMATORS = 300
 
 class SalesPredictor:
+    model_name = 'sales_predictor'
+
     def __init__(self):
         self.model = None
         self.feature_columns = []
         
-    def get_training_data(self):
-        """Obtiene datos históricos de ventas para entrenamiento usando tus modelos commercial"""
-        try:
-            # Verificar si hay datos reales en la base de datos
-            if Venta.objects.count() == 0:
-                print("No hay ventas en la base de datos. Creando datos de ejemplo...")
-                return self.create_sample_data()
-            
-            # Usar el ORM de Django para obtener los datos de tus modelos commercial
-            ventas = Venta.objects.select_related('producto', 'cliente', 'producto__categoria').all()
-            
-            if not ventas:
-                return self.create_sample_data()
-                
-            # Preparar datos para el DataFrame
-            data = []
-            for venta in ventas:
-                data.append({
-                    'month': venta.fecha_venta.month,
-                    'day_of_month': venta.fecha_venta.day,
-                    'day_of_week': venta.fecha_venta.weekday(),
-                    'price': float(venta.precio_unitario),
-                    'category_id': venta.producto.categoria.id if venta.producto.categoria else 1,
-                    'total_quantity': venta.cantidad,
-                    'total_sales': float(venta.total) if venta.total else float(venta.cantidad * venta.precio_unitario)
-                })
-            
-            df = pd.DataFrame(data)
-            return df
-            
-        except Exception as e:
-            print(f"Error obteniendo datos reales: {e}. Creando datos de ejemplo...")
+    def get_training_data(self, start_date=None, end_date=None, max_rows=DEFAULT_MAX_ROWS, max_id=None):
+        """
+        Obtiene datos históricos de ventas para entrenamiento usando tus modelos commercial.
+        Las características se calculan en SQL y se leen por bloques; opcionalmente
+        se limita a una ventana de fechas y a un máximo de filas (muestreo).
+        Los datos de ejemplo solo se usan si la tabla de ventas está vacía; si
+        hay ventas pero ninguna en la ventana pedida se retorna un DataFrame
+        vacío, y un error al leerlas se propaga (no se entrena con datos
+        sintéticos).
+        """
+        # Verificar si hay datos reales en la base de datos
+        if not Venta.objects.exists():
+            print("No hay ventas en la base de datos. Creando datos de ejemplo...")
             return self.create_sample_data()
+
+        pipeline = TrainingDataPipeline(
+            start_date=start_date, end_date=end_date, max_id=max_id, max_rows=max_rows
+        )
+        df = pipeline.load()
+
+        if df.empty:
+            return df
+
+        if pipeline.sample_step > 1:
+            print(f"Muestreo aplicado: 1 de cada {pipeline.sample_step} ventas")
+
+        return df
     
     def create_sample_data(self):
         """Crea datos de ejemplo para entrenamiento cuando no hay datos reales"""
@@ -79,127 +97,247 @@ class SalesPredictor:
         df = pd.DataFrame(data)
         return df
     
-    def train_model(self):
-        """Entrena el modelo Random Forest"""
+    def build_model(self, n_jobs=-1):
+        """Random Forest con parámetros optimizados"""
+        return RandomForestRegressor(
+            n_estimators=50,  # Reducido para mayor velocidad
+            max_depth=8,
+            min_samples_split=5,
+            random_state=42,
+            n_jobs=n_jobs
+        )
+
+    def get_watermark(self, end_date=None):
+        """Última venta (id y fecha) que entra en un entrenamiento"""
+        queryset = Venta.objects.all()
+        if end_date:
+            queryset = queryset.filter(fecha_venta__lte=end_date)
+        return queryset.aggregate(last_id=Max('id'), last_date=Max('fecha_venta'))
+
+    def train_model(self, start_date=None, end_date=None, max_rows=DEFAULT_MAX_ROWS,
+                    n_jobs=-1, progress_callback=None, mode='full'):
+        """
+        Entrena el modelo Random Forest.
+        mode='incremental' agrega árboles al último modelo usando solo las ventas
+        posteriores a su marca de agua (last_venta_id); si no es posible, entrena desde cero.
+        progress_callback(porcentaje, mensaje) se invoca en cada etapa si se indica.
+        """
+        def report(progress, message):
+            print(message)
+            if progress_callback:
+                progress_callback(progress, message)
+
         try:
-            print("Comenzando entrenamiento del modelo...")
-            
+            report(5, "Comenzando entrenamiento del modelo...")
+
+            base = None
+            if mode == 'incremental':
+                base = self._get_incremental_base()
+                if not base:
+                    report(5, "Sin modelo base incremental, se entrena desde cero")
+
+            watermark = self.get_watermark(end_date)
+
             # Obtener datos
-            df = self.get_training_data()
-            print(f"Datos obtenidos: {len(df)} registros")
+            if base:
+                pipeline = TrainingDataPipeline(
+                    min_id=base['last_venta_id'], max_id=watermark['last_id'], max_rows=max_rows
+                )
+                df = pipeline.load()
+                report(30, f"Ventas nuevas desde la venta {base['last_venta_id']}: {len(df)} registros")
+            else:
+                df = self.get_training_data(start_date, end_date, max_rows, max_id=watermark['last_id'])
+                if df.empty:
+                    return {"error": "No hay ventas en el rango indicado"}
+                report(30, f"Datos obtenidos: {len(df)} registros")
             
             if len(df) < 10:
+                if base:
+                    return {"error": "No hay suficientes ventas nuevas desde el último entrenamiento (mínimo 10 registros)"}
                 return {"error": "No hay suficientes datos para entrenar el modelo (mínimo 10 registros)"}
             
             # Preparar características y objetivo
-            feature_columns = ['month', 'day_of_month', 'day_of_week', 'price', 'category_id', 'total_quantity']
-            X = df[feature_columns]
+            X = df[FEATURE_COLUMNS]
             y = df['total_sales']
             
-            self.feature_columns = feature_columns
+            self.feature_columns = list(FEATURE_COLUMNS)
             
-            print("Dividiendo datos en entrenamiento y prueba...")
+            report(35, "Dividiendo datos en entrenamiento y prueba...")
             # Dividir datos
             X_train, X_test, y_train, y_test = train_test_split(
                 X, y, test_size=0.2, random_state=42
             )
             
-            print("Entrenando modelo Random Forest...")
-            # Entrenar modelo con parámetros optimizados
-            self.model = RandomForestRegressor(
-                n_estimators=50,  # Reducido para mayor velocidad
-                max_depth=8,
-                min_samples_split=5,
-                random_state=42,
-                n_jobs=-1
-            )
-            
-            self.model.fit(X_train, y_train)
+            if base:
+                report(40, f"Agregando {INCREMENTAL_TREES} árboles al modelo {base['id']}...")
+                # Copia para no modificar el estimador compartido por el registro
+                self.model = copy.deepcopy(base['model'])
+                self.model.set_params(
+                    warm_start=True,
+                    n_estimators=self.model.n_estimators + INCREMENTAL_TREES,
+                    n_jobs=n_jobs
+                )
+                self.model.fit(X_train, y_train)
+                self.model.set_params(warm_start=False)
+                training_samples = base['training_samples'] + len(df)
+            else:
+                report(40, "Entrenando modelo Random Forest...")
+                self.model = self.build_model(n_jobs)
+                self.model.fit(X_train, y_train)
+                training_samples = len(df)
             
             # Evaluar modelo
             y_pred = self.model.predict(X_test)
             mae = mean_absolute_error(y_test, y_pred)
             r2 = r2_score(y_test, y_pred)
             
-            print(f"Modelo entrenado - R²: {r2:.4f}, MAE: {mae:.2f}")
+            report(85, f"Modelo entrenado - R²: {r2:.4f}, MAE: {mae:.2f}")
             
-            # Guardar modelo serializado
-            model_buffer = io.BytesIO()
-            joblib.dump({
+            # El artefacto lo escribe el almacén de modelos al guardar el TrainedModel
+            model_payload = {
                 'model': self.model,
                 'feature_columns': self.feature_columns,
                 'training_date': datetime.now(),
                 'metrics': {'mae': mae, 'r2': r2}
-            }, model_buffer)
+            }
             
             return {
                 'success': True,
                 'accuracy': r2,
                 'mae': mae,
-                'model_data': model_buffer.getvalue(),
+                'model_payload': model_payload,
                 'feature_columns': self.feature_columns,
-                'training_samples': len(df)
+                'training_samples': training_samples,
+                'training_mode': 'incremental' if base else 'full',
+                # Con la tabla de ventas vacía (datos de ejemplo) la marca de agua es None
+                'last_venta_id': watermark['last_id'],
+                'last_venta_date': watermark['last_date']
             }
             
         except Exception as e:
             error_msg = f"Error en entrenamiento: {str(e)}"
             print(error_msg)
             return {"error": error_msg}
+
+    def _get_incremental_base(self):
+        """Último modelo apto para agregarle árboles, o None"""
+        from .model_registry import model_registry
+
+        entry = model_registry.get(self.model_name)
+        if not entry or entry.get('last_venta_id') is None:
+            return None
+
+        model = entry['model']
+        if not isinstance(model, RandomForestRegressor) or entry['feature_columns'] != FEATURE_COLUMNS:
+            return None
+
+        if model.n_estimators + INCREMENTAL_TREES > MAX_ESTIMATORS:
+            print(f"El modelo alcanzó {model.n_estimators} árboles, se reentrena desde cero")
+            return None
+
+        return entry
     
-    def predict_sales(self, days=30):
+    def load_latest_model(self):
+        """
+        Carga el último modelo entrenado desde el registro en memoria.
+        Retorna el dict del registro (id, training_date, accuracy, ...) o None
+        """
+        from .model_registry import model_registry
+
+        entry = model_registry.get(self.model_name)
+        if not entry:
+            return None
+
+        self.model = entry['model']
+        self.feature_columns = entry['feature_columns']
+        return entry
+
+    def build_feature_matrix(self, dates, scenarios):
+        """
+        Construye la matriz de características para todo el horizonte y todos
+        los escenarios: una fila por (escenario, fecha), columnas en el orden
+        de self.feature_columns.
+        """
+        n_days = len(dates)
+        n_scenarios = len(scenarios)
+        matrix = np.zeros((n_scenarios * n_days, len(self.feature_columns)), dtype=np.float64)
+
+        calendar_features = {
+            'month': dates.month.to_numpy(),
+            'day_of_month': dates.day.to_numpy(),
+            'day_of_week': dates.dayofweek.to_numpy(),
+        }
+
+        for col_idx, col in enumerate(self.feature_columns):
+            if col in calendar_features:
+                # Las columnas de calendario se repiten para cada escenario
+                matrix[:, col_idx] = np.tile(calendar_features[col], n_scenarios)
+            else:
+                values = [float(scenario.get(col, 0)) for scenario in scenarios]
+                matrix[:, col_idx] = np.repeat(values, n_days)
+
+        return matrix
+
+    def _model_input(self, matrix):
+        """Adapta la matriz al formato con el que se ajustó el modelo"""
+        if hasattr(self.model, 'feature_names_in_'):
+            return pd.DataFrame(matrix, columns=self.feature_columns)
+        return matrix
+
+    def predict_batch(self, days=30, scenarios=None, start_date=None):
+        """
+        Predice todo el horizonte para uno o varios escenarios con una sola
+        llamada a model.predict. Requiere que el modelo esté cargado.
+        La fila 0 es siempre DEFAULT_SCENARIO; las siguientes, los escenarios
+        pedidos (completados con los valores por defecto).
+        Retorna (fechas, matriz de predicciones [1 + escenarios x días], escenarios)
+        """
+        scenarios = [dict(DEFAULT_SCENARIO)] + [
+            {**DEFAULT_SCENARIO, **(scenario or {})}
+            for scenario in (scenarios or [])
+        ]
+        start_date = start_date or timezone.now().date()
+        dates = pd.date_range(start=start_date, periods=days, freq='D')
+
+        matrix = self.build_feature_matrix(dates, scenarios)
+        raw = self.model.predict(self._model_input(matrix))
+
+        # Evitar valores negativos
+        predictions = np.maximum(raw, 0).reshape(len(scenarios), days)
+        return [d.date() for d in dates], predictions, scenarios
+
+    def predict_sales(self, days=30, scenarios=None):
         """Genera predicciones para los próximos días"""
         try:
-            from .models import TrainedModel
-            
             # Cargar último modelo entrenado
-            latest_model = TrainedModel.objects.filter(
-                model_name='sales_predictor'
-            ).order_by('-training_date').first()
-            
+            latest_model = self.load_latest_model()
+
             if not latest_model:
                 return {"error": "No hay modelo entrenado disponible. Entrene el modelo primero."}
-            
-            # Cargar modelo
-            model_data = joblib.load(io.BytesIO(latest_model.model_file))
-            self.model = model_data['model']
-            self.feature_columns = model_data['feature_columns']
-            
+
             print(f"Modelo cargado. Características: {self.feature_columns}")
-            
-            # Generar fechas futuras
-            future_dates = []
-            predictions = []
-            
-            start_date = timezone.now().date()
-            for i in range(days):
-                current_date = start_date + timedelta(days=i)
-                
-                # Crear características para la fecha (valores promedio/razonables)
-                features = {
-                    'month': current_date.month,
-                    'day_of_month': current_date.day,
-                    'day_of_week': current_date.weekday(),
-                    'price': 150.0,  # Valor promedio razonable
-                    'category_id': 3,  # Categoría promedio
-                    'total_quantity': 8  # Cantidad promedio
-                }
-                
-                # Asegurar que todas las características estén presentes
-                feature_array = [features.get(col, 0) for col in self.feature_columns]
-                prediction = self.model.predict([feature_array])[0]
-                
-                future_dates.append(current_date)
-                predictions.append(float(max(0, prediction)))  # Evitar valores negativos
-            
-            print(f"Predicciones generadas: {len(predictions)} días")
-            
-            return {
+
+            future_dates, predictions, used_scenarios = self.predict_batch(days, scenarios)
+
+            print(f"Predicciones generadas: {len(future_dates)} días x {len(used_scenarios)} escenarios")
+
+            result = {
                 'dates': [d.isoformat() for d in future_dates],
-                'predictions': predictions,
-                'model_accuracy': latest_model.accuracy,
-                'last_training': latest_model.training_date.isoformat()
+                'predictions': predictions[0].tolist(),
+                'model_id': latest_model['id'],
+                'model_accuracy': latest_model['accuracy'],
+                'last_training': latest_model['training_date'].isoformat()
             }
-            
+
+            # La serie principal es la del escenario por defecto; los pedidos van aparte
+            if scenarios:
+                result['scenarios'] = [
+                    {'scenario': scenario, 'predictions': row.tolist()}
+                    for scenario, row in zip(used_scenarios[1:], predictions[1:])
+                ]
+
+            return result
+
         except Exception as e:
             error_msg = f"Error en predicción: {str(e)}"
             print(error_msg)
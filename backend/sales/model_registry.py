@@ -0,0 +1,150 @@
+import io
+import threading
+import time
+import joblib
+
+
+class ModelRegistry:
+    """
+    Mantiene en memoria (por worker) el último modelo deserializado.
+    Solo vuelve a leer y deserializar model_file cuando existe un
+    TrainedModel más reciente que el que está en caché.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.last_load_time = 0.0
+        self.total_load_time = 0.0
+
+    def latest_version(self, model_name):
+        """Consulta barata: solo id y metadatos, sin el blob del modelo"""
+        from .models import TrainedModel
+
+        return TrainedModel.objects.filter(
+            model_name=model_name
+        ).order_by('-training_date', '-id').values(
+            'id', 'training_date', 'accuracy', 'training_samples', 'last_venta_id'
+        ).first()
+
+    def _load(self, model_id):
+        from .models import TrainedModel
+        from .artifact_store import get_artifact_store
+
+        start = time.perf_counter()
+        record = TrainedModel.objects.filter(id=model_id).values(
+            'artifact_path', 'artifact_checksum'
+        ).first()
+        if record is None:
+            return None
+
+        if record['artifact_path']:
+            # Arreglos NumPy mapeados en memoria y compartidos entre workers
+            model_data = get_artifact_store().load(record['artifact_path'], record['artifact_checksum'])
+        else:
+            # Modelos antiguos guardados dentro de la fila
+            model_file = TrainedModel.objects.filter(id=model_id).values_list('model_file', flat=True).first()
+            if model_file is None:
+                return None
+            model_data = joblib.load(io.BytesIO(model_file))
+
+        elapsed = time.perf_counter() - start
+
+        self.loads += 1
+        self.last_load_time = elapsed
+        self.total_load_time += elapsed
+        return model_data
+
+    def get(self, model_name='sales_predictor'):
+        """
+        Retorna el último modelo como dict con id, training_date, accuracy,
+        model y feature_columns, o None si no hay modelo entrenado.
+        """
+        version = self.latest_version(model_name)
+        if not version:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(model_name)
+            if entry and entry['id'] == version['id'] and entry['training_date'] == version['training_date']:
+                self.hits += 1
+                return entry
+
+            self.misses += 1
+            model_data = self._load(version['id'])
+            if model_data is None:
+                return None
+
+            entry = {
+                'id': version['id'],
+                'training_date': version['training_date'],
+                'accuracy': version['accuracy'],
+                'training_samples': version['training_samples'],
+                'last_venta_id': version['last_venta_id'],
+                'model': model_data['model'],
+                'feature_columns': model_data['feature_columns'],
+                'payload': model_data,
+            }
+            self._entries[model_name] = entry
+            return entry
+
+    def retire_old_models(self, model_name, keep=None):
+        """
+        Borra los artefactos de las versiones anteriores a las últimas `keep`
+        (SALES_MODEL_KEEP_VERSIONS) de un modelo. Las filas TrainedModel se
+        conservan con sus métricas, sin archivo. Retorna cuántos se borraron.
+        """
+        from django.conf import settings
+        from .models import TrainedModel
+        from .artifact_store import get_artifact_store
+
+        # Nunca se borra el último modelo: es el que se sirve
+        keep = max(keep if keep is not None else getattr(settings, 'SALES_MODEL_KEEP_VERSIONS', 3), 1)
+        versions = TrainedModel.objects.filter(model_name=model_name).order_by('-training_date', '-id')
+        keep_ids = list(versions.values_list('id', flat=True)[:keep])
+        retired = list(
+            versions.exclude(id__in=keep_ids).exclude(artifact_path='').values_list('id', 'artifact_path')
+        )
+
+        store = get_artifact_store()
+        for model_id, artifact_path in retired:
+            try:
+                store.delete(artifact_path)
+            except OSError as e:
+                print(f"No se pudo borrar el artefacto {artifact_path}: {e}")
+                continue
+            TrainedModel.objects.filter(id=model_id).update(
+                artifact_path='', artifact_checksum='', artifact_size=None
+            )
+        return len(retired)
+
+    def invalidate(self, model_name=None):
+        with self._lock:
+            if model_name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(model_name, None)
+
+    def stats(self):
+        with self._lock:
+            entries = dict(self._entries)
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'loads': self.loads,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'last_load_time': self.last_load_time,
+            'avg_load_time': self.total_load_time / self.loads if self.loads else 0.0,
+            'cached_models': {
+                name: {'id': entry['id'], 'training_date': entry['training_date'].isoformat()}
+                for name, entry in entries.items()
+            },
+        }
+
+
+# Instancia global (una por proceso worker)
+model_registry = ModelRegistry()
@@ -2,9 +2,17 @@ import joblib
 import numpy as np
 import pandas as pd
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import User
 
 class SalesPrediction(models.Model):
+    run = models.ForeignKey(
+        'PredictionRun',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='predictions'
+    )
     date = models.DateField()
     predicted_sales = models.DecimalField(max_digits=10, decimal_places=2)
     confidence_interval = models.DecimalField(max_digits=10, decimal_places=2)
@@ -20,11 +28,19 @@ class SalesPrediction(models.Model):
 
 class TrainedModel(models.Model):
     model_name = models.CharField(max_length=100, default='sales_predictor')
+    # Legado: los modelos nuevos se guardan como archivo en el almacén de artefactos
     model_file = models.BinaryField(null=True, blank=True)
+    artifact_path = models.CharField(max_length=255, blank=True)
+    artifact_checksum = models.CharField(max_length=64, blank=True)
+    artifact_size = models.BigIntegerField(null=True, blank=True)
     accuracy = models.FloatField(null=True, blank=True)
     training_date = models.DateTimeField(auto_now_add=True)
     feature_columns = models.JSONField(default=list)
     training_samples = models.IntegerField(default=0)
+    training_mode = models.CharField(max_length=12, default='full')
+    # Marca de agua: última venta incluida en el entrenamiento
+    last_venta_id = models.BigIntegerField(null=True, blank=True)
+    last_venta_date = models.DateTimeField(null=True, blank=True)
     
     def __str__(self):
         return f"{self.model_name} - {self.training_date.strftime('%Y-%m-%d %H:%M')}"
@@ -33,4 +49,83 @@ class TrainedModel(models.Model):
         db_table = 'trained_model'
         verbose_name = 'Modelo Entrenado'
         verbose_name_plural = 'Modelos Entrenados'
-        ordering = ['-training_date']
\ No newline at end of file
+        ordering = ['-training_date']
+
+class PredictionRun(models.Model):
+    STATUS_CHOICES = [
+        ('RUNNING', 'En ejecución'),
+        ('COMPLETED', 'Completada'),
+        ('RETIRED', 'Retirada'),
+    ]
+
+    trained_model = models.ForeignKey(
+        TrainedModel,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='prediction_runs'
+    )
+    horizon_days = models.IntegerField()
+    start_date = models.DateField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='RUNNING')
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Ejecución {self.id} - {self.horizon_days} días desde {self.start_date} ({self.status})"
+
+    class Meta:
+        db_table = 'prediction_run'
+        verbose_name = 'Ejecución de Predicción'
+        verbose_name_plural = 'Ejecuciones de Predicción'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['trained_model', 'horizon_days', 'start_date', 'status']),
+        ]
+
+
+class TrainingJob(models.Model):
+    STATUS_CHOICES = [
+        ('QUEUED', 'En cola'),
+        ('RUNNING', 'En ejecución'),
+        ('DONE', 'Completado'),
+        ('FAILED', 'Fallido'),
+    ]
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='QUEUED')
+    progress = models.IntegerField(default=0)
+    message = models.TextField(blank=True)
+    params = models.JSONField(default=dict, blank=True)
+    trained_model = models.ForeignKey(
+        TrainedModel,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='training_jobs'
+    )
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Lo actualiza el worker mientras entrena; si se detiene, el trabajo queda obsoleto
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Entrenamiento {self.id} - {self.status} ({self.progress}%)"
+
+    @property
+    def duration(self):
+        """Segundos de ejecución (hasta ahora si sigue en curso)"""
+        if not self.started_at:
+            return None
+        end = self.finished_at or timezone.now()
+        return (end - self.started_at).total_seconds()
+
+    class Meta:
+        db_table = 'training_job'
+        verbose_name = 'Trabajo de Entrenamiento'
+        verbose_name_plural = 'Trabajos de Entrenamiento'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
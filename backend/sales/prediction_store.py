@@ -0,0 +1,117 @@
+import threading
+from datetime import datetime, timedelta
+from django.db import connection, transaction
+from django.utils import timezone
+from .models import PredictionRun, SalesPrediction
+
+# Tamaño de lote para bulk_create
+BULK_BATCH_SIZE = 500
+
+# Ejecuciones completadas que se conservan por horizonte al retirar las anteriores
+KEEP_COMPLETED_RUNS = 5
+
+# Una ejecución que sigue en RUNNING pasado este tiempo se considera abandonada
+STALE_RUN_AGE = timedelta(hours=1)
+
+
+def get_completed_run(trained_model_id, horizon_days, start_date):
+    """Última ejecución completada para el modelo, horizonte y fecha de inicio dados"""
+    return PredictionRun.objects.filter(
+        trained_model_id=trained_model_id,
+        horizon_days=horizon_days,
+        start_date=start_date,
+        status='COMPLETED'
+    ).order_by('-completed_at', '-id').first()
+
+
+def get_run_predictions(run):
+    """Retorna (fechas ISO, predicciones) de una ejecución ordenadas por fecha"""
+    rows = SalesPrediction.objects.filter(run=run).order_by('date').values_list('date', 'predicted_sales')
+    dates = []
+    predictions = []
+    for date, predicted_sales in rows:
+        dates.append(date.isoformat())
+        predictions.append(float(predicted_sales))
+    return dates, predictions
+
+
+def save_prediction_run(trained_model_id, horizon_days, dates, predictions):
+    """
+    Persiste una ejecución completa con bulk_create. La ejecución solo pasa a
+    COMPLETED cuando todas sus filas están escritas, así las lecturas nunca
+    ven una ejecución a medias.
+    """
+    start_date = datetime.fromisoformat(dates[0]).date() if dates else timezone.now().date()
+
+    run = PredictionRun.objects.create(
+        trained_model_id=trained_model_id,
+        horizon_days=horizon_days,
+        start_date=start_date
+    )
+
+    rows = [
+        SalesPrediction(
+            run=run,
+            date=datetime.fromisoformat(date_str),
+            predicted_sales=round(prediction, 2),
+            confidence_interval=round(prediction * 0.1, 2)  # 10% de intervalo de confianza
+        )
+        for date_str, prediction in zip(dates, predictions)
+    ]
+
+    with transaction.atomic():
+        SalesPrediction.objects.bulk_create(rows, batch_size=BULK_BATCH_SIZE)
+        run.status = 'COMPLETED'
+        run.completed_at = timezone.now()
+        run.save(update_fields=['status', 'completed_at'])
+
+    return run
+
+
+def retire_old_runs(keep=KEEP_COMPLETED_RUNS):
+    """
+    Retira las ejecuciones anteriores a las últimas `keep` completadas de
+    cada horizonte (un horizonte muy pedido no desplaza a los demás), las
+    abandonadas en RUNNING y las predicciones sin ejecución (legado).
+    Retorna la cantidad de ejecuciones eliminadas.
+    """
+    completed = PredictionRun.objects.filter(status='COMPLETED')
+    keep_ids = []
+    for horizon_days in completed.order_by().values_list('horizon_days', flat=True).distinct():
+        keep_ids.extend(
+            completed.filter(horizon_days=horizon_days)
+            .order_by('-completed_at', '-id')
+            .values_list('id', flat=True)[:keep]
+        )
+    stale_before = timezone.now() - STALE_RUN_AGE
+
+    old_runs = PredictionRun.objects.exclude(id__in=keep_ids).exclude(
+        status='RUNNING', created_at__gte=stale_before
+    )
+    old_ids = list(old_runs.values_list('id', flat=True))
+
+    if old_ids:
+        # Marcar primero para que dejen de servirse, luego borrar
+        PredictionRun.objects.filter(id__in=old_ids).update(status='RETIRED')
+        SalesPrediction.objects.filter(run_id__in=old_ids).delete()
+        PredictionRun.objects.filter(id__in=old_ids).delete()
+
+    SalesPrediction.objects.filter(run__isnull=True).delete()
+    return len(old_ids)
+
+
+def _retire_in_background(keep):
+    try:
+        retire_old_runs(keep)
+    except Exception as e:
+        print(f"Error retirando ejecuciones de predicción: {e}")
+    finally:
+        # El hilo tiene su propia conexión; cerrarla para no dejarla abierta
+        connection.close()
+
+
+def retire_old_runs_async(keep=KEEP_COMPLETED_RUNS):
+    """Retira ejecuciones antiguas en un hilo aparte para no bloquear la respuesta"""
+    thread = threading.Thread(target=_retire_in_background, args=(keep,), daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from .models import TrainedModel
+from . import forecast_cache
+
+
+@receiver(post_save, sender=TrainedModel)
+def invalidate_forecasts_on_new_model(sender, instance, created, **kwargs):
+    """Un modelo nuevo deja obsoletos los pronósticos en caché"""
+    if created:
+        forecast_cache.invalidate()
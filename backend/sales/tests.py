@@ -1,3 +1,46 @@
+from unittest import mock
 from django.test import TestCase
+from rest_framework.test import APIClient
+from backend.access_control.models import Usuario
+from .ml_service import MAX_DAYS, SalesPredictor
 
-# Create your tests here.
+
+class GetPredictionsDaysTests(TestCase):
+    """days fuera de 1..MAX_DAYS se rechaza antes de llegar al modelo"""
+
+    url = '/api/sales/api/get-predictions/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = Usuario.objects.create_user(username='admin', password='x')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assertRejected(self, days, message):
+        with mock.patch.object(SalesPredictor, 'predict_sales') as predict_sales:
+            response = self.client.get(self.url, {'days': days})
+        self.assertEqual(response.status_code, 400, response.content)
+        self.assertEqual(response.data['error'], message)
+        predict_sales.assert_not_called()
+
+    def test_zero_days(self):
+        self.assertRejected(0, f'El parámetro days debe estar entre 1 y {MAX_DAYS}')
+
+    def test_negative_days(self):
+        self.assertRejected(-3, f'El parámetro days debe estar entre 1 y {MAX_DAYS}')
+
+    def test_too_many_days(self):
+        self.assertRejected(MAX_DAYS + 1, f'El parámetro days debe estar entre 1 y {MAX_DAYS}')
+
+    def test_not_a_number(self):
+        self.assertRejected('abc', 'El parámetro days debe ser un número entero')
+
+    def test_max_days_reaches_predictor(self):
+        with mock.patch.object(
+            SalesPredictor, 'predict_sales', return_value={'error': 'sin modelo'}
+        ) as predict_sales:
+            response = self.client.get(self.url, {'days': MAX_DAYS})
+        self.assertEqual(response.data['error'], 'sin modelo')
+        predict_sales.assert_called_once_with(MAX_DAYS, None)
@@ -0,0 +1,110 @@
+import math
+import numpy as np
+import pandas as pd
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast, Coalesce, ExtractDay, ExtractIsoWeekDay, ExtractMonth, Mod
+from backend.commercial.models import Venta
+
+# Columnas del DataFrame de entrenamiento (características + objetivo)
+TRAINING_COLUMNS = [
+    'month', 'day_of_month', 'day_of_week', 'price',
+    'category_id', 'total_quantity', 'total_sales'
+]
+
+# Filas leídas por viaje al servidor (cursor del lado del servidor en PostgreSQL)
+DEFAULT_CHUNK_SIZE = 5000
+
+# Máximo de filas en memoria; por encima se muestrea en SQL
+DEFAULT_MAX_ROWS = 500000
+
+
+class TrainingDataPipeline:
+    """
+    Extrae las características de entrenamiento directamente en SQL y las
+    vuelca por bloques en una matriz NumPy preasignada, sin instanciar
+    objetos Venta ni diccionarios por fila.
+    """
+
+    def __init__(self, start_date=None, end_date=None, max_rows=DEFAULT_MAX_ROWS,
+                 chunk_size=DEFAULT_CHUNK_SIZE, min_id=None, max_id=None):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.min_id = min_id
+        self.max_id = max_id
+        # None = sin límite; un límite debe ser positivo (el paso de muestreo divide por él)
+        if max_rows is not None and max_rows <= 0:
+            raise ValueError('max_rows debe ser mayor que cero')
+        self.max_rows = max_rows
+        self.chunk_size = chunk_size
+        self.sample_step = 1
+
+    def base_queryset(self):
+        queryset = Venta.objects.all()
+        if self.start_date:
+            queryset = queryset.filter(fecha_venta__gte=self.start_date)
+        if self.end_date:
+            queryset = queryset.filter(fecha_venta__lte=self.end_date)
+        # Rango de ids para entrenamientos incrementales (min_id exclusivo)
+        if self.min_id is not None:
+            queryset = queryset.filter(id__gt=self.min_id)
+        if self.max_id is not None:
+            queryset = queryset.filter(id__lte=self.max_id)
+        return queryset
+
+    def feature_queryset(self, queryset):
+        """Calcula cada columna en SQL; solo viajan números por el cursor"""
+        return queryset.annotate(
+            f_month=ExtractMonth('fecha_venta'),
+            f_day_of_month=ExtractDay('fecha_venta'),
+            # ISO: 1=lunes ... 7=domingo; restamos 1 para igualar date.weekday()
+            f_day_of_week=ExtractIsoWeekDay('fecha_venta') - 1,
+            f_price=Cast('precio_unitario', FloatField()),
+            f_total_sales=Cast(
+                Coalesce('total', F('cantidad') * F('precio_unitario')),
+                FloatField()
+            ),
+        ).values_list(
+            'f_month', 'f_day_of_month', 'f_day_of_week', 'f_price',
+            'producto__categoria_id', 'cantidad', 'f_total_sales'
+        )
+
+    def load(self):
+        """Retorna un DataFrame con TRAINING_COLUMNS (vacío si no hay ventas)"""
+        return pd.DataFrame(self.load_array(), columns=TRAINING_COLUMNS)
+
+    def load_array(self):
+        """Matriz float64 [filas x TRAINING_COLUMNS] leída por bloques"""
+        queryset = self.base_queryset()
+        total_rows = queryset.count()
+
+        # Muestreo sistemático por id para respetar el presupuesto de memoria
+        if self.max_rows is not None and total_rows > self.max_rows:
+            self.sample_step = math.ceil(total_rows / self.max_rows)
+            queryset = queryset.annotate(sample_key=Mod('id', self.sample_step)).filter(sample_key=0)
+            capacity = self.max_rows
+        else:
+            self.sample_step = 1
+            capacity = total_rows
+
+        data = np.empty((capacity, len(TRAINING_COLUMNS)), dtype=np.float64)
+        filled = 0
+        chunk = []
+
+        for row in self.feature_queryset(queryset).iterator(chunk_size=self.chunk_size):
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                filled = self._flush(data, filled, chunk)
+                chunk = []
+                if filled >= capacity:
+                    break
+
+        if chunk and filled < capacity:
+            filled = self._flush(data, filled, chunk)
+
+        return data[:filled]
+
+    def _flush(self, data, filled, chunk):
+        block = np.asarray(chunk, dtype=np.float64)
+        size = min(len(block), data.shape[0] - filled)
+        data[filled:filled + size] = block[:size]
+        return filled + size
@@ -0,0 +1,188 @@
+import threading
+import traceback
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from .models import TrainedModel, TrainingJob
+from .engines import ENGINE_CLASSES, DEFAULT_ENGINE
+from .artifact_store import get_artifact_store
+from .model_registry import model_registry
+
+
+# Segundos entre señales de vida del worker mientras entrena
+HEARTBEAT_INTERVAL = 30
+
+
+def stale_after():
+    return timedelta(seconds=getattr(settings, 'TRAINING_JOB_STALE_SECONDS', 600))
+
+
+def serialize_job(job):
+    """Representación del trabajo para las respuestas de la API"""
+    return {
+        'job_id': job.id,
+        'status': job.status,
+        'progress': job.progress,
+        'message': job.message,
+        'error': job.error or None,
+        'model_id': job.trained_model_id,
+        'created_at': job.created_at.isoformat(),
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        'duration': job.duration,
+    }
+
+
+def fail_stale_jobs():
+    """
+    Marca FAILED los trabajos RUNNING cuyo worker murió (OOM, SIGKILL,
+    despliegue): sin heartbeat desde hace TRAINING_JOB_STALE_SECONDS. No se
+    reencolan porque la misma causa volvería a matar al worker.
+    Retorna la cantidad de trabajos marcados.
+    """
+    now = timezone.now()
+    return TrainingJob.objects.filter(status='RUNNING').annotate(
+        last_seen=Coalesce('heartbeat_at', 'started_at')
+    ).filter(last_seen__lt=now - stale_after()).update(
+        status='FAILED',
+        error='El worker dejó de responder durante el entrenamiento',
+        message='Entrenamiento fallido',
+        finished_at=now
+    )
+
+
+def enqueue_training(params=None):
+    """
+    Encola un entrenamiento y retorna el trabajo. Si ya hay uno en cola o en
+    ejecución para el mismo motor se reutiliza en lugar de crear otro (los
+    abandonados por un worker caído no cuentan).
+    """
+    params = params or {}
+    fail_stale_jobs()
+    with transaction.atomic():
+        active = TrainingJob.objects.select_for_update().filter(
+            status__in=['QUEUED', 'RUNNING'],
+            params__engine=params.get('engine', DEFAULT_ENGINE)
+        ).order_by('created_at').first()
+        if active:
+            return active, False
+
+        job = TrainingJob.objects.create(params=params, message='En cola')
+        return job, True
+
+
+def claim_next_job():
+    """Toma el trabajo en cola más antiguo y lo marca como RUNNING"""
+    fail_stale_jobs()
+    with transaction.atomic():
+        job = TrainingJob.objects.select_for_update(skip_locked=True).filter(
+            status='QUEUED'
+        ).order_by('created_at').first()
+        if not job:
+            return None
+
+        job.status = 'RUNNING'
+        job.started_at = job.heartbeat_at = timezone.now()
+        job.message = 'Iniciando entrenamiento'
+        job.save(update_fields=['status', 'started_at', 'heartbeat_at', 'message'])
+        return job
+
+
+def _heartbeat(job_id, stop):
+    """Actualiza heartbeat_at cada HEARTBEAT_INTERVAL mientras el trabajo corre"""
+    try:
+        while not stop.wait(HEARTBEAT_INTERVAL):
+            TrainingJob.objects.filter(id=job_id, status='RUNNING').update(heartbeat_at=timezone.now())
+    finally:
+        # El hilo tiene su propia conexión; cerrarla para no dejarla abierta
+        connection.close()
+
+
+def save_trained_model(result, model_name='sales_predictor'):
+    """
+    Escribe el artefacto del modelo en el almacén y guarda en base de datos
+    solo sus metadatos (ruta y checksum)
+    """
+    store = get_artifact_store()
+    artifact_path, checksum, size = store.save(result['model_payload'], model_name)
+
+    try:
+        return TrainedModel.objects.create(
+            model_name=model_name,
+            artifact_path=artifact_path,
+            artifact_checksum=checksum,
+            artifact_size=size,
+            accuracy=result['accuracy'],
+            feature_columns=result['feature_columns'],
+            training_samples=result['training_samples'],
+            training_mode=result.get('training_mode', 'full'),
+            last_venta_id=result.get('last_venta_id'),
+            last_venta_date=result.get('last_venta_date')
+        )
+    except Exception:
+        # Sin fila que lo referencie el archivo quedaría huérfano
+        store.delete(artifact_path)
+        raise
+
+
+def run_job(job, n_jobs=-1):
+    """Ejecuta un trabajo ya reclamado y registra su progreso y resultado"""
+
+    def update_progress(progress, message):
+        TrainingJob.objects.filter(id=job.id).update(
+            progress=progress, message=message, heartbeat_at=timezone.now()
+        )
+
+    params = job.params or {}
+    start_date = params.get('start_date')
+
+    engine = ENGINE_CLASSES[params.get('engine', DEFAULT_ENGINE)]()
+
+    # Señales de vida durante fit(), que puede tardar más que el corte de obsolescencia
+    stop_heartbeat = threading.Event()
+    heartbeat = threading.Thread(target=_heartbeat, args=(job.id, stop_heartbeat), daemon=True)
+    heartbeat.start()
+
+    try:
+        # max_rows y mode solo si se pidieron: cada motor tiene sus valores por defecto
+        options = {key: params[key] for key in ('max_rows', 'mode') if key in params}
+        result = engine.train_model(
+            start_date=datetime.fromisoformat(start_date) if start_date else None,
+            n_jobs=n_jobs,
+            progress_callback=update_progress,
+            **options
+        )
+
+        if 'error' in result:
+            job.status = 'FAILED'
+            job.error = result['error']
+            job.message = 'Entrenamiento fallido'
+        else:
+            update_progress(95, 'Guardando modelo')
+            job.trained_model = save_trained_model(result, engine.model_name)
+            model_registry.retire_old_models(engine.model_name)
+            job.status = 'DONE'
+            job.progress = 100
+            job.message = (
+                f"Modelo entrenado - R²: {result['accuracy']:.4f}, "
+                f"MAE: {result['mae']:.2f}, muestras: {result['training_samples']} "
+                f"({result['training_mode']})"
+            )
+
+    except Exception as e:
+        traceback.print_exc()
+        job.status = 'FAILED'
+        job.error = str(e)
+        job.message = 'Entrenamiento fallido'
+    finally:
+        stop_heartbeat.set()
+        heartbeat.join()
+
+    job.finished_at = timezone.now()
+    update_fields = ['status', 'message', 'error', 'trained_model', 'finished_at']
+    if job.status == 'DONE':
+        update_fields.append('progress')
+    job.save(update_fields=update_fields)
+    return job
@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import TrainModelView, GetPredictionsView, ModelStatusView
+from .views import TrainModelView, GetPredictionsView, ModelStatusView, TrainingJobStatusView
 
 urlpatterns = [
     
@@ -7,4 +7,5 @@ urlpatterns = [
     path('api/train-model/', TrainModelView.as_view(), name='train_model'),
     path('api/get-predictions/', GetPredictionsView.as_view(), name='get_predictions'),
     path('api/model-status/', ModelStatusView.as_view(), name='model_status'),
+    path('api/training-jobs/<int:job_id>/', TrainingJobStatusView.as_view(), name='training_job_status'),
 ]
\ No newline at end of file
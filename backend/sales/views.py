@@ -1,41 +1,61 @@
 import base64
+import json
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from .ml_service import predictor
-from .models import TrainedModel, SalesPrediction
-from datetime import datetime
+from .ml_service import MAX_DAYS, MAX_SCENARIOS
+from .engines import ENGINE_CLASSES, get_engine, validate_engine
+from .forecasting import DailyForecaster
+from .model_registry import model_registry
+from .models import TrainedModel, SalesPrediction, TrainingJob
+from . import forecast_cache, prediction_store, training_jobs
+from django.utils import timezone
+from datetime import datetime, timedelta
 
 @method_decorator(csrf_exempt, name='dispatch')
 class TrainModelView(APIView):
     def post(self, request):
         """CU12 - Entrenar modelo de predicción"""
         try:
-            result = predictor.train_model()
-            
-            if 'error' in result:
-                return Response({'error': result['error']}, status=400)
-            
-            # Guardar modelo en base de datos
-            trained_model = TrainedModel.objects.create(
-                model_name='sales_predictor',
-                model_file=result['model_data'],
-                accuracy=result['accuracy'],
-                feature_columns=result['feature_columns'],
-                training_samples=result['training_samples']
-            )
-            
+            # Ventana de entrenamiento y presupuesto de filas opcionales
+            window_days = request.data.get('window_days')
+            start_date = timezone.now() - timedelta(days=int(window_days)) if window_days else None
+
+            engine = validate_engine(request.data.get('engine'))
+            params = {
+                'engine': engine,
+                'start_date': start_date.isoformat() if start_date else None,
+            }
+
+            # Solo se envían al motor las opciones indicadas; el motor diario las rechaza
+            if 'max_rows' in request.data:
+                params['max_rows'] = int(request.data['max_rows'])
+                if params['max_rows'] <= 0:
+                    raise ValueError('max_rows debe ser mayor que cero')
+
+            # 'incremental' solo usa las ventas nuevas desde el último modelo
+            if 'mode' in request.data:
+                params['mode'] = request.data['mode']
+                if params['mode'] not in ('full', 'incremental'):
+                    raise ValueError("El modo debe ser 'full' o 'incremental'")
+
+            if engine == 'daily':
+                DailyForecaster.check_options(params.get('max_rows'), params.get('mode', 'full'))
+
+            job, created = training_jobs.enqueue_training(params)
+
+            # El entrenamiento lo ejecuta el worker (manage.py run_training_worker)
             return Response({
                 'success': True,
-                'message': 'Modelo entrenado exitosamente',
-                'accuracy': result['accuracy'],
-                'mae': result['mae'],
-                'training_samples': result['training_samples'],
-                'model_id': trained_model.id
-            })
+                'message': 'Entrenamiento encolado' if created else 'Ya hay un entrenamiento en curso',
+                'job_id': job.id,
+                'job': training_jobs.serialize_job(job)
+            }, status=202)
             
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
         except Exception as e:
             return Response({'error': str(e)}, status=500)
 
@@ -44,50 +64,161 @@ class GetPredictionsView(APIView):
     def get(self, request):
         """CU11 - Obtener predicciones para dashboard"""
         try:
-            days = int(request.GET.get('days', 30))
-            result = predictor.predict_sales(days)
+            days = self._parse_days(request.GET.get('days', 30))
+            scenarios = self._parse_scenarios(request.GET.get('scenarios'))
+            refresh = request.GET.get('refresh', '').lower() in ('1', 'true')
+            engine = get_engine(request.GET.get('engine'))
+            start_date = timezone.now().date()
+
+            version = model_registry.latest_version(engine.model_name)
+
+            # 1) Pronóstico en caché para este modelo, horizonte, escenarios y día
+            if version and not refresh:
+                cached = forecast_cache.get_forecast(
+                    engine.model_name, version['id'], days, scenarios, start_date
+                )
+                if cached:
+                    return Response({**cached, 'cached': True})
+
+            # 2) Última ejecución completada ya persistida para este modelo y horizonte
+            if version and not scenarios and not refresh:
+                run = prediction_store.get_completed_run(version['id'], days, start_date)
+                if run:
+                    dates, predictions = prediction_store.get_run_predictions(run)
+                    response_data = self._build_response(
+                        run, dates, predictions, version['accuracy'], version['training_date'].isoformat()
+                    )
+                    forecast_cache.set_forecast(
+                        engine.model_name, version['id'], days, scenarios, start_date, response_data
+                    )
+                    return Response({**response_data, 'cached': False})
+
+            # 3) Calcular
+            result = engine.predict_sales(days, scenarios)
             
             if 'error' in result:
                 return Response({'error': result['error']}, status=400)
             
-            # Guardar predicciones en base de datos
-            SalesPrediction.objects.all().delete()  # Limpiar predicciones anteriores
-            
-            for date_str, prediction in zip(result['dates'], result['predictions']):
-                SalesPrediction.objects.create(
-                    date=datetime.fromisoformat(date_str),
-                    predicted_sales=prediction,
-                    confidence_interval=prediction * 0.1  # 10% de intervalo de confianza
+            # Guardar predicciones como una nueva ejecución y retirar las anteriores.
+            # Solo sin escenarios: las ejecuciones se sirven a cualquier ?days=N
+            run = None
+            if not scenarios:
+                run = prediction_store.save_prediction_run(
+                    result['model_id'], days, result['dates'], result['predictions']
                 )
+                prediction_store.retire_old_runs_async()
+
+            response_data = self._build_response(
+                run, result['dates'], result['predictions'],
+                result['model_accuracy'], result['last_training']
+            )
+
+            if 'scenarios' in result:
+                response_data['scenarios'] = result['scenarios']
+
+            if 'categories' in result:
+                response_data['categories'] = result['categories']
+
+            forecast_cache.set_forecast(
+                engine.model_name, result['model_id'], days, scenarios, start_date, response_data
+            )
+
+            return Response({**response_data, 'cached': False})
             
-            return Response({
-                'success': True,
-                'predictions': [
-                    {'date': date, 'sales': sales} 
-                    for date, sales in zip(result['dates'], result['predictions'])
-                ],
-                'model_accuracy': result['model_accuracy'],
-                'last_training': result['last_training']
-            })
-            
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
         except Exception as e:
             return Response({'error': str(e)}, status=500)
 
+    def _build_response(self, run, dates, predictions, model_accuracy, last_training):
+        return {
+            'success': True,
+            'run_id': run.id if run else None,
+            'predictions': [
+                {'date': date, 'sales': sales} 
+                for date, sales in zip(dates, predictions)
+            ],
+            'model_accuracy': model_accuracy,
+            'last_training': last_training
+        }
+
+    def _parse_days(self, raw):
+        """Horizonte de 1 a MAX_DAYS días"""
+        try:
+            days = int(raw)
+        except (TypeError, ValueError):
+            raise ValueError('El parámetro days debe ser un número entero')
+
+        if not 1 <= days <= MAX_DAYS:
+            raise ValueError(f'El parámetro days debe estar entre 1 y {MAX_DAYS}')
+
+        return days
+
+    def _parse_scenarios(self, raw):
+        """
+        Escenarios opcionales como JSON, por ejemplo:
+        ?scenarios=[{"price": 100}, {"price": 200, "category_id": 2}]
+        """
+        if not raw:
+            return None
+
+        try:
+            scenarios = json.loads(raw)
+        except json.JSONDecodeError:
+            raise ValueError('El parámetro scenarios debe ser una lista JSON')
+
+        if not isinstance(scenarios, list) or not all(isinstance(s, dict) for s in scenarios):
+            raise ValueError('El parámetro scenarios debe ser una lista de objetos')
+
+        if len(scenarios) > MAX_SCENARIOS:
+            raise ValueError(f'Máximo {MAX_SCENARIOS} escenarios por solicitud')
+
+        return scenarios
+
 @method_decorator(csrf_exempt, name='dispatch')
 class ModelStatusView(APIView):
     def get(self, request):
         """Obtener estado del modelo"""
+        try:
+            engine_name = validate_engine(request.GET.get('engine'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+
+        # Solo metadatos: nunca traer el blob legado model_file
         latest_model = TrainedModel.objects.filter(
-            model_name='sales_predictor'
-        ).order_by('-training_date').first()
+            model_name=ENGINE_CLASSES[engine_name].model_name
+        ).defer('model_file').order_by('-training_date').first()
+
+        latest_job = TrainingJob.objects.filter(params__engine=engine_name).order_by('-created_at').first()
+        training_job = training_jobs.serialize_job(latest_job) if latest_job else None
         
         if not latest_model:
-            return Response({'trained': False})
+            return Response({
+                'trained': False,
+                'training_job': training_job,
+                'cache': model_registry.stats()
+            })
         
         return Response({
             'trained': True,
             'last_training': latest_model.training_date.isoformat(),
             'accuracy': latest_model.accuracy,
             'feature_columns': latest_model.feature_columns,
-            'training_samples': latest_model.training_samples
-        })
\ No newline at end of file
+            'training_samples': latest_model.training_samples,
+            'training_mode': latest_model.training_mode,
+            'last_venta_id': latest_model.last_venta_id,
+            'artifact_size': latest_model.artifact_size,
+            'training_job': training_job,
+            'cache': model_registry.stats()
+        })
+
+@method_decorator(csrf_exempt, name='dispatch')
+class TrainingJobStatusView(APIView):
+    def get(self, request, job_id):
+        """Estado y progreso de un trabajo de entrenamiento"""
+        job = TrainingJob.objects.filter(id=job_id).first()
+
+        if not job:
+            return Response({'error': 'Trabajo de entrenamiento no encontrado'}, status=404)
+
+        return Response(training_jobs.serialize_job(job))
@@ -98,6 +98,93 @@ else:
         }
     }
 
+# Reportes agrupados y estadísticas desde el resumen diario ventas_diarias.
+# Lo mantienen las señales de Venta: tras cargas masivas que no las disparan
+# (bulk_create, update, SQL directo) ejecutar rebuild_sales_rollup
+SALES_ROLLUP_ENABLED = os.environ.get('SALES_ROLLUP_ENABLED', 'true').lower() == 'true'
+
+# Artefactos de modelos entrenados: almacén, carpeta, nivel de compresión
+# joblib (0-9, 0 = sin comprimir), verificación de checksum al cargar y versiones
+# por modelo que conservan su archivo (las anteriores se borran al entrenar)
+SALES_MODEL_ARTIFACT_STORE = os.environ.get(
+    'SALES_MODEL_ARTIFACT_STORE', 'backend.sales.artifact_store.LocalArtifactStore'
+)
+SALES_MODEL_ARTIFACT_DIR = os.environ.get('SALES_MODEL_ARTIFACT_DIR', os.path.join(BASE_DIR, 'model_artifacts'))
+SALES_MODEL_ARTIFACT_COMPRESS = int(os.environ.get('SALES_MODEL_ARTIFACT_COMPRESS', 3))
+SALES_MODEL_ARTIFACT_VERIFY = os.environ.get('SALES_MODEL_ARTIFACT_VERIFY', 'true').lower() == 'true'
+SALES_MODEL_KEEP_VERSIONS = int(os.environ.get('SALES_MODEL_KEEP_VERSIONS', 3))
+
+# Entrenamientos en segundo plano: un trabajo RUNNING cuyo worker no da señales
+# de vida (heartbeat) en este tiempo se marca FAILED y deja de bloquear la cola
+TRAINING_JOB_STALE_SECONDS = int(os.environ.get('TRAINING_JOB_STALE_SECONDS', 600))
+
+# Caché
+# Los pronósticos usan el alias 'forecasts': memoria local por defecto,
+# o 'file' / 'db' con FORECAST_CACHE_BACKEND (para 'db' ejecutar createcachetable)
+FORECAST_CACHE_BACKEND = os.environ.get('FORECAST_CACHE_BACKEND', 'locmem')
+
+FORECAST_CACHES = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'forecasts',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache', 'forecasts'),
+    },
+    'db': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'forecast_cache',
+    },
+}
+
+# Generación de la caché de reportes: contador que invalida las entradas al
+# registrarse ventas. Debe ser compartido entre procesos para que la
+# invalidación llegue a todos los workers: 'file' sirve para varios workers en
+# un mismo servidor y 'db' para varios servidores (ejecutar createcachetable).
+# Las filas de cada reporte siguen en la memoria local de cada proceso.
+REPORT_CACHE_GENERATION_BACKEND = os.environ.get('REPORT_CACHE_GENERATION_BACKEND', 'file')
+
+REPORT_GENERATION_CACHES = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'report_generation',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache', 'reports'),
+    },
+    'db': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'report_cache',
+    },
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'forecasts': FORECAST_CACHES[FORECAST_CACHE_BACKEND],
+    # Resultados de reportes dinámicos; al llenarse se desalojan los menos usados
+    'reports': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'reports',
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('REPORT_CACHE_MAX_ENTRIES', 200)),
+        },
+    },
+    'report_generation': REPORT_GENERATION_CACHES[REPORT_CACHE_GENERATION_BACKEND],
+}
+
+# Segundos que vive un resultado de reporte y máximo de filas para guardarlo
+REPORT_CACHE_TTL = int(os.environ.get('REPORT_CACHE_TTL', 300))
+REPORT_CACHE_MAX_ROWS = int(os.environ.get('REPORT_CACHE_MAX_ROWS', 10000))
+
+# Guardar copia comprimida de las filas de cada reporte (desactivado: solo se
+# registra cantidad_resultados) y máximo de filas a guardar
+REPORT_STORE_RESULTS = os.environ.get('REPORT_STORE_RESULTS', 'false').lower() == 'true'
+REPORT_STORE_RESULTS_MAX_ROWS = int(os.environ.get('REPORT_STORE_RESULTS_MAX_ROWS', 10000))
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',},
@@ -112,6 +199,41 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_DIRS = [BASE_DIR / 'frontend' / 'build' / 'static']
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
+# Archivos generados (reportes en segundo plano)
+MEDIA_URL = 'media/'
+MEDIA_ROOT = os.environ.get('MEDIA_ROOT', BASE_DIR / 'media')
+
+# Reportes PDF/Excel en segundo plano: reportes en proceso a la vez por
+# usuario y máximo de reportes pendientes por usuario
+REPORT_JOBS_MAX_RUNNING_PER_USER = int(os.environ.get('REPORT_JOBS_MAX_RUNNING_PER_USER', 1))
+REPORT_JOBS_MAX_PENDING_PER_USER = int(os.environ.get('REPORT_JOBS_MAX_PENDING_PER_USER', 5))
+# Segundos tras los que un reporte PROCESANDO se da por abandonado (worker
+# caído) y se marca FALLIDO al reclamar o encolar
+REPORT_JOBS_STALE_SECONDS = int(os.environ.get('REPORT_JOBS_STALE_SECONDS', 1800))
+
+# Rutas de ffmpeg/ffprobe; vacías = carpeta ffmpeg/bin del proyecto o PATH
+FFMPEG_BINARY = os.environ.get('FFMPEG_BINARY', '')
+FFPROBE_BINARY = os.environ.get('FFPROBE_BINARY', '')
+
+# Comandos de voz: motor de transcripción ('google', 'vosk' o 'stub'), procesos
+# del pool para motores locales, audios en espera como máximo e idioma.
+# VOICE_STT_WORKERS y VOICE_STT_MAX_PENDING son por cada proceso web (worker de
+# gunicorn/uvicorn): el total de procesos de transcripción es workers web x este valor
+VOICE_STT_BACKEND = os.environ.get('VOICE_STT_BACKEND', 'google')
+VOICE_STT_WORKERS = int(os.environ.get('VOICE_STT_WORKERS', 2))
+VOICE_STT_MAX_PENDING = int(os.environ.get('VOICE_STT_MAX_PENDING', 8))
+VOICE_STT_LANGUAGE = os.environ.get('VOICE_STT_LANGUAGE', 'es-ES')
+VOICE_VOSK_MODEL_PATH = os.environ.get('VOICE_VOSK_MODEL_PATH', '')
+VOICE_STUB_TRANSCRIPT = os.environ.get('VOICE_STUB_TRANSCRIPT', 'reporte de ventas')
+
+# Comandos de voz por websocket (backend/asgi.py): bytes de audio como máximo
+# y segundos de espera entre fragmentos
+VOICE_STREAM_MAX_BYTES = int(os.environ.get('VOICE_STREAM_MAX_BYTES', 10 * 1024 * 1024))
+VOICE_STREAM_IDLE_TIMEOUT = int(os.environ.get('VOICE_STREAM_IDLE_TIMEOUT', 30))
+
+# Filas que se dibujan en un PDF; las siguientes solo se cuentan y totalizan
+REPORT_PDF_MAX_ROWS = int(os.environ.get('REPORT_PDF_MAX_ROWS', 10000))
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 AUTH_USER_MODEL = 'access_control.Usuario'
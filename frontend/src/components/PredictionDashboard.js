@@ -60,6 +60,18 @@ const PredictionDashboard = () => {
     }
   };
 
+  const waitForTrainingJob = async (jobId) => {
+    // El entrenamiento corre en segundo plano; consultar hasta que termine
+    while (true) {
+      const job = await aiService.getTrainingJob(jobId);
+      if (job.status === 'DONE' || job.status === 'FAILED') {
+        return job;
+      }
+      setMessage({ type: 'info', text: `${job.message} (${job.progress}%)` });
+      await new Promise((resolve) => setTimeout(resolve, 2000));
+    }
+  };
+
   const handleTrainModel = async () => {
     setTraining(true);
     setMessage({ type: '', text: '' });
@@ -67,16 +79,14 @@ const PredictionDashboard = () => {
     try {
       const result = await aiService.trainModel();
       if (result.success) {
-        setMessage({ 
-          type: 'success', 
-          text: `Modelo entrenado exitosamente! Precisión: ${(result.accuracy * 100).toFixed(2)}%` 
-        });
-        setModelStatus({ 
-          trained: true, 
-          accuracy: result.accuracy,
-          last_training: new Date().toISOString()
-        });
-        loadPredictions();
+        const job = await waitForTrainingJob(result.job_id);
+        if (job.status === 'DONE') {
+          setMessage({ type: 'success', text: `Modelo entrenado exitosamente! ${job.message}` });
+          loadModelStatus();
+          loadPredictions();
+        } else {
+          setMessage({ type: 'error', text: job.error || job.message });
+        }
       } else {
         setMessage({ type: 'error', text: result.error });
       }
@@ -71,7 +71,7 @@ const DynamicReports = () => {
         )}
         
         {activeTab === 'history' && (
-          <ReportHistory />
+          <ReportHistory onReportGenerated={handleReportGenerated} />
         )}
       </div>
     </div>
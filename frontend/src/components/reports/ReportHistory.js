@@ -1,9 +1,10 @@
 import React, { useState, useEffect } from 'react';
 import { reportService } from '../../services/reports';
 
-const ReportHistory = () => {
+const ReportHistory = ({ onReportGenerated }) => {
   const [reports, setReports] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [loadingResult, setLoadingResult] = useState(null);
 
   useEffect(() => {
     loadReportHistory();
@@ -20,6 +21,26 @@ const ReportHistory = () => {
     }
   };
 
+  // Filas guardadas del reporte (solo si el servidor guarda resultados)
+  const showResult = async (report) => {
+    setLoadingResult(report.id);
+    try {
+      const result = await reportService.getReportResult(report.id);
+      onReportGenerated({
+        type: 'data',
+        data: { ...result, tiempo_ejecucion: report.tiempo_ejecucion },
+        format: 'JSON'
+      });
+    } catch (error) {
+      onReportGenerated({
+        type: 'error',
+        message: error.response?.data?.error || 'Error obteniendo resultado'
+      });
+    } finally {
+      setLoadingResult(null);
+    }
+  };
+
   const formatDate = (dateString) => {
     return new Date(dateString).toLocaleString('es-ES');
   };
@@ -28,6 +49,8 @@ const ReportHistory = () => {
     switch (format) {
       case 'PDF': return '📄';
       case 'EXCEL': return '📊';
+      case 'CSV': return '🧾';
+      case 'PARQUET': return '🗃️';
       default: return '👁️';
     }
   };
@@ -63,6 +86,16 @@ const ReportHistory = () => {
               <div className="report-prompt">
                 {report.prompt}
               </div>
+
+              {report.cantidad_resultados > 0 && (
+                <button
+                  className="generate-button"
+                  onClick={() => showResult(report)}
+                  disabled={loadingResult === report.id}
+                >
+                  {loadingResult === report.id ? 'Cargando...' : 'Ver resultado'}
+                </button>
+              )}
             </div>
           ))}
         </div>
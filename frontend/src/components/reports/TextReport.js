@@ -1,9 +1,16 @@
 import React, { useState } from 'react';
-import { reportService } from '../../services/reports';
+import { reportService, DOWNLOAD_FORMATS } from '../../services/reports';
+
+// Intervalo de consulta del estado de un reporte en segundo plano
+const POLL_MS = 2000;
+
+const wait = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
 
 const TextReport = ({ onReportGenerated, loading, setLoading }) => {
   const [prompt, setPrompt] = useState('');
   const [format, setFormat] = useState('JSON');
+  const [background, setBackground] = useState(false);
+  const [jobStatus, setJobStatus] = useState('');
   const [examples] = useState([
     "Quiero un reporte de ventas del mes de septiembre, agrupado por producto, en PDF",
     "Muestra las ventas del periodo del 01/10/2024 al 01/01/2025 en Excel",
@@ -17,16 +24,16 @@ const TextReport = ({ onReportGenerated, loading, setLoading }) => {
 
     setLoading(true);
     try {
+      if (background && format in DOWNLOAD_FORMATS) {
+        await generateInBackground();
+        return;
+      }
+
       const response = await reportService.generateTextReport(prompt, format);
       
-      if (format === 'PDF' || format === 'EXCEL') {
-        const filename = format === 'EXCEL'
-          ? `reporte_${Date.now()}.xlsx`  // fuerza .xlsx
-          : `reporte_${Date.now()}.${format.toLowerCase()}`;
-        
-        const contentType = format === 'PDF' 
-          ? 'application/pdf' 
-          : 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet';
+      if (format in DOWNLOAD_FORMATS) {
+        const { extension, contentType } = DOWNLOAD_FORMATS[format];
+        const filename = `reporte_${Date.now()}.${extension}`;
         
         reportService.downloadFile(response.data, filename, contentType);
         onReportGenerated({
@@ -48,9 +55,37 @@ const TextReport = ({ onReportGenerated, loading, setLoading }) => {
       });
     } finally {
       setLoading(false);
+      setJobStatus('');
     }
   };
 
+  // Encola el reporte, consulta su estado hasta que termine y descarga el archivo
+  const generateInBackground = async () => {
+    let job = await reportService.enqueueTextReport(prompt, format);
+    while (job.estado === 'PENDIENTE' || job.estado === 'PROCESANDO') {
+      setJobStatus(job.estado === 'PENDIENTE' ? 'En cola...' : 'Generando archivo...');
+      await wait(POLL_MS);
+      job = await reportService.getReportJob(job.reporte_id);
+    }
+
+    if (job.estado !== 'COMPLETADO') {
+      onReportGenerated({
+        type: 'error',
+        message: job.error || 'Error generando reporte'
+      });
+      return;
+    }
+
+    const { extension, contentType } = DOWNLOAD_FORMATS[format];
+    const response = await reportService.downloadReportJob(job.reporte_id);
+    reportService.downloadFile(response.data, `reporte_${job.reporte_id}.${extension}`, contentType);
+    onReportGenerated({
+      type: 'download',
+      message: `Reporte descargado como ${format}`,
+      format: format
+    });
+  };
+
   // ✅ Función normal para aplicar un ejemplo
   const applyExample = (example) => {
     setPrompt(example);
@@ -82,15 +117,31 @@ const TextReport = ({ onReportGenerated, loading, setLoading }) => {
             <option value="JSON">Ver en pantalla</option>
             <option value="PDF">Descargar PDF</option>
             <option value="EXCEL">Descargar Excel</option>
+            <option value="CSV">Descargar CSV</option>
+            <option value="PARQUET">Descargar Parquet</option>
           </select>
         </div>
 
+        {format in DOWNLOAD_FORMATS && (
+          <div className="form-group">
+            <label>
+              <input
+                type="checkbox"
+                checked={background}
+                onChange={(e) => setBackground(e.target.checked)}
+                disabled={loading}
+              />
+              {' '}Generar en segundo plano (reportes grandes)
+            </label>
+          </div>
+        )}
+
         <button 
           type="submit" 
           disabled={!prompt.trim() || loading}
           className="generate-button"
         >
-          {loading ? 'Generando...' : 'Generar Reporte'}
+          {loading ? (jobStatus || 'Generando...') : 'Generar Reporte'}
         </button>
       </form>
 
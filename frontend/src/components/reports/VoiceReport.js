@@ -1,33 +1,69 @@
 import React, { useState, useRef } from 'react';
-import { reportService } from '../../services/reports';
+import { reportService, DOWNLOAD_FORMATS } from '../../services/reports';
 
 const VoiceReport = ({ onReportGenerated, loading, setLoading }) => {
   const [isRecording, setIsRecording] = useState(false);
   const [transcript, setTranscript] = useState('');
   const [format, setFormat] = useState('JSON');
   const mediaRecorderRef = useRef(null);
-  const audioChunksRef = useRef([]);
+  const voiceStreamRef = useRef(null);
+
+  // Milisegundos de audio por fragmento enviado al servidor
+  const CHUNK_MS = 250;
 
   const startRecording = async () => {
     try {
       const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
       const mediaRecorder = new MediaRecorder(stream);
       mediaRecorderRef.current = mediaRecorder;
-      audioChunksRef.current = [];
+
+      // El servidor decodifica mientras se graba y responde al detener
+      voiceStreamRef.current = reportService.streamVoiceReport(format, {
+        onProgress: (segundos) => setTranscript(`Grabando... ${segundos.toFixed(1)} s recibidos`),
+        onTranscript: (texto) => setTranscript(texto),
+        onReport: (data) => {
+          onReportGenerated({
+            type: 'data',
+            data,
+            format: format
+          });
+          setLoading(false);
+        },
+        onFile: (blob, nombre) => {
+          const { contentType } = DOWNLOAD_FORMATS[format] || {};
+          reportService.downloadFile(blob, nombre, contentType);
+          onReportGenerated({
+            type: 'download',
+            message: `Reporte por voz descargado como ${format}`,
+            format: format
+          });
+          setLoading(false);
+        },
+        onError: (message) => {
+          onReportGenerated({
+            type: 'error',
+            message: message || 'Error procesando audio'
+          });
+          setTranscript('Error: ' + (message || 'No se pudo procesar el audio'));
+          setLoading(false);
+        }
+      });
 
       mediaRecorder.ondataavailable = (event) => {
-        audioChunksRef.current.push(event.data);
+        if (event.data.size > 0) {
+          voiceStreamRef.current.sendChunk(event.data);
+        }
       };
 
-      mediaRecorder.onstop = async () => {
-        const audioBlob = new Blob(audioChunksRef.current, { type: 'audio/wav' });
-        await processAudio(audioBlob);
-        
+      mediaRecorder.onstop = () => {
+        setLoading(true);
+        voiceStreamRef.current.finish();
+
         // Detener stream
         stream.getTracks().forEach(track => track.stop());
       };
 
-      mediaRecorder.start();
+      mediaRecorder.start(CHUNK_MS);
       setIsRecording(true);
       setTranscript('Grabando... Habla ahora.');
     } catch (error) {
@@ -45,42 +81,6 @@ const VoiceReport = ({ onReportGenerated, loading, setLoading }) => {
     }
   };
 
-  const processAudio = async (audioBlob) => {
-    setLoading(true);
-    try {
-      const response = await reportService.generateVoiceReport(audioBlob, format);
-      
-      if (format === 'PDF' || format === 'EXCEL') {
-        const filename = `reporte_voz_${Date.now()}.${format.toLowerCase()}`;
-        const contentType = format === 'PDF' 
-          ? 'application/pdf' 
-          : 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet';
-        
-        reportService.downloadFile(response.data, filename, contentType);
-        onReportGenerated({
-          type: 'download',
-          message: `Reporte por voz descargado como ${format}`,
-          format: format
-        });
-      } else {
-        onReportGenerated({
-          type: 'data',
-          data: response.data,
-          format: format
-        });
-        setTranscript(response.data.comando_interpretado?.original_command || 'Comando procesado');
-      }
-    } catch (error) {
-      onReportGenerated({
-        type: 'error',
-        message: error.response?.data?.error || 'Error procesando audio'
-      });
-      setTranscript('Error: ' + (error.response?.data?.error || 'No se pudo procesar el audio'));
-    } finally {
-      setLoading(false);
-    }
-  };
-
   return (
     <div className="voice-report">
       <div className="voice-controls">
@@ -95,6 +95,8 @@ const VoiceReport = ({ onReportGenerated, loading, setLoading }) => {
             <option value="JSON">Ver en pantalla</option>
             <option value="PDF">Descargar PDF</option>
             <option value="EXCEL">Descargar Excel</option>
+            <option value="CSV">Descargar CSV</option>
+            <option value="PARQUET">Descargar Parquet</option>
           </select>
         </div>
 
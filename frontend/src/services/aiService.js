@@ -21,6 +21,16 @@ export const aiService = {
     }
   },
 
+  // Estado de un trabajo de entrenamiento
+  getTrainingJob: async (jobId) => {
+    try {
+      const response = await api.get(`/sales/api/training-jobs/${jobId}/`);
+      return response.data;
+    } catch (error) {
+      throw error.response?.data || { error: 'Error de conexión' };
+    }
+  },
+
   // Estado del modelo
   getModelStatus: async () => {
     try {
@@ -6,6 +6,14 @@ const API_BASE_URL =
     ? 'https://smartsales365.onrender.com/api' // Tu dominio de Render + prefijo /api
     : 'http://localhost:8000/api'; // Local para desarrollo
 
+// Websockets (comandos de voz): proceso ASGI aparte de la API (backend/asgi.py);
+// en producción el proxy envía /ws/ a ese proceso
+export const WS_BASE_URL =
+  process.env.REACT_APP_WS_URL ||
+  (process.env.NODE_ENV === 'production'
+    ? 'wss://smartsales365.onrender.com'
+    : 'ws://localhost:8001');
+
 const api = axios.create({
   baseURL: API_BASE_URL,
   headers: {
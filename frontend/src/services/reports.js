@@ -1,4 +1,15 @@
-import api from './api';
+import api, { WS_BASE_URL } from './api';
+
+// Formatos que se descargan como archivo: extensión y tipo de contenido
+export const DOWNLOAD_FORMATS = {
+  PDF: { extension: 'pdf', contentType: 'application/pdf' },
+  EXCEL: {
+    extension: 'xlsx',
+    contentType: 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+  },
+  CSV: { extension: 'csv', contentType: 'text/csv' },
+  PARQUET: { extension: 'parquet', contentType: 'application/vnd.apache.parquet' },
+};
 
 export const reportService = {
   // CU6 - Generar reporte por texto
@@ -7,12 +18,35 @@ export const reportService = {
       '/reports/text-report/',
       { prompt, formato: format },
       {
-        responseType:
-          format === 'EXCEL' || format === 'PDF' ? 'blob' : 'json',
+        responseType: format in DOWNLOAD_FORMATS ? 'blob' : 'json',
       }
     );
     return response;
   },
+  // PDF/Excel en segundo plano: retorna el reporte en cola (reporte_id, estado)
+  enqueueTextReport: async (prompt, format) => {
+    const response = await api.post('/reports/text-report/', {
+      prompt,
+      formato: format,
+      async: true,
+    });
+    return response.data;
+  },
+
+  // Estado de un reporte en segundo plano
+  getReportJob: async (reportId) => {
+    const response = await api.get(`/reports/report-jobs/${reportId}/`);
+    return response.data;
+  },
+
+  // Archivo de un reporte en segundo plano ya completado
+  downloadReportJob: async (reportId) => {
+    const response = await api.get(`/reports/report-jobs/${reportId}/download/`, {
+      responseType: 'blob',
+    });
+    return response;
+  },
+
   // CU7 - Generar reporte por voz
   generateVoiceReport: async (audioBlob, format = 'JSON') => {
     const formData = new FormData();
@@ -23,13 +57,111 @@ export const reportService = {
       headers: {
         'Content-Type': 'multipart/form-data',
       },
+      responseType: format in DOWNLOAD_FORMATS ? 'blob' : 'json',
     });
     return response;
   },
 
-  // Obtener historial de reportes
-  getReportHistory: async () => {
-    const response = await api.get('/reports/report-history/');
+  // CU7 por streaming: abre el websocket y retorna { sendChunk, finish, cancel }.
+  // El token y el formato van en el primer mensaje (no en la URL, que queda en
+  // los logs). El audio se envía mientras se graba; al llamar finish() el servidor
+  // transcribe y responde por los handlers: onProgress(segundos),
+  // onTranscript(texto), onReport(datos), onFile(blob, nombre) y onError(mensaje).
+  streamVoiceReport: (format, handlers) => {
+    const token = (api.defaults.headers.common['Authorization'] || '').replace('Token ', '');
+    const socket = new WebSocket(`${WS_BASE_URL}/ws/reports/voice/`);
+    const pending = [];
+    const fileParts = [];
+    let report = null;
+    let file = null;
+    let done = false;
+
+    socket.onopen = () => {
+      socket.send(JSON.stringify({ token, formato: format }));
+      pending.splice(0).forEach((data) => socket.send(data));
+    };
+
+    socket.onmessage = (event) => {
+      // Mensajes binarios: partes del archivo anunciado en "archivo"
+      if (typeof event.data !== 'string') {
+        fileParts.push(event.data);
+        return;
+      }
+      const message = JSON.parse(event.data);
+      switch (message.tipo) {
+        case 'progreso':
+          handlers.onProgress?.(message.segundos);
+          break;
+        case 'transcripcion':
+          handlers.onTranscript?.(message.texto);
+          break;
+        case 'reporte':
+          report = { ...message, datos: [] };
+          break;
+        case 'datos':
+          report.datos.push(...message.filas);
+          break;
+        case 'archivo':
+          file = message;
+          break;
+        case 'fin':
+          done = true;
+          if (file) {
+            handlers.onFile?.(new Blob(fileParts), file.nombre);
+          } else {
+            handlers.onReport?.({
+              ...report,
+              cantidad_resultados: message.cantidad_resultados,
+              tiempo_ejecucion: message.tiempo_ejecucion,
+            });
+          }
+          break;
+        case 'error':
+          done = true;
+          handlers.onError?.(message.error);
+          break;
+        default:
+          break;
+      }
+    };
+
+    socket.onclose = (event) => {
+      if (!done) {
+        handlers.onError?.(
+          event.code === 4401 ? 'Sesión no válida' : 'Se perdió la conexión con el servidor'
+        );
+      }
+    };
+
+    const send = (data) => {
+      if (socket.readyState === WebSocket.OPEN) {
+        socket.send(data);
+      } else {
+        pending.push(data);
+      }
+    };
+
+    return {
+      sendChunk: (blob) => send(blob),
+      finish: () => send(JSON.stringify({ accion: 'fin' })),
+      cancel: () => {
+        done = true;
+        socket.close();
+      },
+    };
+  },
+
+  // Obtener historial de reportes; antesDe es el valor "siguiente" de la página anterior
+  getReportHistory: async (antesDe = null) => {
+    const response = await api.get('/reports/report-history/', {
+      params: antesDe ? { antes_de: antesDe } : {},
+    });
+    return response.data;
+  },
+
+  // Filas guardadas de un reporte (si el servidor guarda resultados)
+  getReportResult: async (reportId) => {
+    const response = await api.get(`/reports/report-history/${reportId}/resultado/`);
     return response.data;
   },
 